@@ -81,6 +81,7 @@ if DEBUG:
     INSTALLED_APPS.append("debug_toolbar")
 
 MIDDLEWARE = [
+    "racing.middleware.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -98,7 +99,8 @@ ROOT_URLCONF = "canadaxc.urls"
 
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        # the Django backend, timing renders for racing/metrics.py
+        "BACKEND": "racing.metrics.TimedDjangoTemplates",
         "DIRS": [BASE_DIR / "templates"],
         "APP_DIRS": True,
         "OPTIONS": {
@@ -123,6 +125,10 @@ DATABASES = {
     
 }
 
+# Trigram lookups for runner search (see racing/search.py)
+if DATABASES["default"]["ENGINE"] == "django.db.backends.postgresql":
+    INSTALLED_APPS.append("django.contrib.postgres")
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -161,8 +167,41 @@ USE_TZ = True
 CACHES = {
     "default": {
         "BACKEND": "django.core.cache.backends.redis.RedisCache",
-        "LOCATION": "redis://127.0.0.1:6379",
+        "LOCATION": os.getenv("DJANGO_REDIS_URL", "redis://127.0.0.1:6379"),
+    }
+}
+
+# Use an in-process cache instead of Redis (e.g. for local development)
+if os.getenv("DJANGO_CACHE") == "locmem":
+    CACHES["default"] = {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
     }
+
+# How long rendered public pages are kept, in seconds. Pages are invalidated
+# as soon as their data changes (see racing/caching.py), so this only bounds
+# how long unused pages linger.
+PAGE_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+
+
+# Request metrics (see racing/metrics.py)
+
+# Requests taking at least this long, in milliseconds, are logged with
+# their queries
+SLOW_REQUEST_MS = int(os.getenv("DJANGO_SLOW_REQUEST_MS", 1000))
+
+# Lets Prometheus read /metrics/ from outside INTERNAL_IPS, sent as a
+# bearer token
+METRICS_TOKEN = os.getenv("DJANGO_METRICS_TOKEN")
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "racing.metrics": {"handlers": ["console"], "level": "INFO"},
+    },
 }
 
 
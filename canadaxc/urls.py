@@ -22,9 +22,12 @@ from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
 
+from racing.metrics import prometheus_metrics
+
 urlpatterns = [
     path("", include("racing.urls")),
     path("admin/", admin.site.urls),
+    path("metrics/", prometheus_metrics, name="metrics"),
 ]
 
 if settings.DEBUG:
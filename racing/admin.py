@@ -1,13 +1,19 @@
 from import_export import fields, resources
 from import_export.admin import ImportExportModelAdmin
+from import_export.formats.base_formats import CSV
 from import_export.forms import ConfirmImportForm, ImportForm
-from import_export.widgets import ForeignKeyWidget
+from import_export.widgets import DurationWidget, ForeignKeyWidget
 from sorl.thumbnail.admin import AdminImageMixin
 
 from django import forms
-from django.contrib import admin
+from django.contrib import admin, messages
 from django.contrib.admin.widgets import AutocompleteSelect
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponseRedirect
+from django.urls import reverse
 
+from racing.aliases import TeamResolver
+from racing.importing import ResultImportError, import_results
 from racing.models import (
     Conference,
     Meet,
@@ -17,7 +23,10 @@ from racing.models import (
     RosterSpot,
     Runner,
     Team,
+    TeamAlias,
 )
+from racing.ranking import defer_ranking
+from racing.times import DNF, DNS, DQ, parse_time, parse_times
 
 
 @admin.register(Conference)
@@ -43,9 +52,16 @@ class RunnerAdmin(admin.ModelAdmin):
     search_fields = ["name"]
 
 
+class TeamAliasInline(admin.TabularInline):
+    model = TeamAlias
+    extra = 1
+
+
 @admin.register(Team)
 class TeamAdmin(admin.ModelAdmin):
+    inlines = [TeamAliasInline]
     list_display = ("short_name", "full_name", "division")
+    search_fields = ["full_name", "aliases__name"]
 
 
 class RaceInline(admin.TabularInline):
@@ -84,6 +100,10 @@ class ResultImportForm(ImportForm):
         required=True,
         widget=AutocompleteSelect(Result._meta.get_field("race"), admin.site),
     )
+    skip_preview = forms.BooleanField(
+        required=False,
+        help_text="Import a CSV file straight away, without previewing changes",
+    )
 
 
 class ResultConfirmImportForm(ConfirmImportForm):
@@ -96,16 +116,60 @@ class ResultConfirmImportForm(ConfirmImportForm):
     )
 
 
+class TeamWidget(ForeignKeyWidget):
+    """
+    Looks teams up by full name or alias, with the resolver set for the
+    race being imported.
+    """
+
+    def __init__(self):
+        super().__init__(Team, "full_name")
+        self.resolver = None
+
+    def clean(self, value, row=None, **kwargs):
+        if not value:
+            return None
+
+        team = self.resolver.resolve(value)
+        if team is None:
+            raise ValueError(f'Unknown team "{value}"')
+        return team
+
+
+class TimeWidget(DurationWidget):
+    """Parses finish times with racing.times, like the fast import does."""
+
+    def clean(self, value, row=None, **kwargs):
+        duration, _ = parse_time(str(value or ""))
+        if duration is None:
+            raise ValueError(f'Invalid time "{value}"')
+        return duration
+
+
 class ResultResource(resources.ModelResource):
-    team = fields.Field(
-        column_name="team",
-        attribute="team",
-        widget=ForeignKeyWidget(Team, "full_name"),
-    )
+    team = fields.Field(column_name="team", attribute="team", widget=TeamWidget())
+    time = fields.Field(column_name="time", attribute="time", widget=TimeWidget())
+
+    def import_data(self, dataset, dry_run=False, **kwargs):
+        # rank each imported race once, rather than once per row, and not
+        # at all for previews, which are rolled back
+        with defer_ranking(discard=dry_run):
+            return super().import_data(dataset, dry_run=dry_run, **kwargs)
+
+    def before_import(self, dataset, **kwargs):
+        self.race = kwargs["form"].cleaned_data["race"]
+        # resolve every team name from memory, rather than a query per row
+        self.fields["team"].widget.resolver = TeamResolver(self.race.sex)
+
+        if "time" in dataset.headers:
+            times = parse_times(str(time or "") for time in dataset["time"])
+            # runners who didn't finish have no result to import
+            for index in reversed(range(len(times.markers))):
+                if times.markers[index] in (DNF, DNS, DQ):
+                    del dataset[index]
 
     def before_import_row(self, row, **kwargs):
-        race_id = kwargs["form"].cleaned_data["race"].id
-        row["race"] = race_id  # set race_id for the row
+        row["race"] = self.race.id  # set race_id for the row
 
     class Meta:
         model = Result
@@ -120,6 +184,33 @@ class RaceResultAdmin(ImportExportModelAdmin):
     import_form_class = ResultImportForm
     confirm_form_class = ResultConfirmImportForm
 
+    def import_action(self, request, **kwargs):
+        if request.method == "POST" and request.POST.get("skip_preview"):
+            if not self.has_import_permission(request):
+                raise PermissionDenied
+
+            import_form = self.create_import_form(request)
+            if import_form.is_valid():
+                formats = self.get_import_formats()
+                input_format = formats[int(import_form.cleaned_data["format"])]
+                if issubclass(input_format, CSV):
+                    return self.import_without_preview(request, import_form)
+
+        return super().import_action(request, **kwargs)
+
+    def import_without_preview(self, request, import_form):
+        """Import straight into the race with racing.importing, in bulk."""
+        race = import_form.cleaned_data["race"]
+        try:
+            summary = import_results(race, import_form.cleaned_data["import_file"])
+        except ResultImportError as e:
+            for error in e.errors:
+                self.message_user(request, error, messages.ERROR)
+            return HttpResponseRedirect(request.get_full_path())
+
+        self.message_user(request, f"Imported {summary} into {race}")
+        return HttpResponseRedirect(reverse("admin:racing_result_changelist"))
+
     def get_import_data_kwargs(self, request, *args, **kwargs):
         """
         Prepare kwargs for import_data.
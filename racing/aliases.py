@@ -0,0 +1,39 @@
+from racing.models import Team, TeamAlias
+from racing.names import normalize_name
+
+
+class TeamResolver:
+    """
+    Resolves team names as they appear in results to teams.
+
+    Names are compared after `normalize_name`, with a single dictionary
+    lookup, so resolving a whole file is linear in its number of rows. A
+    team's full name always wins, then aliases for the race's sex, then
+    aliases for any race.
+
+    Example:
+
+    >>> resolver = TeamResolver(sex="F")
+    >>> resolver.resolve("McGill University")
+    <Team: McGill Martlets>
+    """
+
+    def __init__(self, sex: str | None = None):
+        teams = Team.objects.in_bulk()
+        # aliases of either sex sort first, for those of `sex` to override
+        aliases = (
+            TeamAlias.objects.filter(sex__in=["", sex or ""])
+            .order_by("sex")
+            .values_list("normalized_name", "team_id")
+        )
+
+        self.teams = {}
+        # later entries override earlier ones, so the strongest come last
+        for normalized_name, team_id in aliases:
+            self.teams[normalized_name] = teams[team_id]
+        for team in teams.values():
+            self.teams[normalize_name(team.full_name)] = team
+
+    def resolve(self, name: str) -> Team | None:
+        """Returns the team with the given name or alias, if there is one."""
+        return self.teams.get(normalize_name(name))
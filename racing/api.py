@@ -0,0 +1,431 @@
+"""
+Read-only JSON API, version 1.
+
+Every endpoint mirrors a public page (see racing.urls) and depends on the
+same cache tags, so clients revalidating with If-None-Match or
+If-Modified-Since get a 304 without a single database query.
+
+Lists are paginated by keyset rather than offset: each page ends with a
+`next` URL holding an opaque cursor (the last row's ordering values), so
+any page costs one indexed range scan however deep it is. Pages are
+serialized as they are read from the database, in chunks, rather than
+built in memory first.
+"""
+
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as Base64Error
+from functools import wraps
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Prefetch, Q
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.views.decorators.http import require_safe
+
+from racing.budgets import budget
+from racing.caching import (
+    LEADERBOARDS_TAG,
+    MEETS_TAG,
+    RUNNERS_TAG,
+    cache_page_with_tags,
+    condition_with_tags,
+    meet_tag,
+    runner_tag,
+    team_tag,
+)
+from racing.leaderboards import Leaderboard
+from racing.models import Best, Meet, Race, Result, RosterSpot, Runner, Team
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# rows fetched from the database at a time while streaming a page
+CHUNK_SIZE = 500
+
+
+class BadRequest(Exception):
+    pass
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, cls=DjangoJSONEncoder, separators=(",", ":"))
+
+
+def encode_cursor(values) -> str:
+    return urlsafe_b64encode(_dumps(values).encode()).decode()
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    try:
+        values = json.loads(urlsafe_b64decode(cursor.encode()))
+    except (Base64Error, UnicodeError, ValueError):
+        raise BadRequest("Invalid cursor") from None
+    # rows are only ordered by non-null fields, see `paginate`
+    if not isinstance(values, list) or len(values) != size or None in values:
+        raise BadRequest("Invalid cursor")
+    return values
+
+
+def _after(ordering: tuple[str, ...], values: list) -> Q:
+    """
+    Returns the condition for rows after `values` in `ordering`, i.e.
+    (a, b) > (x, y) as (a > x) OR (a = x AND b > y).
+    """
+    condition = Q()
+    for index, field in enumerate(ordering):
+        lookup = "lt" if field.startswith("-") else "gt"
+        equal = {
+            f.lstrip("-"): v
+            for f, v in zip(ordering[:index], values[:index], strict=True)
+        }
+        condition |= Q(**equal, **{f"{field.lstrip('-')}__{lookup}": values[index]})
+    return condition
+
+
+def _page_size(request) -> int:
+    try:
+        limit = int(request.GET.get("limit", DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise BadRequest("Invalid limit") from None
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise BadRequest(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    return limit
+
+
+def paginate(request, queryset, ordering: tuple[str, ...], serialize):
+    """
+    Streams one page of `queryset` as {"data": [...], "next": url or null}.
+
+    :param ordering: Non-null fields that uniquely order the queryset,
+        ending with the primary key, e.g. ("-date", "-id").
+    :param serialize: Turns a row into a JSON-serializable dict.
+    """
+    limit = _page_size(request)
+    queryset = queryset.order_by(*ordering)
+    if cursor := request.GET.get("cursor"):
+        values = decode_cursor(cursor, len(ordering))
+        # JSON has no durations, times come back as strings
+        fields = [queryset.model._meta.get_field(f.lstrip("-")) for f in ordering]
+        try:
+            values = [
+                field.to_python(v) for field, v in zip(fields, values, strict=True)
+            ]
+        except ValidationError:
+            raise BadRequest("Invalid cursor") from None
+        queryset = queryset.filter(_after(ordering, values))
+
+    def stream():
+        yield '{"data":['
+        last = None
+        # fetch one extra row to know whether there is another page
+        rows = queryset[: limit + 1].iterator(chunk_size=CHUNK_SIZE)
+        for index, row in enumerate(rows):
+            if index == limit:
+                break
+            yield ("," if index else "") + _dumps(serialize(row))
+            last = row
+        else:
+            last = None
+
+        next_url = None
+        if last is not None:
+            query = request.GET.copy()
+            query["cursor"] = encode_cursor(
+                [getattr(last, field.lstrip("-")) for field in ordering]
+            )
+            next_url = request.build_absolute_uri(f"?{query.urlencode()}")
+        yield f'],"next":{_dumps(next_url)}}}'
+
+    return StreamingHttpResponse(stream(), content_type="application/json")
+
+
+def api_view(get_tags):
+    """
+    Makes a read-only API view: GET and HEAD only, conditional on the
+    given cache tags, with bad requests and 404s answered as JSON.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        @require_safe
+        @condition_with_tags(get_tags)
+        def wrapper(request, *args, **kwargs):
+            try:
+                return view(request, *args, **kwargs)
+            except BadRequest as e:
+                return JsonResponse({"error": str(e)}, status=400)
+            except Http404:
+                return JsonResponse({"error": "Not found"}, status=404)
+
+        return wrapper
+
+    return decorator
+
+
+def _race_info(race: Race) -> tuple[int, str, str]:
+    return (int(race.distance), race.unit, race.sex)
+
+
+def _race_url(race: Race) -> str:
+    return reverse(
+        "api_race",
+        kwargs={
+            "year": race.meet.date.year,
+            "slug": race.meet.slug,
+            "race_info": _race_info(race),
+        },
+    )
+
+
+def serialize_team(team: Team) -> dict:
+    return {
+        "id": team.id,
+        "slug": team.slug,
+        "short_name": team.short_name,
+        "full_name": team.full_name,
+        "division": team.division,
+    }
+
+
+def serialize_meet(meet: Meet) -> dict:
+    return {
+        "id": meet.id,
+        "name": meet.name,
+        "slug": meet.slug,
+        "date": meet.date,
+        "url": reverse("api_meet", kwargs={"year": meet.date.year, "slug": meet.slug}),
+    }
+
+
+def serialize_race(race: Race) -> dict:
+    return {
+        "id": race.id,
+        "distance": float(race.distance),
+        "unit": race.unit,
+        "sex": race.sex,
+        "type": race.type,
+        "url": _race_url(race),
+    }
+
+
+def serialize_runner(runner: Runner) -> dict:
+    return {
+        "id": runner.id,
+        "name": runner.name,
+        "slug": runner.slug,
+        "sex": runner.sex,
+        "url": reverse("api_runner", kwargs={"slug": runner.slug}),
+    }
+
+
+def serialize_result(result: Result) -> dict:
+    return {
+        "id": result.id,
+        "place": result.place,
+        "name": result.name,
+        "seconds": result.time.total_seconds(),
+        "points": result.points,
+        "team": result.team.slug,
+        "runner": result.runner.slug if result.runner_id else None,
+    }
+
+
+@budget(queries=1, ms=250)
+@api_view(lambda request: [MEETS_TAG])
+def meets(request):
+    """Meets, most recent first, optionally filtered by year or conference."""
+    meets = Meet.objects.only("name", "slug", "date")
+
+    if conference_short_name := request.GET.get("conference"):
+        meets = meets.filter(conferences__short_name=conference_short_name)
+
+    if year := request.GET.get("year"):
+        if not year.isdigit():
+            raise BadRequest("Invalid year")
+        meets = meets.filter(date__year=year)
+
+    return paginate(request, meets, ("-date", "-id"), serialize_meet)
+
+
+@budget(queries=3, ms=250)
+@api_view(lambda request, year, slug: [meet_tag(year, slug)])
+@cache_page_with_tags(lambda request, year, slug: [meet_tag(year, slug)])
+def meet(request, year: int, slug: str):
+    meet = get_object_or_404(
+        Meet.objects.prefetch_related(
+            "conferences",
+            Prefetch("race_set", queryset=Race.objects.order_by("sex", "distance")),
+        ),
+        date__year=year,
+        slug=slug,
+    )
+
+    races = []
+    for race in meet.race_set.all():
+        race.meet = meet
+        races.append(serialize_race(race))
+
+    return JsonResponse(
+        serialize_meet(meet)
+        | {
+            "conferences": [c.short_name for c in meet.conferences.all()],
+            "races": races,
+        }
+    )
+
+
+def _get_race(year: int, slug: str, race_info: tuple[int, str, str]) -> Race:
+    distance, unit, sex = race_info
+    return get_object_or_404(
+        Race.objects.select_related("meet"),
+        meet__date__year=year,
+        meet__slug=slug,
+        distance=distance,
+        unit=unit,
+        sex=sex,
+    )
+
+
+@budget(queries=2, ms=250)
+@api_view(lambda request, year, slug, race_info: [meet_tag(year, slug)])
+@cache_page_with_tags(lambda request, year, slug, race_info: [meet_tag(year, slug)])
+def race(request, year: int, slug: str, race_info: tuple[int, str, str]):
+    """A race with its stored team scores."""
+    race = _get_race(year, slug, race_info)
+
+    team_scores = [
+        {
+            "place": team_score.place,
+            "team": serialize_team(team_score.team),
+            "score": team_score.score,
+            "tiebreaker_points": team_score.tiebreaker_points,
+            "scoring_members": team_score.scoring_members,
+            "displacers": team_score.displacers,
+        }
+        for team_score in race.top_teams()
+    ]
+
+    return JsonResponse(
+        serialize_race(race)
+        | {
+            "meet": serialize_meet(race.meet),
+            "scorers": race.scorers,
+            "displacers": race.displacers,
+            "tiebreaker": race.tiebreaker,
+            "results": reverse(
+                "api_race_results",
+                kwargs={"year": year, "slug": slug, "race_info": race_info},
+            ),
+            "team_scores": team_scores,
+        }
+    )
+
+
+@budget(queries=2, ms=500)
+@api_view(lambda request, year, slug, race_info: [meet_tag(year, slug)])
+def race_results(request, year: int, slug: str, race_info: tuple[int, str, str]):
+    """A race's results, in finishing order."""
+    race = _get_race(year, slug, race_info)
+
+    # finishing order as in `Race.top_results`, places can be missing until
+    # the race is ranked
+    results = race.result_set.select_related("team", "runner")
+    return paginate(request, results, ("time", "id"), serialize_result)
+
+
+def serialize_best(best: Best) -> dict:
+    result = best.result
+    return {
+        "seconds": best.time.total_seconds(),
+        "runner": serialize_runner(best.runner),
+        "team": result.team.slug,
+        "result": result.id,
+        "date": result.race.meet.date,
+        "race": _race_url(result.race),
+    }
+
+
+@budget(queries=1, ms=250)
+@api_view(lambda request: [LEADERBOARDS_TAG, RUNNERS_TAG, MEETS_TAG])
+def leaderboard(request):
+    """
+    Runners' bests at a distance, fastest first, in a season or all-time,
+    selected as on the leaderboard page.
+    """
+    try:
+        board = Leaderboard.from_query(request.GET)
+    except ValueError as e:
+        raise BadRequest(str(e)) from None
+
+    return paginate(request, board.entries(), ("time", "id"), serialize_best)
+
+
+@budget(queries=1, ms=250)
+@api_view(lambda request: [RUNNERS_TAG])
+def runners(request):
+    """Runners by name, optionally filtered by sex."""
+    runners = Runner.objects.only("name", "slug", "sex")
+
+    if sex := request.GET.get("sex"):
+        runners = runners.filter(sex=sex)
+
+    return paginate(request, runners, ("name", "id"), serialize_runner)
+
+
+@budget(queries=3, ms=250)
+@api_view(lambda request, slug: [runner_tag(slug)])
+@cache_page_with_tags(lambda request, slug: [runner_tag(slug)])
+def runner(request, slug: str):
+    """A runner with their roster spots and every result, most recent first."""
+    runner = get_object_or_404(Runner.objects.with_roster_spots(), slug=slug)
+
+    results = runner.result_set.select_related("race__meet", "team").order_by(
+        "-race__meet__date", "race_id"
+    )
+
+    return JsonResponse(
+        serialize_runner(runner)
+        | {
+            "roster_spots": [
+                {"year": spot.year, "team": serialize_team(spot.team)}
+                for spot in runner.get_roster_spots()
+            ],
+            "results": [
+                serialize_result(result)
+                | {
+                    "race": serialize_race(result.race),
+                    "meet": serialize_meet(result.race.meet),
+                }
+                for result in results
+            ],
+        }
+    )
+
+
+@budget(queries=2, ms=250)
+@api_view(lambda request, slug, year: [team_tag(slug)])
+@cache_page_with_tags(lambda request, slug, year: [team_tag(slug)])
+def roster(request, slug: str, year: int):
+    """A team's runners in a year."""
+    team = get_object_or_404(Team, slug=slug)
+
+    spots = (
+        RosterSpot.objects.filter(team=team, year=year)
+        .select_related("runner")
+        .order_by("runner__name", "runner_id")
+    )
+
+    return JsonResponse(
+        serialize_team(team)
+        | {
+            "year": year,
+            "runners": [
+                serialize_runner(spot.runner)
+                | {"headshot": spot.headshot.url if spot.headshot else None}
+                for spot in spots
+            ],
+        }
+    )
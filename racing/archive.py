@@ -0,0 +1,194 @@
+"""
+Re-ingestion of the raw results archive in data/raw.
+
+Each file's race is inferred from its name, e.g. "aus_2024_women.csv" is the
+women's race of the 2024 meet whose slug contains "aus". A manifest CSV
+(with file, format and meet columns) can override the parser or the meet
+slug of a file, or skip it with the "skip" format.
+
+Parsing is done by `parse_file`, which only reads the file so it can run
+in a worker process. Writing is left to the caller.
+"""
+
+import csv
+import json
+import re
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from django.conf import settings
+
+from racing.importing import Record, ResultImportError
+from racing.models import Meet, Race, Sex
+from racing.sources import get_parser
+
+RAW_DIR = settings.BASE_DIR / "data" / "raw"
+MANIFEST_NAME = "manifest.csv"
+
+# Other formats are the originals the CSV files were transcribed from
+FORMATS_BY_EXTENSION = {".csv": "csv"}
+
+SEX_WORDS = {
+    "women": Sex.FEMALE,
+    "womens": Sex.FEMALE,
+    "female": Sex.FEMALE,
+    "f": Sex.FEMALE,
+    "men": Sex.MALE,
+    "mens": Sex.MALE,
+    "male": Sex.MALE,
+    "m": Sex.MALE,
+}
+# words describing the file rather than the meet
+IGNORED_WORDS = {"raw", "standardized", "results", "indiv"}
+YEAR_PATTERN = re.compile(r"(19|20)\d\d")
+DISTANCE_PATTERN = re.compile(r"\d+k(m)?")
+
+STANDARDIZED_SUFFIX = "_standardized"
+
+
+@dataclass(frozen=True)
+class ArchiveFile:
+    path: Path
+    format: str
+    # words from the file name identifying the meet, or its slug
+    meet: str
+    year: int | None
+    sex: str | None
+    # whether `meet` is a slug given by the manifest
+    exact_meet: bool = False
+
+
+@dataclass
+class ParsedFile:
+    path: Path
+    records: list[Record] = field(default_factory=list)
+    error: str = ""
+    seconds: float = 0
+
+
+def parse_file_name(stem: str) -> tuple[str, int | None, str | None]:
+    """
+    Returns the meet words, year and sex described by a file name, e.g.
+    "canwest_championships_female_2024" gives ("canwest championships", 2024,
+    "F").
+    """
+    meet_words = []
+    year = sex = None
+    for word in re.split(r"[_\-\s]+", stem.lower()):
+        if YEAR_PATTERN.fullmatch(word):
+            year = int(word)
+        elif word in SEX_WORDS:
+            sex = SEX_WORDS[word]
+        elif (
+            word and word not in IGNORED_WORDS and not DISTANCE_PATTERN.fullmatch(word)
+        ):
+            meet_words.append(word)
+    return " ".join(meet_words), year, sex
+
+
+def read_manifest(path: Path) -> dict[str, dict]:
+    if not path.exists():
+        return {}
+
+    with open(path, newline="", encoding="utf-8") as f:
+        return {row["file"]: row for row in csv.DictReader(f)}
+
+
+def discover(directory: Path = RAW_DIR, manifest: Path | None = None):
+    """Returns the files in the archive that can be ingested."""
+    overrides = read_manifest(manifest or directory / MANIFEST_NAME)
+    paths = sorted(p for p in directory.iterdir() if p.name != MANIFEST_NAME)
+    names = {path.name for path in paths}
+
+    files = []
+    for path in paths:
+        override = overrides.get(path.name, {})
+        format = override.get("format") or FORMATS_BY_EXTENSION.get(path.suffix.lower())
+        if not format or format == "skip":
+            continue
+
+        # prefer the copy with standardized team names
+        if f"{path.stem}{STANDARDIZED_SUFFIX}{path.suffix}" in names:
+            continue
+
+        meet, year, sex = parse_file_name(path.stem)
+        files.append(
+            ArchiveFile(
+                path=path,
+                format=format,
+                meet=override.get("meet") or meet,
+                year=year,
+                sex=sex,
+                exact_meet=bool(override.get("meet")),
+            )
+        )
+    return files
+
+
+def parse_file(archive_file: ArchiveFile) -> ParsedFile:
+    """Reads and normalizes a file's records, without touching the database."""
+    parsed = ParsedFile(archive_file.path)
+    try:
+        parser = get_parser(archive_file.format)
+    except KeyError:
+        parsed.error = f'unknown format "{archive_file.format}"'
+        return parsed
+
+    start = time.perf_counter()
+    try:
+        with open(archive_file.path, "rb") as stream:
+            parsed.records = list(parser.parse(stream))
+    except ResultImportError as e:
+        parsed.error = "; ".join(e.errors)
+    # parsers report unexpected documents as ResultImportError
+    except (OSError, UnicodeDecodeError, json.JSONDecodeError) as e:
+        parsed.error = repr(e)
+    parsed.seconds = time.perf_counter() - start
+    return parsed
+
+
+def _compact(value: str) -> str:
+    return re.sub(r"[^a-z0-9]", "", value.lower())
+
+
+class RaceFinder:
+    """Finds the race an archive file holds results for."""
+
+    def __init__(self):
+        self.meets = {}
+        for meet in Meet.objects.prefetch_related("race_set"):
+            self.meets.setdefault(meet.date.year, []).append(meet)
+
+    def find(self, archive_file: ArchiveFile) -> Race:
+        """Returns the file's race, or raises LookupError explaining why not."""
+        if archive_file.year is None:
+            raise LookupError("no year in the file name")
+        if archive_file.sex is None:
+            raise LookupError("no sex in the file name")
+
+        meets = self.meets.get(archive_file.year, [])
+        if archive_file.exact_meet:
+            meets = [meet for meet in meets if meet.slug == archive_file.meet]
+        else:
+            key = _compact(archive_file.meet)
+            meets = [
+                meet
+                for meet in meets
+                if key in _compact(meet.slug) or key in _compact(meet.name)
+            ]
+
+        description = f'"{archive_file.meet}" in {archive_file.year}'
+        if not meets:
+            raise LookupError(f"no meet matches {description}")
+        if len(meets) > 1:
+            raise LookupError(f"several meets match {description}")
+
+        races = [
+            race for race in meets[0].race_set.all() if race.sex == archive_file.sex
+        ]
+        if len(races) != 1:
+            raise LookupError(
+                f"{len(races)} {archive_file.sex} races in {meets[0]}, expected 1"
+            )
+        return races[0]
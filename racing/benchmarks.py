@@ -0,0 +1,222 @@
+"""
+Benchmarks of the public pages and API, see the benchmark_views and
+benchmark_queries commands.
+
+Benchmarks run against a synthetic dataset (see racing.synthetic) in a
+throwaway test database, with a private in-memory cache, so they never
+touch real data or the site's cache. Each view is requested through the
+test client, so middleware, caching and templates are all measured.
+"""
+
+import statistics
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import get_resolver, resolve, reverse
+
+from racing import metrics
+from racing.models import Race, RosterSpot, Runner
+from racing.synthetic import DatasetSize, generate
+
+BENCHMARK_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "racing-benchmarks",
+    }
+}
+
+
+@contextmanager
+def synthetic_database(size: DatasetSize, seed: int = 0):
+    """
+    Creates a test database filled with a synthetic dataset, yielding how
+    many of each object were generated, and destroys it afterwards.
+    """
+    database_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        with override_settings(CACHES=BENCHMARK_CACHES):
+            yield generate(size, seed=seed)
+    finally:
+        connection.creation.destroy_test_db(database_name, verbosity=0)
+
+
+@dataclass
+class Sample:
+    """Typical objects to run each query or view against."""
+
+    race: Race
+    runner: Runner
+    # another runner in `race`, for head-to-heads
+    opponent: Runner
+    # a team's roster for a year
+    team_id: int
+    team_slug: str
+    year: int
+
+    @classmethod
+    def pick(cls) -> "Sample":
+        # the busiest race, runner and roster, the worst case for each page
+        race = (
+            Race.objects.select_related("meet")
+            .annotate(results=Count("result"))
+            .latest("results")
+        )
+        runner = (
+            Runner.objects.annotate(results=Count("result"))
+            .filter(result__race=race)
+            .latest("results")
+        )
+        opponent = (
+            Runner.objects.filter(result__race=race).exclude(pk=runner.pk).first()
+        )
+        roster = (
+            RosterSpot.objects.values("team_id", "team__slug", "year")
+            .annotate(runners=Count("id"))
+            .latest("runners")
+        )
+        return cls(
+            race,
+            runner,
+            opponent,
+            roster["team_id"],
+            roster["team__slug"],
+            roster["year"],
+        )
+
+
+def view_urls(sample: Sample) -> dict[str, str]:
+    """The URLs benchmarked, by label."""
+    meet = sample.race.meet
+    race_kwargs = {
+        "year": meet.date.year,
+        "slug": meet.slug,
+        "race_info": (int(sample.race.distance), sample.race.unit, sample.race.sex),
+    }
+    roster_kwargs = {"slug": sample.team_slug, "year": sample.year}
+    runner_kwargs = {"slug": sample.runner.slug}
+    last_name = sample.runner.name.split()[-1]
+
+    return {
+        "index": reverse("index"),
+        "about": reverse("about"),
+        "results": reverse("results"),
+        "results (year)": f"{reverse('results')}?year={meet.date.year}",
+        "meet": meet.get_absolute_url(),
+        "race": sample.race.get_absolute_url(),
+        "runners (search)": f"{reverse('runners')}?name={last_name}",
+        "runner": sample.runner.get_absolute_url(),
+        "runner (head-to-head)": (
+            f"{sample.runner.get_absolute_url()}?head-to-head={sample.opponent.slug}"
+        ),
+        "roster": reverse("roster", kwargs=roster_kwargs),
+        "rankings": reverse("ranking"),
+        "rankings (filtered)": (
+            f"{reverse('ranking')}?year={sample.year}&sex=M&division=USPORTS"
+        ),
+        "leaderboard": reverse("leaderboard"),
+        "leaderboard (season)": (
+            f"{reverse('leaderboard')}?distance=8km&sex=M&year={sample.year}&page=2"
+        ),
+        "api meets": reverse("api_meets"),
+        "api meet": reverse(
+            "api_meet", kwargs={"year": meet.date.year, "slug": meet.slug}
+        ),
+        "api race": reverse("api_race", kwargs=race_kwargs),
+        "api race results": (
+            f"{reverse('api_race_results', kwargs=race_kwargs)}?limit=1000"
+        ),
+        "api runners": f"{reverse('api_runners')}?limit=1000",
+        "api runner": reverse("api_runner", kwargs=runner_kwargs),
+        "api roster": reverse("api_roster", kwargs=roster_kwargs),
+        "api leaderboard": f"{reverse('api_leaderboard')}?distance=8km&sex=M",
+    }
+
+
+def uncovered_views(urls) -> set[str]:
+    """Names of the site's views that none of `urls` request."""
+    names = {
+        pattern.name
+        for pattern in get_resolver("racing.urls").url_patterns
+        if pattern.name
+    }
+    return names - {resolve(url.split("?")[0]).url_name for url in urls}
+
+
+@dataclass
+class ViewMeasurement:
+    url: str
+    status: int
+    queries: int
+    # median of requests with an empty cache
+    ms: float
+    min_ms: float
+    # a request answered from the page cache
+    cached_ms: float
+    peak_kb: float
+    bytes: int
+
+    def to_json(self) -> dict:
+        return asdict(self)
+
+
+def _get(client: Client, url: str):
+    response = client.get(url)
+    # streamed responses do their work while being consumed
+    if response.streaming:
+        content = b"".join(response.streaming_content)
+    else:
+        content = response.content
+    return response, content
+
+
+def measure(client: Client, url: str, repeat: int = 5) -> ViewMeasurement:
+    """
+    Requests `url` `repeat` times with an empty cache, then once more from
+    the cache, and once more with queries and memory traced (which slows
+    requests down, so it isn't timed).
+    """
+    seconds = []
+    for _ in range(repeat):
+        cache.clear()
+        start = time.perf_counter()
+        response, content = _get(client, url)
+        seconds.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    _get(client, url)
+    cached_seconds = time.perf_counter() - start
+
+    cache.clear()
+    tracemalloc.start()
+    try:
+        with CaptureQueriesContext(connection) as queries:
+            _get(client, url)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return ViewMeasurement(
+        url=url,
+        status=response.status_code,
+        queries=len(queries),
+        ms=statistics.median(seconds) * 1000,
+        min_ms=min(seconds) * 1000,
+        cached_ms=cached_seconds * 1000,
+        peak_kb=peak / 1024,
+        bytes=len(content),
+    )
+
+
+def benchmark_views(urls: dict[str, str], repeat: int = 5) -> dict:
+    """Measures each URL (see `view_urls`), returning measurements by label."""
+    client = Client(HTTP_HOST="testserver")
+    with metrics.quiet(), override_settings(ALLOWED_HOSTS=["testserver"]):
+        return {label: measure(client, url, repeat) for label, url in urls.items()}
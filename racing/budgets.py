@@ -0,0 +1,41 @@
+"""
+Query and time budgets of views and model methods.
+
+A budget declares the most queries a view or method may make, and the
+longest its median request may take with an empty cache, on the test
+datasets of racing.tests. Query budgets must hold at every scale those
+tests generate (up to 100 times the base dataset), so a view whose
+queries grow with the data, such as a template looping over a relation
+that wasn't prefetched, fails the tests however fast it is today.
+
+Time budgets are generous, as they must hold on slow CI machines: they
+catch a page becoming an order of magnitude slower, not a few percent
+(see the benchmark_views command for that).
+"""
+
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class Budget:
+    queries: int
+    ms: float
+
+
+def budget(queries: int, ms: float):
+    """
+    Declares the budget of a view or model method.
+
+    On views, it must be the outermost decorator, so it's found on the
+    function the URL resolves to.
+    """
+
+    def decorator(function):
+        function.budget = Budget(queries, ms)
+        return function
+
+    return decorator
+
+
+def get_budget(function) -> Budget | None:
+    return getattr(function, "budget", None)
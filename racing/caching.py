@@ -0,0 +1,268 @@
+"""
+Page caching for the public racing pages.
+
+Cached pages are keyed by their URL plus the current version of every "tag"
+(piece of data) they depend on, e.g. a meet or a runner. Changing the data
+bumps the tag's version (see racing.signals), so stale pages are simply never
+looked up again and expire on their own. Serving a cached page costs no
+database queries.
+"""
+
+import hashlib
+import time
+from datetime import datetime
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from racing.metrics import record_cache_lookup
+from racing.models import Meet, Runner, Team
+from racing.versions import touch_races, touch_runners
+
+# Home page: latest results and upcoming meets
+INDEX_TAG = "index"
+# Results page: the list of meets and conferences
+MEETS_TAG = "meets"
+# Every runner's name, slug and sex: runner pages list them all for the
+# head-to-head picker, and rankings and leaderboards show names
+RUNNERS_TAG = "runners"
+# Rankings page: season ratings, with runner and team names
+RANKINGS_TAG = "rankings"
+# Leaderboard pages: every runner's bests, with runner, team and meet names
+LEADERBOARDS_TAG = "leaderboards"
+
+
+def meet_tag(year: int, slug: str) -> str:
+    """Tag for a meet page and all of its race pages."""
+    return f"meet:{year}:{slug}"
+
+
+def runner_tag(slug: str) -> str:
+    """Tag for a runner page, including head-to-heads involving the runner."""
+    return f"runner:{slug}"
+
+
+def team_tag(slug: str) -> str:
+    """Tag for every roster page of a team."""
+    return f"team:{slug}"
+
+
+def _version_key(tag: str) -> str:
+    return f"racing:tag:{tag}"
+
+
+def get_versions(tags) -> list:
+    """
+    Returns the current version of each tag, initializing missing ones.
+
+    Versions start from the current time rather than zero, so a tag evicted
+    from the cache never comes back with a version used by an older page.
+    """
+    keys = [_version_key(tag) for tag in tags]
+    versions = cache.get_many(keys)
+
+    missing = {key: time.time_ns() for key in keys if key not in versions}
+    if missing:
+        for key, version in missing.items():
+            cache.add(key, version, None)
+        versions |= cache.get_many(list(missing))
+
+    return [versions.get(key) for key in keys]
+
+
+def invalidate(*tags):
+    """Bumps the version of each tag, orphaning every page that depends on it."""
+    version = time.time_ns()
+    cache.set_many({_version_key(tag): version for tag in set(tags)}, None)
+
+
+def page_cache_key(request, tags, daily=False) -> str:
+    parts = [
+        request.get_full_path(),
+        str(bool(getattr(request, "htmx", False))),
+        *tags,
+        *map(str, get_versions(tags)),
+    ]
+    if daily:
+        parts.append(timezone.localdate().isoformat())
+
+    digest = hashlib.md5("|".join(parts).encode(), usedforsecurity=False)
+    return f"racing:page:{digest.hexdigest()}"
+
+
+def cache_page_with_tags(get_tags, daily=False):
+    """
+    Caches a view's successful GET responses until one of its tags changes.
+
+    :param get_tags: Called with the view's arguments, returns the tags the
+        page depends on. It must not query the database.
+    :param daily: Also expire the page at midnight, for pages that depend on
+        today's date (e.g. upcoming meets).
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return view(request, *args, **kwargs)
+
+            key = page_cache_key(request, get_tags(request, *args, **kwargs), daily)
+            response = cache.get(key)
+            record_cache_lookup(hit=response is not None)
+            if response is None:
+                response = view(request, *args, **kwargs)
+                if response.status_code == 200 and not response.streaming:
+                    cache.set(key, response, settings.PAGE_CACHE_TIMEOUT)
+
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def _conditional_response(request, etag, last_modified, view, args, kwargs):
+    """
+    Returns a 304 (or 412) if the request's preconditions say so, otherwise
+    the view's response, with the ETag and Last-Modified headers set.
+
+    Pages answer htmx requests with a fragment at the same URL, so browsers
+    must not reuse one for the other.
+    """
+    etag = quote_etag(etag)
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = view(request, *args, **kwargs)
+
+    if response.status_code in (200, 304):
+        response.headers.setdefault("ETag", etag)
+        if last_modified is not None:
+            response.headers.setdefault("Last-Modified", http_date(last_modified))
+        patch_vary_headers(response, ["HX-Request"])
+
+    return response
+
+
+def condition_with_tags(get_tags):
+    """
+    Answers conditional GETs from the versions of a view's tags, like
+    Django's `condition` decorator but without querying the database.
+
+    Responses carry an ETag (the URL, whether it's an htmx request, and the
+    tag versions) and a Last-Modified date (when one of the tags last
+    changed), so a client revalidating data that hasn't changed gets a 304
+    without the view running at all.
+
+    :param get_tags: As for `cache_page_with_tags`.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return view(request, *args, **kwargs)
+
+            tags = get_tags(request, *args, **kwargs)
+            versions = get_versions(tags)
+            parts = [
+                request.get_full_path(),
+                str(bool(getattr(request, "htmx", False))),
+                *tags,
+                *map(str, versions),
+            ]
+            digest = hashlib.md5("|".join(parts).encode(), usedforsecurity=False)
+            last_modified = max(versions) // 1_000_000_000 if versions else None
+
+            return _conditional_response(
+                request, digest.hexdigest(), last_modified, view, args, kwargs
+            )
+
+        return wrapper
+
+    return decorator
+
+
+def condition_with_version(get_version):
+    """
+    Answers conditional GETs from a page's data version (see racing.versions).
+
+    The ETag covers the URL and every value in the version, Last-Modified
+    is the latest datetime among them. Checking the version is a single
+    indexed query, much cheaper than rendering the page.
+
+    :param get_version: Called with the view's arguments, returns a tuple
+        of values the page depends on, or None if there is no such page
+        (the view then runs as usual, e.g. to return a 404).
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return view(request, *args, **kwargs)
+
+            version = get_version(request, *args, **kwargs)
+            if version is None:
+                return view(request, *args, **kwargs)
+
+            parts = [
+                request.get_full_path(),
+                str(bool(getattr(request, "htmx", False))),
+                *map(str, version),
+            ]
+            digest = hashlib.md5("|".join(parts).encode(), usedforsecurity=False)
+            dates = [value for value in version if isinstance(value, datetime)]
+            last_modified = int(max(dates).timestamp()) if dates else None
+
+            return _conditional_response(
+                request, digest.hexdigest(), last_modified, view, args, kwargs
+            )
+
+        return wrapper
+
+    return decorator
+
+
+def invalidate_races(race_ids):
+    """
+    Invalidates the pages showing any of the given races: their meet pages,
+    the home page, and the pages of every runner in them. Also bumps the
+    data versions of those pages.
+    """
+    meets = Meet.objects.filter(race__in=race_ids).values_list("date__year", "slug")
+    runners = Runner.objects.filter(result__race__in=race_ids).values_list(
+        "slug", flat=True
+    )
+
+    invalidate(
+        INDEX_TAG,
+        *(meet_tag(year, slug) for year, slug in meets),
+        *(runner_tag(slug) for slug in runners),
+    )
+    touch_races(race_ids)
+
+
+def invalidate_runners(runner_ids):
+    """
+    Invalidates the pages showing any of the given runners: their own pages,
+    their teams' rosters and the meets they raced in. Also bumps the data
+    versions of those pages.
+    """
+    runners = Runner.objects.filter(pk__in=runner_ids).values_list("slug", flat=True)
+    teams = Team.objects.filter(rosterspot__runner__in=runner_ids).values_list(
+        "slug", flat=True
+    )
+    meets = Meet.objects.filter(race__result__runner__in=runner_ids).values_list(
+        "date__year", "slug"
+    )
+
+    invalidate(
+        *(runner_tag(slug) for slug in runners),
+        *(team_tag(slug) for slug in teams),
+        *(meet_tag(year, slug) for year, slug in meets),
+    )
+    touch_runners(runner_ids)
@@ -0,0 +1,216 @@
+"""
+Course difficulty, for comparing times across races.
+
+A race's difficulty is how much slower its course (and the day's
+conditions) ran than its distance alone suggests: 1.03 means 3% slower.
+It's estimated from the runners who ran several races in a season, by
+least squares on log times:
+
+    log(time) = ability of the runner that season
+                + RIEGEL * log(distance)
+                + log(difficulty of the race)
+
+Only differences between races linked by shared runners can be
+estimated, so the difficulties of each such group of races are scaled to
+a geometric mean of 1 (their typical course counts as average), and races
+sharing no runners are left at 1.
+
+Each result then stores an equivalent time over the standard distance of
+its sex (8 km for men, 6 km for women) on an average course, so times can
+be ranked across races.
+
+Results only link races through runners, so each connected component of
+races is fitted on its own: `normalize_races` refits just the components
+containing the given races, warm started from their stored difficulties,
+and writes only the values that changed.
+"""
+
+import math
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models.functions import ExtractYear
+
+from racing.models import Race, Result, Sex
+
+# exponent of Riegel's formula, time = a * distance ** RIEGEL
+RIEGEL = 1.06
+KM_PER_MILE = 1.609344
+STANDARD_KM = {Sex.MALE: 8, Sex.FEMALE: 6}
+
+# stop iterating once no log difficulty changes by more than this
+TOLERANCE = 1e-7
+MAX_ITERATIONS = 1000
+
+
+def to_km(distance, unit: str) -> float:
+    return float(distance) * (KM_PER_MILE if unit == "mi" else 1)
+
+
+def fit(
+    observations: list[tuple[int, int, float]], log_difficulties: dict[int, float]
+) -> dict[int, float]:
+    """
+    Fits races' log difficulties by alternating least squares, each
+    connected component of races averaging 0.
+
+    :param observations: (race, runner, log time less the distance term) of
+        every result of a runner with several results.
+    :param log_difficulties: Starting log difficulties, by race (0 if
+        missing).
+    :returns: The fitted log difficulty of each race observed.
+    """
+    by_runner = defaultdict(list)
+    by_race = defaultdict(list)
+    for race, runner, value in observations:
+        by_runner[runner].append((race, value))
+        by_race[race].append((runner, value))
+
+    runner_races = {
+        runner: [race for race, _ in results] for runner, results in by_runner.items()
+    }
+    components = defaultdict(list)
+    for race, component in _components(list(by_race), runner_races).items():
+        components[component].append(race)
+
+    log_difficulties = {race: log_difficulties.get(race, 0) for race in by_race}
+    for _ in range(MAX_ITERATIONS):
+        abilities = {
+            runner: sum(value - log_difficulties[race] for race, value in results)
+            / len(results)
+            for runner, results in by_runner.items()
+        }
+
+        fitted = {
+            race: sum(value - abilities[runner] for runner, value in results)
+            / len(results)
+            for race, results in by_race.items()
+        }
+        # shifting every race of a component one way and its runners the
+        # other fits as well, so fix the component's mean
+        for races in components.values():
+            mean = sum(fitted[race] for race in races) / len(races)
+            for race in races:
+                fitted[race] -= mean
+
+        change = max(
+            (abs(fitted[race] - log_difficulties[race]) for race in by_race),
+            default=0,
+        )
+        log_difficulties = fitted
+
+        if change < TOLERANCE:
+            break
+
+    return log_difficulties
+
+
+def _components(races: list[int], runner_races) -> dict[int, int]:
+    """The component (a representative race) of each race."""
+    parents = {race: race for race in races}
+
+    def find(race):
+        while parents[race] != race:
+            parents[race] = parents[parents[race]]
+            race = parents[race]
+        return race
+
+    for linked in runner_races.values():
+        first = find(linked[0])
+        for race in linked[1:]:
+            parents[find(race)] = first
+
+    return {race: find(race) for race in races}
+
+
+def normalize_races(race_ids):
+    """
+    Refits the difficulty of every race linked by runners to the given
+    races, and the equivalent times of their results.
+    """
+    years = set(
+        Race.objects.filter(pk__in=race_ids).values_list("meet__date__year", flat=True)
+    )
+    if not years:
+        return
+
+    seasons, kms, sexes, difficulties = {}, {}, {}, {}
+    races = (
+        Race.objects.filter(meet__date__year__in=years)
+        .annotate(year=ExtractYear("meet__date"))
+        .values_list("id", "year", "distance", "unit", "sex", "difficulty")
+    )
+    for race_id, year, distance, unit, sex, difficulty in races:
+        seasons[race_id] = year
+        kms[race_id] = to_km(distance, unit)
+        sexes[race_id] = sex
+        difficulties[race_id] = difficulty
+
+    results = list(
+        Result.objects.filter(race__meet__date__year__in=years).values_list(
+            "id", "race_id", "runner_id", "runner__sex", "time", "equivalent_time"
+        )
+    )
+
+    # runners are compared within a season, as they improve between them
+    runner_races = defaultdict(list)
+    for _, race_id, runner_id, _, _, _ in results:
+        if runner_id is not None:
+            runner_races[runner_id, seasons[race_id]].append(race_id)
+    runner_races = {
+        runner: linked for runner, linked in runner_races.items() if len(linked) > 1
+    }
+
+    components = _components(list(seasons), runner_races)
+    touched = {components[race_id] for race_id in race_ids if race_id in components}
+    refitted = {race_id for race_id in seasons if components[race_id] in touched}
+
+    observations = []
+    for _, race_id, runner_id, _, time, _ in results:
+        runner = (runner_id, seasons[race_id])
+        if (
+            race_id in refitted
+            and runner in runner_races
+            and kms[race_id] > 0
+            and time > timedelta(0)
+        ):
+            value = math.log(time.total_seconds()) - RIEGEL * math.log(kms[race_id])
+            observations.append((race_id, runner, value))
+
+    log_difficulties = fit(
+        observations,
+        {
+            race_id: math.log(difficulties[race_id])
+            for race_id in refitted
+            if difficulties[race_id]
+        },
+    )
+
+    changed_races = []
+    for race_id in refitted:
+        # races sharing no runners keep to their distance
+        difficulty = round(math.exp(log_difficulties.get(race_id, 0)), 6)
+        if difficulties[race_id] != difficulty:
+            difficulties[race_id] = difficulty
+            changed_races.append(Race(pk=race_id, difficulty=difficulty))
+
+    changed_results = []
+    for result_id, race_id, _, runner_sex, time, stored in results:
+        if race_id not in refitted:
+            continue
+        # mixed races are normalized to each runner's own standard
+        standard_km = STANDARD_KM.get(sexes[race_id]) or STANDARD_KM.get(runner_sex)
+        if standard_km is None or kms[race_id] <= 0:
+            equivalent = None
+        else:
+            scale = (standard_km / kms[race_id]) ** RIEGEL / difficulties[race_id]
+            equivalent = timedelta(seconds=round(time.total_seconds() * scale, 1))
+        if equivalent != stored:
+            changed_results.append(Result(pk=result_id, equivalent_time=equivalent))
+
+    with transaction.atomic():
+        Race.objects.bulk_update(changed_races, ["difficulty"], batch_size=1000)
+        Result.objects.bulk_update(
+            changed_results, ["equivalent_time"], batch_size=1000
+        )
@@ -0,0 +1,218 @@
+"""
+Static export of the public pages, see the export_site command.
+
+Every page is rendered through Django as a client would request it and
+written to a directory tree a web server can serve directly, e.g. with
+nginx:
+
+    location / {
+        gzip_static on;
+        try_files $uri $uri.html $uri/index.html @django;
+    }
+
+Requests with a query string (runner search, head-to-heads, results
+filters) still need Django behind it.
+
+Exports are incremental. A manifest in the output directory records when
+the last export started, and only pages whose data changed since (see
+racing.versions) are rendered again.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+from django.test import Client
+from django.urls import reverse
+
+from racing import metrics
+from racing.models import Meet, Race, RosterSpot, Runner
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MANIFEST_NAME = ".export.json"
+
+# pages without a data version of their own, rendered on every export
+GLOBAL_PAGES = ("index", "about", "results", "runners", "ranking", "leaderboard")
+
+COMPRESSED_SUFFIXES = (".gz", ".br")
+
+
+def page_file(output: Path, url: str) -> Path:
+    """
+    Returns where a page is written, e.g. "/results/2024/aus/" to
+    results/2024/aus/index.html and "/results/2024/aus/8km-male" to
+    results/2024/aus/8km-male.html.
+    """
+    relative = url.strip("/")
+    if url.endswith("/"):
+        return output / relative / "index.html"
+    return output / f"{relative}.html"
+
+
+@dataclass
+class Manifest:
+    """What the last export wrote, and when it started."""
+
+    exported_at: datetime | None = None
+    pages: list[str] = field(default_factory=list)
+    # pages that didn't render, retried by the next export
+    failed: list[str] = field(default_factory=list)
+    # hash of the runners listed in each sex's head-to-head picker
+    runner_lists: dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, output: Path) -> "Manifest":
+        try:
+            data = json.loads((output / MANIFEST_NAME).read_text())
+        except (OSError, ValueError):
+            return cls()
+
+        return cls(
+            exported_at=datetime.fromisoformat(data["exported_at"]),
+            pages=data["pages"],
+            failed=data.get("failed", []),
+            runner_lists=data["runner_lists"],
+        )
+
+    def save(self, output: Path):
+        data = {
+            "exported_at": self.exported_at.isoformat(),
+            "pages": self.pages,
+            "failed": self.failed,
+            "runner_lists": self.runner_lists,
+        }
+        _write_atomic(output / MANIFEST_NAME, json.dumps(data).encode())
+
+
+@dataclass
+class SitePages:
+    """Every public page, with when its data last changed."""
+
+    # None for pages that are always rendered
+    versions: dict[str, datetime | None]
+    runner_lists: dict[str, str]
+    # runner pages, by sex
+    runners: dict[str, list[str]]
+
+    @classmethod
+    def load(cls) -> "SitePages":
+        pages = cls({reverse(name): None for name in GLOBAL_PAGES}, {}, {})
+
+        for date, slug, updated_at in Meet.objects.values_list(
+            "date", "slug", "updated_at"
+        ):
+            url = reverse("meet", kwargs={"year": date.year, "slug": slug})
+            pages.versions[url] = updated_at
+
+        races = Race.objects.filter(sex__in=["M", "F"]).values_list(
+            "meet__date", "meet__slug", "distance", "unit", "sex", "updated_at"
+        )
+        for date, slug, distance, unit, sex, updated_at in races:
+            race_info = (int(distance), unit, sex)
+            url = reverse(
+                "race", kwargs={"year": date.year, "slug": slug, "race_info": race_info}
+            )
+            pages.versions[url] = updated_at
+
+        runner_lists = {}
+        for slug, name, sex, updated_at in Runner.objects.order_by("id").values_list(
+            "slug", "name", "sex", "updated_at"
+        ):
+            url = reverse("runner", kwargs={"slug": slug})
+            pages.versions[url] = updated_at
+            pages.runners.setdefault(sex, []).append(url)
+            runner_lists.setdefault(sex, hashlib.sha256()).update(
+                f"{slug}\0{name}\0".encode()
+            )
+        pages.runner_lists = {sex: h.hexdigest() for sex, h in runner_lists.items()}
+
+        rosters = RosterSpot.objects.values_list(
+            "team__slug", "year", "team__updated_at"
+        ).distinct()
+        for slug, year, updated_at in rosters:
+            url = reverse("roster", kwargs={"slug": slug, "year": year})
+            pages.versions[url] = updated_at
+
+        return pages
+
+    def stale(self, output: Path, manifest: Manifest) -> list[str]:
+        """
+        Lists the pages changed since the last export, never written or that
+        failed to render.
+        """
+        if manifest.exported_at is None:
+            return list(self.versions)
+
+        stale = {
+            url
+            for url, updated_at in self.versions.items()
+            if updated_at is None
+            or updated_at >= manifest.exported_at
+            or not page_file(output, url).exists()
+        }
+        stale.update(url for url in manifest.failed if url in self.versions)
+
+        # runner pages list every runner of the same sex to pick from
+        for sex, urls in self.runners.items():
+            if manifest.runner_lists.get(sex) != self.runner_lists[sex]:
+                stale.update(urls)
+
+        return sorted(stale)
+
+
+def _write_atomic(path: Path, content: bytes):
+    # the web server never sees a half-written file
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(f".{path.name}.tmp")
+    temporary.write_bytes(content)
+    os.replace(temporary, path)
+
+
+def write_page(path: Path, content: bytes):
+    """Writes a page and its pre-compressed variants."""
+    _write_atomic(path, content)
+    _write_atomic(path.with_name(f"{path.name}.gz"), gzip.compress(content, 9, mtime=0))
+    if brotli is not None:
+        _write_atomic(path.with_name(f"{path.name}.br"), brotli.compress(content))
+
+
+def remove_page(path: Path):
+    for suffix in ("", *COMPRESSED_SUFFIXES):
+        path.with_name(f"{path.name}{suffix}").unlink(missing_ok=True)
+
+
+_client = None
+
+
+def render_pages(output: Path, urls: list[str]) -> list[tuple[str, int]]:
+    """
+    Renders pages and writes them under `output`, returning each page's
+    status code. Pages that don't render are removed, rather than left as
+    last exported.
+    """
+    global _client
+    if _client is None:
+        # one client per process, so pages reuse the database connection
+        _client = Client(
+            HTTP_HOST=settings.ALLOWED_HOSTS[0], raise_request_exception=False
+        )
+
+    statuses = []
+    with metrics.quiet():
+        for url in urls:
+            response = _client.get(url)
+            if response.status_code == 200:
+                write_page(page_file(output, url), response.content)
+            else:
+                remove_page(page_file(output, url))
+            statuses.append((url, response.status_code))
+    return statuses
@@ -0,0 +1,103 @@
+from django.db.models import Count, F, FilteredRelation, Q
+
+from racing.models import Result, Runner
+
+
+def _common_results(runner: Runner, condition: Q):
+    """
+    Joins the runner's results to the other runners' results in the same
+    race that match `condition` (a self-join on Result through Race), one
+    row per (race, opponent) pair.
+    """
+    condition &= ~Q(race__result__runner=runner)
+    return (
+        Result.objects.filter(runner=runner)
+        .annotate(opponent=FilteredRelation("race__result", condition=condition))
+        .filter(opponent__isnull=False)
+    )
+
+
+def head_to_head(runner: Runner, opponents) -> dict[int, dict]:
+    """
+    Compares a runner against each of the given opponents in one query.
+
+    :returns: A dict keyed by opponent id, each holding the common races
+        (most recent first) and win totals for the pair. Opponents with no
+        common races get an empty record.
+
+    Example:
+
+    >>> records = head_to_head(runner, [rival_a, rival_b])
+    >>> records[rival_a.id]["wins_a"]
+    3
+    """
+    opponent_ids = [getattr(opponent, "id", opponent) for opponent in opponents]
+    records = {
+        opponent_id: {"common_races": [], "wins_a": 0, "wins_b": 0}
+        for opponent_id in opponent_ids
+    }
+
+    results = (
+        _common_results(runner, Q(race__result__runner__in=opponent_ids))
+        .annotate(
+            opponent_runner_id=F("opponent__runner_id"),
+            opponent_time=F("opponent__time"),
+            opponent_place=F("opponent__place"),
+        )
+        .select_related("race__meet")
+        .order_by("-race__meet__date", "race_id")
+    )
+
+    for result in results:
+        record = records[result.opponent_runner_id]
+        record["common_races"].append(
+            {
+                "race": result.race,
+                "meet": result.race.meet,
+                "runnerA": {"time": result.time, "position": result.place},
+                "runnerB": {
+                    "time": result.opponent_time,
+                    "position": result.opponent_place,
+                },
+                "time_diff": abs(result.time - result.opponent_time),
+            }
+        )
+        if result.time < result.opponent_time:
+            record["wins_a"] += 1
+        elif result.opponent_time < result.time:
+            record["wins_b"] += 1
+
+    return records
+
+
+def rivals(runner: Runner, limit: int = 10) -> list[dict]:
+    """
+    Returns the runner's most frequent opponents with head-to-head totals.
+
+    Each entry has the opponent `runner`, the number of common `races`, and
+    the runner's `wins` and `losses` against them. Totals are aggregated in
+    the database, so this costs two queries regardless of career length.
+    """
+    totals = (
+        _common_results(runner, Q(race__result__runner__isnull=False))
+        .values(opponent_runner_id=F("opponent__runner_id"))
+        .annotate(
+            races=Count("id"),
+            wins=Count("id", filter=Q(time__lt=F("opponent__time"))),
+            losses=Count("id", filter=Q(time__gt=F("opponent__time"))),
+        )
+        .order_by("-races", "opponent_runner_id")[:limit]
+    )
+    totals = list(totals)
+
+    runners = Runner.objects.in_bulk([row["opponent_runner_id"] for row in totals])
+
+    return [
+        {
+            "runner": runners[row["opponent_runner_id"]],
+            "races": row["races"],
+            "wins": row["wins"],
+            "losses": row["losses"],
+        }
+        for row in totals
+    ]
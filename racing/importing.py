@@ -0,0 +1,239 @@
+"""
+Fast importing of race results from CSV files and other sources.
+
+The admin's import-export path resolves each row on its own and previews a
+diff before writing. `import_records` instead streams records, resolves
+every team in a single query, validates each column in one pass and writes
+all results with one bulk insert.
+
+Records come from a CSV file (`import_results`) or any of the parsers in
+racing.sources.
+"""
+
+import codecs
+import csv
+from bisect import bisect_right
+from collections import Counter
+from dataclasses import dataclass, field
+
+from django.db import transaction
+
+from racing.aliases import TeamResolver
+from racing.models import Race, Result
+from racing.names import normalize_name
+from racing.ranking import defer_ranking, refresh_race
+from racing.times import DNF, DNS, DQ, INVALID, parse_times
+
+REQUIRED_COLUMNS = ("name", "time", "team")
+
+# errors listed before the rest are summarized
+MAX_REPORTED_ERRORS = 20
+
+
+class ResultImportError(Exception):
+    """Raised with every problem found in a file, before anything is written."""
+
+    def __init__(self, errors: list[str]):
+        self.errors = errors
+        super().__init__("; ".join(errors))
+
+
+@dataclass
+class Record:
+    """A single result as read from a source, before it is validated."""
+
+    name: str
+    team: str
+    time: str
+    points: str | int | None = None
+    # where the record came from, for error messages, e.g. "Line 4"
+    location: str = ""
+
+
+@dataclass
+class ResultColumns:
+    """Records' values, column by column, with where each came from."""
+
+    locations: list[str]
+    names: list[str]
+    times: list[str]
+    teams: list[str]
+    points: list[str]
+
+    @classmethod
+    def from_records(cls, records) -> "ResultColumns":
+        columns = cls([], [], [], [], [])
+        for index, record in enumerate(records, start=1):
+            columns.locations.append(record.location or f"Result {index}")
+            columns.names.append(_clean(record.name))
+            columns.times.append(_clean(record.time))
+            columns.teams.append(_clean(record.team))
+            columns.points.append(_clean(record.points))
+        return columns
+
+
+def _clean(value) -> str:
+    return "" if value is None else str(value).strip()
+
+
+def read_csv(lines):
+    """
+    Yields a Record for each row of a CSV file with name, time, team and
+    optional points columns, in any order.
+    """
+    reader = csv.DictReader(lines)
+    missing = [c for c in REQUIRED_COLUMNS if c not in (reader.fieldnames or ())]
+    if missing:
+        raise ResultImportError([f"Missing columns: {', '.join(missing)}"])
+
+    for row in reader:
+        if not any(row.values()):
+            continue
+        yield Record(
+            name=row["name"],
+            team=row["team"],
+            time=row["time"],
+            points=row.get("points"),
+            location=f"Line {reader.line_num}",
+        )
+
+
+def parse_points(value: str) -> int | None:
+    return int(value) if value else None
+
+
+@dataclass
+class ImportSummary:
+    imported: int
+    # runners who didn't finish, by marker (DNF, DNS or DQ)
+    skipped: Counter = field(default_factory=Counter)
+
+    def __str__(self):
+        summary = f"{self.imported} results"
+        if self.skipped:
+            skipped = ", ".join(f"{n} {marker}" for marker, n in self.skipped.items())
+            summary += f" (skipped {skipped})"
+        return summary
+
+
+def import_results(race: Race, file, encoding: str = "utf-8-sig") -> ImportSummary:
+    """
+    Imports the results in a CSV file (with name, time, team and optional
+    points columns) into a race.
+
+    :param file: An uploaded file or any other iterable of byte lines.
+    """
+    return import_records(race, read_csv(codecs.iterdecode(file, encoding)))
+
+
+def import_records(race: Race, records, replace: bool = False) -> ImportSummary:
+    """
+    Imports records into a race.
+
+    Teams are matched on their full name or an alias (see racing.aliases).
+    Runners marked as DNF, DNS or DQ are skipped. Nothing is written unless
+    every other record is valid, otherwise ResultImportError lists the
+    problems.
+
+    :param replace: Delete the race's existing results first. Runners
+        assigned to them are assigned to the new result with the same name
+        and team.
+    """
+    columns = ResultColumns.from_records(records)
+    if not columns.names:
+        raise ResultImportError(["There are no results to import"])
+
+    resolver = TeamResolver(race.sex)
+    teams = {name: resolver.resolve(name) for name in set(columns.teams)}
+    times = parse_times(columns.times)
+
+    max_name_length = Result._meta.get_field("name").max_length
+    summary = ImportSummary(0)
+    errors = []
+    results = []
+    for where, name, time, team, value, duration, marker in zip(
+        columns.locations,
+        columns.names,
+        columns.times,
+        columns.teams,
+        columns.points,
+        times.durations,
+        times.markers,
+        strict=True,
+    ):
+        if marker in (DNF, DNS, DQ):
+            summary.skipped[marker] += 1
+            continue
+
+        if not name:
+            errors.append(f"{where}: missing name")
+        elif len(name) > max_name_length:
+            errors.append(f"{where}: name longer than {max_name_length}")
+        if marker == INVALID:
+            errors.append(f'{where}: invalid time "{time}"')
+        if teams[team] is None:
+            errors.append(f'{where}: unknown team "{team}"')
+        try:
+            points = parse_points(value)
+        except ValueError:
+            errors.append(f'{where}: invalid points "{value}"')
+            continue
+
+        results.append(
+            Result(race=race, name=name, time=duration, team=teams[team], points=points)
+        )
+
+    if errors:
+        if len(errors) > MAX_REPORTED_ERRORS:
+            more = len(errors) - MAX_REPORTED_ERRORS
+            errors = errors[:MAX_REPORTED_ERRORS] + [f"...and {more} more"]
+        raise ResultImportError(errors)
+
+    with transaction.atomic():
+        if replace:
+            runners = _delete_results(race)
+            for result in results:
+                key = (normalize_name(result.name), result.team_id)
+                result.runner_id = runners.get(key)
+
+        _place_new_results(race, results)
+        Result.objects.bulk_create(results, batch_size=500)
+        # bulk inserts skip signals, so rank and score the race here, only
+        # results already in the race can still need their place updating
+        refresh_race(race.id)
+
+    summary.imported = len(results)
+    return summary
+
+
+def _delete_results(race: Race) -> dict:
+    """
+    Deletes a race's results, returning the runners that were assigned to
+    them keyed by (normalized name, team id).
+    """
+    runners = {
+        (normalize_name(name), team_id): runner_id
+        for name, team_id, runner_id in race.result_set.filter(
+            runner__isnull=False
+        ).values_list("name", "team_id", "runner_id")
+    }
+
+    with defer_ranking():
+        race.result_set.all().delete()
+
+    return runners
+
+
+def _place_new_results(race: Race, results: list[Result]):
+    """
+    Sorts new results into insertion order and sets their places among the
+    race's existing results, the same way racing.ranking would.
+
+    New results get higher ids than existing ones, so they place after any
+    existing result with the same time.
+    """
+    existing_times = sorted(race.result_set.values_list("time", flat=True))
+
+    results.sort(key=lambda result: result.time)
+    for index, result in enumerate(results):
+        result.place = bisect_right(existing_times, result.time) + index + 1
@@ -0,0 +1,67 @@
+"""
+Leaderboards: the fastest runners at a distance, in a season or ever.
+
+Pages read SeasonBest and CareerBest rows (one per runner and distance,
+see racing.stats) through indexes ordered by time, so they cost the same
+however many results there are.
+"""
+
+import re
+from dataclasses import dataclass
+from decimal import Decimal
+
+from racing.models import CareerBest, SeasonBest, Sex
+
+# distances offered in the leaderboard page's menu, others can be linked to
+LEADERBOARD_DISTANCES = ("6km", "8km", "10km")
+DISTANCE_PATTERN = re.compile(r"(\d{1,3}(?:\.\d{1,2})?)(km|mi)")
+
+
+@dataclass(frozen=True)
+class Leaderboard:
+    distance: Decimal = Decimal(6)
+    unit: str = "km"
+    sex: str = Sex.FEMALE
+    # None for all-time
+    year: int | None = None
+
+    @classmethod
+    def from_query(cls, query) -> "Leaderboard":
+        """
+        The leaderboard selected by GET parameters, e.g.
+        ?distance=8km&sex=M&year=2024, with any left out defaulting to the
+        women's all-time 6 km. Raises ValueError on invalid parameters.
+        """
+        default = cls()
+        distance, unit = default.distance, default.unit
+        if value := query.get("distance"):
+            if not (match := DISTANCE_PATTERN.fullmatch(value)):
+                raise ValueError("Invalid distance")
+            distance, unit = Decimal(match[1]), match[2]
+
+        sex = query.get("sex") or default.sex
+        if sex not in (Sex.FEMALE, Sex.MALE):
+            raise ValueError("Invalid sex")
+
+        year = query.get("year") or None
+        if year is not None:
+            if not year.isdigit():
+                raise ValueError("Invalid year")
+            year = int(year)
+
+        return cls(distance=distance, unit=unit, sex=sex, year=year)
+
+    @property
+    def distance_param(self) -> str:
+        """The distance as in GET parameters, e.g. "8km"."""
+        return f"{self.distance.normalize():f}{self.unit}"
+
+    def entries(self):
+        """The leaderboard's bests, unordered."""
+        if self.year is None:
+            bests = CareerBest.objects.all()
+        else:
+            bests = SeasonBest.objects.filter(year=self.year)
+        return bests.filter(
+            sex=self.sex, distance=self.distance, unit=self.unit
+        ).select_related("runner", "result__team", "result__race__meet")
@@ -1,11 +1,89 @@
-import unicodedata
+import csv
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
 
-from thefuzz import fuzz
-
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
 from django.utils.text import slugify
 
-from racing.models import Result, RosterSpot, Runner
+from racing.caching import RUNNERS_TAG, invalidate, invalidate_races, invalidate_runners
+from racing.courses import normalize_races
+from racing.matching import RunnerMatcher
+from racing.models import Race, Result, RosterSpot, Runner
+from racing.names import normalize_name
+from racing.ratings import mark_stale
+from racing.stats import update_runner_stats
+
+REVIEW_FIELDS = ["result_id", "race_id", "name", "team", "candidates", "decision"]
+
+
+@dataclass
+class RaceContext:
+    """
+    Everything needed to match a race's results, loaded in a fixed number of
+    queries, and the writes to flush in bulk once the race is matched.
+
+    Nothing is written while matching, which may wait on prompts, so no
+    transaction or lock is held meanwhile.
+    """
+
+    race: Race
+    results: list[Result]
+    # normalized name -> runners with that name, of any sex
+    runners_by_name: dict[str, list[Runner]]
+    # (runner id, year) -> team id, including spots not written yet
+    spot_teams: dict[tuple[int, int], int]
+
+    # runners to create, unsaved until the race is flushed
+    new_runners: list[Runner] = field(default_factory=list)
+    roster_spots: list[RosterSpot] = field(default_factory=list)
+    assigned: list[Result] = field(default_factory=list)
+
+    @classmethod
+    def load(cls, race: Race, results) -> "RaceContext":
+        results = list(results)
+        for result in results:
+            result.race = race
+
+        names = {normalize_name(result.name) for result in results}
+        runners_by_name = defaultdict(list)
+        for runner in Runner.objects.filter(search_name__in=names).order_by("id"):
+            runners_by_name[runner.search_name].append(runner)
+
+        year = race.meet.date.year
+        spot_teams = {
+            (runner_id, year): team_id
+            for runner_id, team_id in RosterSpot.objects.filter(year=year)
+            .order_by("-id")
+            .values_list("runner_id", "team_id")
+        }
+
+        return cls(race, results, runners_by_name, spot_teams)
+
+    @property
+    def year(self) -> int:
+        return self.race.meet.date.year
+
+
+class Profile:
+    """Query counts and time spent in each phase of the command."""
+
+    def __init__(self):
+        self.queries = Counter()
+        self.seconds = Counter()
+
+    @contextmanager
+    def phase(self, name: str):
+        def count_query(execute, sql, params, many, context):
+            self.queries[name] += 1
+            return execute(sql, params, many, context)
+
+        start = time.perf_counter()
+        with connection.execute_wrapper(count_query):
+            yield
+        self.seconds[name] += time.perf_counter() - start
 
 
 class Command(BaseCommand):
@@ -14,164 +92,289 @@ class Command(BaseCommand):
     )
 
     SIMILARITY_THRESHOLD = 75
+    AUTO_ACCEPT_THRESHOLD = 95
 
     def add_arguments(self, parser):
         parser.add_argument(
-            "race_id", type=int, help="ID of the race to filter results"
+            "race_ids", nargs="*", type=int, help="IDs of the races to match"
+        )
+        parser.add_argument(
+            "--meet",
+            type=int,
+            action="append",
+            dest="meet_ids",
+            default=[],
+            help="Match every race in a meet (by ID), can be repeated",
+        )
+        parser.add_argument("--year", type=int, help="Match every race in a season")
+        parser.add_argument("--all", action="store_true", help="Match every race")
+        parser.add_argument(
+            "--batch",
+            action="store_true",
+            help=(
+                "Never prompt: accept confident fuzzy matches and write "
+                "ambiguous results to --review-file"
+            ),
+        )
+        parser.add_argument(
+            "--auto-accept",
+            type=int,
+            default=self.AUTO_ACCEPT_THRESHOLD,
+            help="Similarity (0-100) at which batch mode accepts a fuzzy match",
+        )
+        parser.add_argument(
+            "--review-file", help="CSV file to write ambiguous results to"
+        )
+        parser.add_argument(
+            "--apply",
+            metavar="REVIEW_FILE",
+            help=(
+                "Apply a review file whose decision column has been filled "
+                'with a runner ID, "new" or left blank to skip'
+            ),
+        )
+        parser.add_argument(
+            "--profile",
+            action="store_true",
+            help="Report the queries and time spent in each phase",
         )
 
-    def _check_sex_match(self, result: Result, runner: Runner):
-        if result.race.sex != runner.sex:
-            self.stdout.write(
-                self.style.WARNING(
-                    f"Sex mismatch - Result: {result.sex}, Runner: {runner.sex}"
+    def handle(self, *args, **kwargs):
+        self.batch = kwargs["batch"]
+        self.auto_accept = kwargs["auto_accept"]
+        self.profile = Profile() if kwargs["profile"] else None
+        self.matchers = {}
+        self.slugs = None
+        self.reviews = []
+        # races with new assignments, linked to other races by their runners
+        self.linked_race_ids = set()
+
+        if kwargs["apply"]:
+            self._apply_review_file(kwargs["apply"])
+        else:
+            if self.batch and not kwargs["review_file"]:
+                raise CommandError(
+                    "--batch needs a --review-file for ambiguous results"
                 )
-            )
-            return False
 
-        return True
+            with self._phase("load"):
+                races = self._get_races(kwargs)
+            if not races:
+                raise CommandError("No races selected")
 
-    def _check_team_match(self, result: Result, runner: Runner):
-        """Check if runner has roster spot matching result team/year"""
-        year = result.race.meet.date.year
-        roster_spot = RosterSpot.objects.filter(runner=runner, year=year).first()
+            for race in races:
+                self._match_race(race)
 
-        if roster_spot and roster_spot.team != result.team:
-            self.stdout.write(
-                self.style.WARNING(
-                    f"Team mismatch - Result team: {result.team}, "
-                    f"Roster team: {roster_spot.team} ({year})"
-                )
-            )
-            return False
+            if self.reviews:
+                self._write_review_file(kwargs["review_file"])
 
-        return True
+        # once for every race, as races share a season's fit
+        with self._phase("flush"):
+            normalize_races(self.linked_race_ids)
+            mark_stale(self.linked_race_ids)
 
-    def _create_roster_spot(self, result: Result, runner: Runner):
-        """Create roster spot for runner on result team/year"""
-        year = result.race.meet.date.year
-        roster_spot = RosterSpot.objects.create(
-            runner=runner, team=result.team, year=year
-        )
-        self.stdout.write(
-            self.style.SUCCESS(
-                f"Created roster spot for {runner.name} on {result.team} ({year})"
-            )
-        )
-        return roster_spot
+        if self.profile:
+            self._write_profile()
 
-    def _normalize_text(self, text: str) -> str:
-        """Normalize unicode text by removing accents and converting to lowercase."""
-        return (
-            unicodedata.normalize("NFKD", text.lower())
-            .encode("ASCII", "ignore")
-            .decode("ASCII")
-        )
+    def _phase(self, name: str):
+        return self.profile.phase(name) if self.profile else nullcontext()
 
-    def handle(self, *args, **kwargs):
-        race_id = kwargs["race_id"]
-        results = Result.objects.filter(race_id=race_id, runner__isnull=True)
+    def _get_races(self, kwargs):
+        races = Race.objects.select_related("meet").order_by("meet__date", "id")
 
-        for result in results:
-            # First try exact match
-            exact_matches = Runner.objects.filter(name=result.name)
-
-            if exact_matches.count() == 1:
-                runner = exact_matches.first()
-                if self._check_sex_match(result, runner):
-                    self._assign_runner(result, runner, "existing")
-                continue
-            elif exact_matches.count() > 1:
-                filtered_matches = [
-                    r for r in exact_matches if r.sex == result.race.sex
-                ]
-                if filtered_matches:
-                    self._handle_multiple_matches(result, filtered_matches)
-                else:
-                    self.stdout.write(
-                        self.style.WARNING(
-                            f"Multiple matches found but none match sex ({result.race.sex}) for {result.name}"
-                        )
-                    )
-                continue
+        if kwargs["all"]:
+            return list(races)
+
+        selected = races.none()
+        if kwargs["race_ids"]:
+            selected |= races.filter(pk__in=kwargs["race_ids"])
+        if kwargs["meet_ids"]:
+            selected |= races.filter(meet__in=kwargs["meet_ids"])
+        if kwargs["year"]:
+            selected |= races.filter(meet__date__year=kwargs["year"])
+        return list(selected)
+
+    def _match_race(self, race: Race):
+        self.stdout.write(f"Matching {race}")
 
-            # Try fuzzy matching if no exact match
-            fuzzy_matches = []
-            all_runners = Runner.objects.filter(sex=result.race.sex)
-            normalized_result_name = self._normalize_text(result.name)
+        with self._phase("load"):
+            results = (
+                race.result_set.filter(runner__isnull=True)
+                .select_related("team")
+                .order_by("time", "id")
+            )
+            context = RaceContext.load(race, results)
+        # build outside of the match phase so its queries are counted apart
+        self._get_matcher(race.sex)
 
-            for runner in all_runners:
-                normalized_runner_name = self._normalize_text(runner.name)
-                ratio = fuzz.ratio(normalized_result_name, normalized_runner_name)
-                if ratio >= self.SIMILARITY_THRESHOLD:
-                    fuzzy_matches.append((runner, ratio))
+        try:
+            with self._phase("match"):
+                for result in context.results:
+                    self._match_result(result, context)
+        except KeyboardInterrupt:
+            # keep the decisions already made at the prompts
+            self._flush(context)
+            raise
+        self._flush(context)
 
-            if fuzzy_matches:
-                # Sort by similarity ratio descending
-                fuzzy_matches.sort(key=lambda x: x[1], reverse=True)
+    def _match_result(self, result: Result, context: RaceContext):
+        # First try exact match
+        exact_matches = context.runners_by_name.get(normalize_name(result.name), [])
 
+        if len(exact_matches) == 1:
+            runner = exact_matches[0]
+            if self._check_sex_match(result, runner):
+                self._assign_runner(result, runner, "existing", context)
+            return
+        elif len(exact_matches) > 1:
+            filtered_matches = [r for r in exact_matches if r.sex == result.race.sex]
+            if filtered_matches:
+                self._handle_multiple_matches(result, filtered_matches, context)
+            else:
                 self.stdout.write(
                     self.style.WARNING(
-                        f"Found similar names for {result.name} ({result.race.sex}):"
+                        f"Multiple matches found but none match sex ({result.race.sex}) for {result.name}"
                     )
                 )
-                for i, (runner, ratio) in enumerate(fuzzy_matches, start=1):
-                    self.stdout.write(
-                        f"{i}: {runner.name} (ID: {runner.id}, Sex: {runner.sex}, Similarity: {ratio}%)"
-                    )
+            return
+
+        # Try fuzzy matching if no exact match
+        fuzzy_matches = self._get_matcher(result.race.sex).fuzzy(
+            result.name, self.SIMILARITY_THRESHOLD
+        )
+
+        if not fuzzy_matches:
+            self._create_runner(result, context)
+        elif self.batch and self._is_confident(fuzzy_matches):
+            self._assign_runner(result, fuzzy_matches[0][0], "auto-matched", context)
+        elif self.batch:
+            self._add_review(result, fuzzy_matches)
+        else:
+            self._handle_fuzzy_matches(result, fuzzy_matches, context)
 
-                choice = input(
-                    'Enter number to select matching runner, "n" to create new, '
-                    "or press Enter to skip: "
+    def _is_confident(self, fuzzy_matches) -> bool:
+        """A match is confident if it is similar enough and clearly the best."""
+        best_similarity = fuzzy_matches[0][1]
+        runner_up_similarity = fuzzy_matches[1][1] if len(fuzzy_matches) > 1 else 0
+        return (
+            best_similarity >= self.auto_accept
+            and best_similarity > runner_up_similarity
+        )
+
+    def _check_sex_match(self, result: Result, runner: Runner):
+        if result.race.sex != runner.sex:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"Sex mismatch - Result: {result.race.sex}, Runner: {runner.sex}"
                 )
+            )
+            return False
 
-                if choice.isdigit() and 1 <= int(choice) <= len(fuzzy_matches):
-                    self._assign_runner(
-                        result, fuzzy_matches[int(choice) - 1][0], "fuzzy-matched"
-                    )
-                elif choice.lower() == "n":
-                    self._create_runner(result)
-                else:
-                    self.stdout.write(
-                        self.style.WARNING(
-                            f"Skipped assigning runner to result {result}"
-                        )
-                    )
-            else:
-                self._create_runner(result)
+        return True
 
-    def _assign_runner(self, result, runner, match_type):
-        # Check/create roster spot
-        year = result.race.meet.date.year
-        roster_spot = RosterSpot.objects.filter(runner=runner, year=year).first()
+    def _create_roster_spot(self, result: Result, runner: Runner, context):
+        """Queue a roster spot for runner on result team/year"""
+        context.roster_spots.append(
+            RosterSpot(runner=runner, team=result.team, year=context.year)
+        )
+        if runner.pk is not None:
+            context.spot_teams[(runner.id, context.year)] = result.team_id
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created roster spot for {runner.name} on {result.team} "
+                f"({context.year})"
+            )
+        )
+
+    def _get_matcher(self, sex: str) -> RunnerMatcher:
+        """Returns the fuzzy matcher for runners of a sex, building it once."""
+        if sex not in self.matchers:
+            with self._phase("index"):
+                self.matchers[sex] = RunnerMatcher(
+                    Runner.objects.filter(sex=sex).only("name", "search_name", "sex")
+                )
+        return self.matchers[sex]
 
-        if not roster_spot:
-            roster_spot = self._create_roster_spot(result, runner)
-        elif roster_spot.team != result.team:
+    def _assign_runner(self, result, runner, match_type, context):
+        # Check/create roster spot, new runners have none yet
+        roster_team_id = None
+        if runner.pk is not None:
+            roster_team_id = context.spot_teams.get((runner.id, context.year))
+
+        if roster_team_id is None:
+            self._create_roster_spot(result, runner, context)
+        elif roster_team_id != result.team_id:
             self.stdout.write(
                 self.style.WARNING(
                     f"Not assigning - Team mismatch for {runner.name}: "
-                    f"Result team: {result.team}, Roster team: {roster_spot.team} ({year})"
+                    f"Result team: {result.team}, Roster team ID: {roster_team_id} ({context.year})"
                 )
             )
             return
 
         result.runner = runner
-        result.save()
+        context.assigned.append(result)
         self.stdout.write(
             self.style.SUCCESS(
-                f"Assigned {match_type} runner {runner.name} ({runner.sex}) to result {result}"
+                f"Assigned {match_type} runner {runner.name} ({runner.sex}) to result {result.name}"
             )
         )
 
-    def _create_runner(self, result):
-        runner = Runner.objects.create(
-            name=result.name, slug=slugify(result.name), sex=result.race.sex
+    def _create_runner(self, result, context):
+        # Saved when the race is flushed, for later races to match. Nobody
+        # finishes a race twice, so its other results needn't match it.
+        runner = Runner(
+            name=result.name,
+            search_name=normalize_name(result.name),
+            slug=self._get_unique_slug(result.name),
+            sex=result.race.sex,
         )
-        self._create_roster_spot(result, runner)
-        self._assign_runner(result, runner, "new")
+        context.new_runners.append(runner)
+        self._assign_runner(result, runner, "new", context)
+
+    def _get_unique_slug(self, name: str) -> str:
+        if self.slugs is None:
+            self.slugs = set(Runner.objects.values_list("slug", flat=True))
+
+        base = slug = slugify(name)
+        suffix = 2
+        while slug in self.slugs:
+            slug = f"{base}-{suffix}"
+            suffix += 1
+
+        self.slugs.add(slug)
+        return slug
+
+    def _flush(self, context: RaceContext):
+        """Write a race's new runners, roster spots and assignments in bulk."""
+        with self._phase("flush"), transaction.atomic():
+            # sets the new runners' ids, and so their spots' and results'
+            Runner.objects.bulk_create(context.new_runners)
+            RosterSpot.objects.bulk_create(context.roster_spots)
+            Result.objects.bulk_update(context.assigned, ["runner"])
+
+            # bulk writes skip signals, runners don't change places or team
+            # scores so only the cached pages and runners' stats need updating
+            # here, and course difficulties and ratings once every race is
+            # matched
+            runner_ids = [result.runner_id for result in context.assigned]
+            if runner_ids:
+                self.linked_race_ids.add(context.race.id)
+            if context.new_runners:
+                invalidate(RUNNERS_TAG)
+            invalidate_races([context.race.id])
+            invalidate_runners(runner_ids)
+            update_runner_stats(runner_ids)
+
+        for runner in context.new_runners:
+            if runner.sex in self.matchers:
+                self.matchers[runner.sex].add(runner)
+
+    def _handle_multiple_matches(self, result, matches, context):
+        if self.batch:
+            self._add_review(result, [(runner, 100) for runner in matches])
+            return
 
-    def _handle_multiple_matches(self, result, matches):
         self.stdout.write(
             self.style.WARNING(f"Multiple exact matches for {result.name}:")
         )
@@ -182,8 +385,113 @@ class Command(BaseCommand):
         choice = input("Enter number to select runner or press Enter to skip: ")
 
         if choice.isdigit() and 1 <= int(choice) <= len(matches):
-            self._assign_runner(result, matches[int(choice) - 1], "selected")
+            self._assign_runner(result, matches[int(choice) - 1], "selected", context)
+        else:
+            self.stdout.write(
+                self.style.WARNING(f"Skipped assigning runner to result {result}")
+            )
+
+    def _handle_fuzzy_matches(self, result, fuzzy_matches, context):
+        self.stdout.write(
+            self.style.WARNING(
+                f"Found similar names for {result.name} ({result.race.sex}):"
+            )
+        )
+        for i, (runner, ratio) in enumerate(fuzzy_matches, start=1):
+            self.stdout.write(
+                f"{i}: {runner.name} (ID: {runner.id}, Sex: {runner.sex}, Similarity: {ratio}%)"
+            )
+
+        choice = input(
+            'Enter number to select matching runner, "n" to create new, '
+            "or press Enter to skip: "
+        )
+
+        if choice.isdigit() and 1 <= int(choice) <= len(fuzzy_matches):
+            self._assign_runner(
+                result, fuzzy_matches[int(choice) - 1][0], "fuzzy-matched", context
+            )
+        elif choice.lower() == "n":
+            self._create_runner(result, context)
         else:
             self.stdout.write(
                 self.style.WARNING(f"Skipped assigning runner to result {result}")
             )
+
+    def _add_review(self, result: Result, candidates):
+        self.reviews.append(
+            {
+                "result_id": result.id,
+                "race_id": result.race_id,
+                "name": result.name,
+                "team": result.team.full_name,
+                "candidates": " | ".join(
+                    f"{runner.id}: {runner.name} ({similarity}%)"
+                    for runner, similarity in candidates
+                ),
+                "decision": "",
+            }
+        )
+        self.stdout.write(self.style.WARNING(f"Queued {result.name} for review"))
+
+    def _write_review_file(self, path: str):
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=REVIEW_FIELDS)
+            writer.writeheader()
+            writer.writerows(self.reviews)
+
+        self.stdout.write(
+            self.style.WARNING(f"Wrote {len(self.reviews)} results to review to {path}")
+        )
+
+    def _apply_review_file(self, path: str):
+        with open(path, newline="", encoding="utf-8") as f:
+            decisions = {
+                int(row["result_id"]): row["decision"].strip().lower()
+                for row in csv.DictReader(f)
+                if row["decision"].strip()
+            }
+
+        with self._phase("load"):
+            results = (
+                Result.objects.filter(pk__in=decisions, runner__isnull=True)
+                .select_related("race__meet", "team")
+                .order_by("race_id", "time", "id")
+            )
+            runners = Runner.objects.in_bulk(
+                [int(decision) for decision in decisions.values() if decision.isdigit()]
+            )
+
+            results_by_race = defaultdict(list)
+            for result in results:
+                results_by_race[result.race].append(result)
+
+        for race, race_results in results_by_race.items():
+            with self._phase("load"):
+                context = RaceContext.load(race, race_results)
+
+            with self._phase("match"):
+                for result in context.results:
+                    self._apply_decision(result, decisions[result.id], runners, context)
+            self._flush(context)
+
+    def _apply_decision(self, result, decision, runners, context):
+        if decision == "new":
+            self._create_runner(result, context)
+        elif decision.isdigit() and int(decision) in runners:
+            runner = runners[int(decision)]
+            self._assign_runner(result, runner, "reviewed", context)
+        else:
+            self.stdout.write(
+                self.style.WARNING(
+                    f'Skipped {result.name}: unknown decision "{decision}"'
+                )
+            )
+
+    def _write_profile(self):
+        self.stdout.write("Phase      Queries    Seconds")
+        for name in ("load", "index", "match", "flush"):
+            self.stdout.write(
+                f"{name:<10} {self.profile.queries[name]:>7} "
+                f"{self.profile.seconds[name]:>10.3f}"
+            )
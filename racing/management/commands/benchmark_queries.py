@@ -0,0 +1,125 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+
+from racing.benchmarks import Sample, synthetic_database
+from racing.models import Meet, Race, Result, RosterSpot, Runner
+from racing.synthetic import DatasetSize, add_size_arguments, size_from_options
+
+# the schema before the indexes matched to these queries
+BEFORE_INDEXES = ("racing", "0045_meet_updated_at_race_updated_at_and_more")
+
+
+# the hot queries of racing.views, racing.api and racing.ranking
+QUERIES = {
+    "race results (Race.top_results)": lambda s: Result.objects.filter(
+        race=s.race
+    ).order_by("time", "id"),
+    "race ranking (rank_race)": lambda s: (
+        Result.objects.filter(race=s.race).order_by("time", "id").only("id", "place")
+    ),
+    "runner results": lambda s: (
+        Result.objects.filter(runner=s.runner)
+        .select_related("race__meet")
+        .order_by("-race__meet__date")
+    ),
+    "runner roster spots": lambda s: RosterSpot.objects.filter(
+        runner=s.runner
+    ).order_by("-year", "id"),
+    "team roster": lambda s: (
+        Runner.objects.filter(rosterspot__team_id=s.team_id, rosterspot__year=s.year)
+        .distinct()
+        .order_by("name")
+    ),
+    "meets by date": lambda s: Meet.objects.order_by("-date")[:25],
+    "meets in a year": lambda s: Meet.objects.filter(
+        date__year=s.race.meet.date.year
+    ).order_by("-date"),
+    "race lookup (RaceConverter)": lambda s: Race.objects.filter(
+        meet=s.race.meet,
+        distance=s.race.distance,
+        unit=s.race.unit,
+        sex=s.race.sex,
+    ),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the hot queries and print their EXPLAIN plans, before and after "
+        "the query-matched indexes, on a synthetic dataset in a test database"
+    )
+
+    def add_arguments(self, parser):
+        add_size_arguments(
+            parser, DatasetSize(seasons=10, meets_per_season=10, teams=60)
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=20, help="Runs of each query to time"
+        )
+        parser.add_argument(
+            "--no-explain", action="store_true", help="Only print timings"
+        )
+
+    def handle(self, *args, **kwargs):
+        size = size_from_options(kwargs)
+        self.repeat = kwargs["repeat"]
+        self.explain = not kwargs["no_explain"]
+
+        start = time.perf_counter()
+        with synthetic_database(size, kwargs["seed"]) as counts:
+            self.stdout.write(
+                f"Generated {size.describe()}: "
+                + ", ".join(f"{n} {name}" for name, n in counts.items())
+                + f" in {time.perf_counter() - start:.1f}s"
+            )
+            self._benchmark()
+
+    def _benchmark(self):
+        sample = Sample.pick()
+
+        self._migrate([BEFORE_INDEXES])
+        before = self._run_queries(sample, "before")
+
+        self._migrate(None)
+        after = self._run_queries(sample, "after")
+
+        self.stdout.write(self.style.MIGRATE_HEADING("\nMedian times (ms)"))
+        width = max(map(len, QUERIES))
+        self.stdout.write(f"{'':{width}}  {'before':>8}  {'after':>8}")
+        for label in QUERIES:
+            self.stdout.write(
+                f"{label:{width}}  {before[label]:8.2f}  {after[label]:8.2f}"
+            )
+
+    def _migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        if targets is None:
+            targets = executor.loader.graph.leaf_nodes()
+        executor.migrate(targets)
+        # fresh statistics, so the planner knows about the data and indexes
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def _run_queries(self, sample, label) -> dict[str, float]:
+        if self.explain:
+            self.stdout.write(self.style.MIGRATE_HEADING(f"\nPlans {label} indexes"))
+
+        timings = {}
+        for name, query in QUERIES.items():
+            queryset = query(sample)
+            if self.explain:
+                self.stdout.write(self.style.SQL_KEYWORD(name))
+                self.stdout.write(queryset.explain())
+
+            seconds = []
+            for _ in range(self.repeat):
+                start = time.perf_counter()
+                list(queryset.all())
+                seconds.append(time.perf_counter() - start)
+            timings[name] = statistics.median(seconds) * 1000
+
+        return timings
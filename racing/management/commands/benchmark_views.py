@@ -0,0 +1,118 @@
+import json
+from dataclasses import asdict
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from racing.benchmarks import (
+    BENCHMARK_CACHES,
+    Sample,
+    benchmark_views,
+    synthetic_database,
+    uncovered_views,
+    view_urls,
+)
+from racing.synthetic import DatasetSize, add_size_arguments, size_from_options
+
+
+class Command(BaseCommand):
+    help = (
+        "Request every public page and API endpoint on a synthetic dataset, "
+        "recording wall time, query counts and peak memory, optionally "
+        "comparing with an earlier run's JSON output"
+    )
+
+    def add_arguments(self, parser):
+        add_size_arguments(parser, DatasetSize())
+        parser.add_argument(
+            "--repeat", type=int, default=5, help="Timed requests per page"
+        )
+        parser.add_argument(
+            "--current-db",
+            action="store_true",
+            help="Benchmark the configured database instead of a synthetic one",
+        )
+        parser.add_argument("--output", type=Path, help="Write results as JSON")
+        parser.add_argument(
+            "--compare", type=Path, help="JSON output of an earlier run to compare"
+        )
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=1.25,
+            help="Slowdown (as a ratio of median times) reported as a regression",
+        )
+        parser.add_argument(
+            "--fail-on-regression",
+            action="store_true",
+            help="Exit with an error if any page regressed",
+        )
+
+    def handle(self, *args, **kwargs):
+        size = size_from_options(kwargs)
+        dataset = asdict(size) | {"seed": kwargs["seed"]}
+
+        if kwargs["current_db"]:
+            dataset = "current database"
+            with override_settings(CACHES=BENCHMARK_CACHES):
+                measurements = self._measure(kwargs["repeat"])
+        else:
+            with synthetic_database(size, kwargs["seed"]):
+                measurements = self._measure(kwargs["repeat"])
+
+        report = {
+            "dataset": dataset,
+            "views": {label: m.to_json() for label, m in measurements.items()},
+        }
+        if kwargs["output"]:
+            kwargs["output"].write_text(json.dumps(report, indent=2))
+
+        previous = None
+        if kwargs["compare"]:
+            previous = json.loads(kwargs["compare"].read_text())
+            if previous["dataset"] != dataset:
+                self.stdout.write(
+                    self.style.WARNING("The compared run used a different dataset")
+                )
+
+        regressions = self._print(report["views"], previous, kwargs["threshold"])
+        if regressions and kwargs["fail_on_regression"]:
+            raise CommandError(f"{len(regressions)} pages regressed")
+
+    def _measure(self, repeat):
+        urls = view_urls(Sample.pick())
+        for name in sorted(uncovered_views(urls.values())):
+            self.stdout.write(self.style.WARNING(f"No benchmark for the {name} view"))
+        return benchmark_views(urls, repeat)
+
+    def _print(self, views, previous, threshold) -> list[str]:
+        """Prints a table of the measurements, returning the regressed pages."""
+        width = max(map(len, views))
+        self.stdout.write(
+            f"{'':{width}}  status  queries  median ms  cached ms  peak KB      KB"
+        )
+
+        regressions = []
+        for label, view in views.items():
+            queries = f"{view['queries']:7}"
+            median = f"{view['ms']:9.1f}"
+
+            before = previous and previous["views"].get(label)
+            if before:
+                ratio = view["ms"] / before["ms"] if before["ms"] else 1
+                queries += f" ({view['queries'] - before['queries']:+})"
+                median += f" ({ratio:.2f}x)"
+                if view["queries"] > before["queries"] or ratio > threshold:
+                    regressions.append(label)
+
+            line = (
+                f"{label:{width}}  {view['status']:6}  {queries}  {median}  "
+                f"{view['cached_ms']:9.1f}  {view['peak_kb']:7.0f}  "
+                f"{view['bytes'] / 1024:6.0f}"
+            )
+            if label in regressions or view["status"] != 200:
+                line = self.style.WARNING(line)
+            self.stdout.write(line)
+
+        return regressions
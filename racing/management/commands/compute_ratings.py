@@ -0,0 +1,50 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from racing.models import Race, RatingSeason, Sex
+from racing.ratings import compute_ratings
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute runner and team ratings for the rankings page, of the "
+        "seasons whose races changed since they were last computed"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--year",
+            type=int,
+            action="append",
+            help="Recompute this season, stale or not (can be repeated)",
+        )
+        parser.add_argument("--all", action="store_true", help="Recompute every season")
+        parser.add_argument(
+            "--cold",
+            action="store_true",
+            help="Fit from scratch instead of from the previous ratings",
+        )
+
+    def handle(self, *args, **kwargs):
+        if kwargs["all"] or kwargs["year"]:
+            seasons = Race.objects.exclude(sex=Sex.MIXED).values_list(
+                "meet__date__year", "sex"
+            )
+            if kwargs["year"]:
+                seasons = seasons.filter(meet__date__year__in=kwargs["year"])
+        else:
+            seasons = (
+                RatingSeason.objects.filter(stale=True)
+                .exclude(sex=Sex.MIXED)
+                .values_list("year", "sex")
+            )
+        seasons = sorted(set(seasons))
+
+        for year, sex in seasons:
+            start = time.perf_counter()
+            rated = compute_ratings(year, sex, warm_start=not kwargs["cold"])
+            seconds = time.perf_counter() - start
+            self.stdout.write(f"{year} {sex}: rated {rated} runners in {seconds:.2f}s")
+
+        self.stdout.write(self.style.SUCCESS(f"Computed {len(seasons)} seasons"))
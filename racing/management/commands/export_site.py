@@ -0,0 +1,105 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+from pathlib import Path
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils import timezone
+
+from racing.export import (
+    Manifest,
+    SitePages,
+    brotli,
+    page_file,
+    remove_page,
+    render_pages,
+)
+
+# pages rendered per task sent to a worker
+CHUNK_SIZE = 100
+
+
+class Command(BaseCommand):
+    help = (
+        "Render every public page to static files (with .gz and .br variants) "
+        "in parallel, only re-rendering pages whose data changed since the last "
+        "export"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", type=Path, help="Directory to export to")
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Render every page, not only those changed since the last export",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count(),
+            help="Rendering processes (1 renders in this process)",
+        )
+
+    def handle(self, *args, **kwargs):
+        start = time.perf_counter()
+        output = kwargs["output"].resolve()
+        output.mkdir(parents=True, exist_ok=True)
+
+        # pages changed while exporting are picked up by the next export
+        exported_at = timezone.now()
+        manifest = Manifest() if kwargs["full"] else Manifest.load(output)
+        pages = SitePages.load()
+        stale = pages.stale(output, manifest)
+
+        removed = set(manifest.pages) - set(pages.versions)
+        for url in removed:
+            remove_page(page_file(output, url))
+
+        if brotli is None:
+            self.stdout.write("brotli isn't installed, only writing .gz variants")
+
+        failures = []
+        done = 0
+        for statuses in self._render(output, stale, kwargs["workers"]):
+            for url, status in statuses:
+                if status != 200:
+                    failures.append(url)
+                    self.stdout.write(self.style.WARNING(f"{url}: {status}"))
+            done += len(statuses)
+            self.stdout.write(f"[{done}/{len(stale)}] pages rendered")
+
+        # failed pages are retried next time, and removed with the rest if
+        # they go away
+        Manifest(
+            exported_at=exported_at,
+            pages=sorted(pages.versions),
+            failed=sorted(failures),
+            runner_lists=pages.runner_lists,
+        ).save(output)
+
+        self.stdout.write(
+            f"Rendered {len(stale) - len(failures)} of {len(pages.versions)} pages "
+            f"({len(pages.versions) - len(stale)} unchanged, {len(removed)} removed) "
+            f"in {time.perf_counter() - start:.2f}s"
+        )
+        if failures:
+            raise CommandError(f"{len(failures)} pages failed to render")
+
+    def _render(self, output, urls, workers):
+        """Yields the statuses of each chunk of pages, as they finish."""
+        chunks = [urls[i : i + CHUNK_SIZE] for i in range(0, len(urls), CHUNK_SIZE)]
+        render = partial(render_pages, output)
+
+        if workers <= 1:
+            yield from map(render, chunks)
+            return
+
+        # forked workers mustn't share this process's database connections
+        connections.close_all()
+        with ProcessPoolExecutor(workers, initializer=django.setup) as executor:
+            futures = [executor.submit(render, chunk) for chunk in chunks]
+            for future in as_completed(futures):
+                yield future.result()
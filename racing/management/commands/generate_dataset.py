@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from racing.synthetic import (
+    DatasetSize,
+    add_size_arguments,
+    generate,
+    size_from_options,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Add a reproducible synthetic dataset (teams, runners, rosters, meets, "
+        "races and scored results) to the database, for development at scale"
+    )
+
+    def add_arguments(self, parser):
+        add_size_arguments(parser, DatasetSize())
+        parser.add_argument(
+            "--first-season",
+            type=int,
+            default=2000,
+            help="Year of the first season (datasets with different first "
+            "seasons can be added side by side)",
+        )
+
+    def handle(self, *args, **kwargs):
+        size = size_from_options(kwargs)
+
+        start = time.perf_counter()
+        counts = generate(
+            size, seed=kwargs["seed"], first_season=kwargs["first_season"]
+        )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Generated {size.describe()}: "
+                + ", ".join(f"{n} {name}" for name, n in counts.items())
+                + f" in {time.perf_counter() - start:.1f}s"
+            )
+        )
@@ -0,0 +1,70 @@
+import csv
+import inspect
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from racing.importing import ResultImportError, import_records
+from racing.models import Race
+from racing.sources import PARSERS, get_parser, open_source
+
+
+class Command(BaseCommand):
+    help = (
+        "Read results from a URL or file in one of the supported formats and "
+        "import them into a race. Formats: "
+        + "; ".join(f"{name}: {p.description}" for name, p in sorted(PARSERS.items()))
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("format", choices=sorted(PARSERS), help="Source format")
+        parser.add_argument("source", help="URL or path of the results")
+        parser.add_argument("--race", type=int, help="ID of the race to import into")
+        parser.add_argument(
+            "--section",
+            choices=["women", "men"],
+            help="Race to read from pages listing several (speed_river)",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Print the parsed results as CSV instead of importing them",
+        )
+
+    def handle(self, *args, **kwargs):
+        parser = get_parser(kwargs["format"])
+
+        options = {}
+        if kwargs["section"]:
+            if "section" not in inspect.signature(parser.parse).parameters:
+                raise CommandError(f"{parser.name} doesn't take --section")
+            options["section"] = kwargs["section"]
+
+        race = None
+        if not kwargs["dry_run"]:
+            if kwargs["race"] is None:
+                raise CommandError("--race is required, unless it's a --dry-run")
+            race = Race.objects.select_related("meet").filter(pk=kwargs["race"]).first()
+            if race is None:
+                raise CommandError(f"Race {kwargs['race']} does not exist")
+
+        try:
+            with open_source(kwargs["source"], parser.accept) as stream:
+                records = parser.parse(stream, **options)
+                if race is None:
+                    self._write_records(records)
+                    return
+                summary = import_records(race, records)
+        except ResultImportError as e:
+            raise CommandError("\n".join(e.errors)) from e
+        # parsers report unexpected documents as ResultImportError
+        except (OSError, UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise CommandError(f"Could not read {kwargs['source']}: {e!r}") from e
+
+        self.stdout.write(self.style.SUCCESS(f"Imported {summary} into {race}"))
+
+    def _write_records(self, records):
+        writer = csv.writer(self.stdout)
+        writer.writerow(["name", "time", "team", "points"])
+        for record in records:
+            writer.writerow([record.name, record.time, record.team, record.points])
@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from racing.courses import normalize_races
+from racing.models import Race
+
+
+class Command(BaseCommand):
+    help = (
+        "Refit course difficulties and results' equivalent times for races "
+        "and every race linked to them by runners"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "race_ids",
+            nargs="*",
+            type=int,
+            help="IDs of the races to refit (all races if omitted)",
+        )
+
+    def handle(self, *args, **kwargs):
+        race_ids = kwargs["race_ids"] or list(Race.objects.values_list("id", flat=True))
+
+        start = time.perf_counter()
+        normalize_races(race_ids)
+        seconds = time.perf_counter() - start
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Normalized {len(race_ids)} races in {seconds:.2f}s")
+        )
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from racing.models import Race
+from racing.ranking import defer_ranking, schedule_race
+
+
+class Command(BaseCommand):
+    help = "Recompute stored finishing places, team scores and runners' stats for races"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "race_ids",
+            nargs="*",
+            type=int,
+            help="IDs of the races to rank (all races if omitted)",
+        )
+
+    def handle(self, *args, **kwargs):
+        race_ids = kwargs["race_ids"] or Race.objects.values_list("id", flat=True)
+
+        count = 0
+        # runners' stats are updated once, after every race is ranked
+        with defer_ranking():
+            for race_id in race_ids:
+                schedule_race(race_id)
+                count += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Ranked {count} races"))
@@ -0,0 +1,152 @@
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from racing.archive import RAW_DIR, RaceFinder, discover, parse_file
+from racing.importing import ResultImportError, import_records
+from racing.names import normalize_name
+from racing.times import DNF, DNS, DQ, parse_times
+
+# differences listed per file when verifying
+MAX_LISTED_DIFFERENCES = 5
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild (or verify) race results from the raw archive in data/raw, "
+        "parsing files in parallel and bulk-loading each race"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dir", type=Path, default=RAW_DIR, help="Archive directory"
+        )
+        parser.add_argument(
+            "--manifest",
+            type=Path,
+            help="CSV of file, format and meet overrides (defaults to "
+            "manifest.csv in the archive directory)",
+        )
+        parser.add_argument("--year", type=int, help="Only ingest this season")
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="Compare the archive with the database instead of rebuilding",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count(),
+            help="Parsing processes (1 parses in this process)",
+        )
+
+    def handle(self, *args, **kwargs):
+        start = time.perf_counter()
+        self.verify = kwargs["verify"]
+        self.failures = []
+        self.write_seconds = 0
+        parse_seconds = 0
+
+        files = discover(kwargs["dir"], kwargs["manifest"])
+        if kwargs["year"]:
+            files = [f for f in files if f.year == kwargs["year"]]
+
+        finder = RaceFinder()
+        races = {}
+        for archive_file in files:
+            try:
+                races[archive_file] = finder.find(archive_file)
+            except LookupError as e:
+                self._fail(archive_file.path, f"skipped, {e}")
+
+        races_by_path = {f.path: race for f, race in races.items()}
+        total = len(races)
+        for done, parsed in enumerate(self._parse(races, kwargs["workers"]), 1):
+            parse_seconds += parsed.seconds
+            progress = f"[{done}/{total}] {parsed.path.name}"
+            if parsed.error:
+                self._fail(parsed.path, parsed.error, progress)
+                continue
+
+            self._write(races_by_path[parsed.path], parsed, progress)
+
+        outcome = "match the database" if self.verify else "ingested"
+        self.stdout.write(
+            f"{len(files) - len(self.failures)} of {len(files)} files {outcome}. "
+            f"Parsing took {parse_seconds:.2f}s of worker time, writing "
+            f"{self.write_seconds:.2f}s, {time.perf_counter() - start:.2f}s in total"
+        )
+        if self.failures:
+            raise CommandError(f"{len(self.failures)} files failed")
+
+    def _parse(self, races, workers):
+        """Yields each file's ParsedFile, in the order they finish parsing."""
+        if workers <= 1:
+            yield from map(parse_file, races)
+            return
+
+        # forked workers mustn't share the writer's database connections
+        connections.close_all()
+        with ProcessPoolExecutor(workers, initializer=django.setup) as executor:
+            futures = [executor.submit(parse_file, f) for f in races]
+            for future in as_completed(futures):
+                yield future.result()
+
+    def _write(self, race, parsed, progress):
+        start = time.perf_counter()
+        try:
+            if self.verify:
+                differences = self._compare(race, parsed.records)
+                outcome = f"{len(parsed.records)} results"
+            else:
+                differences = []
+                outcome = import_records(race, parsed.records, replace=True)
+        except ResultImportError as e:
+            self._fail(parsed.path, "; ".join(e.errors), progress)
+            return
+        finally:
+            self.write_seconds += time.perf_counter() - start
+
+        if differences:
+            self._fail(parsed.path, "; ".join(differences), progress)
+        else:
+            self.stdout.write(f"{progress}: {outcome}, {race} ({parsed.seconds:.2f}s)")
+
+    def _compare(self, race, records) -> list[str]:
+        """Lists the results only in the archive file or only in the database."""
+        stored = Counter(
+            (normalize_name(name), time)
+            for name, time in race.result_set.values_list("name", "time")
+        )
+        times = parse_times(record.time for record in records)
+        archived = Counter(
+            (normalize_name(record.name), duration)
+            for record, duration, marker in zip(
+                records, times.durations, times.markers, strict=True
+            )
+            # non-finishers aren't stored
+            if marker not in (DNF, DNS, DQ)
+        )
+
+        differences = [
+            f"{where} only: {name} {time}"
+            for where, results in (
+                ("archive", archived - stored),
+                ("database", stored - archived),
+            )
+            for name, time in results.elements()
+        ]
+        if len(differences) > MAX_LISTED_DIFFERENCES:
+            more = len(differences) - MAX_LISTED_DIFFERENCES
+            differences = differences[:MAX_LISTED_DIFFERENCES] + [f"{more} more"]
+        return differences
+
+    def _fail(self, path, reason, progress=None):
+        self.failures.append(path)
+        self.stdout.write(self.style.WARNING(f"{progress or path.name}: {reason}"))
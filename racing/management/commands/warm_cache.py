@@ -0,0 +1,64 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from racing.models import Meet, RosterSpot, Runner
+
+
+class Command(BaseCommand):
+    help = "Pre-render the public pages for a season into the page cache"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--year",
+            type=int,
+            help="Season to warm (defaults to the most recent season with meets)",
+        )
+
+    def handle(self, *args, **kwargs):
+        year = kwargs["year"]
+        if year is None:
+            latest_meet = (
+                Meet.objects.filter(date__lte=timezone.now()).order_by("-date").first()
+            )
+            year = latest_meet.date.year if latest_meet else timezone.now().year
+
+        meets = Meet.objects.filter(date__year=year).prefetch_related("race_set")
+
+        urls = [reverse("index"), reverse("results")]
+        for meet in meets:
+            urls.append(meet.get_absolute_url())
+            urls += [race.get_absolute_url() for race in meet.race_set.all()]
+
+        runner_slugs = (
+            Runner.objects.filter(result__race__meet__date__year=year)
+            .values_list("slug", flat=True)
+            .distinct()
+        )
+        urls += [reverse("runner", kwargs={"slug": slug}) for slug in runner_slugs]
+
+        team_slugs = (
+            RosterSpot.objects.filter(year=year)
+            .values_list("team__slug", flat=True)
+            .distinct()
+        )
+        urls += [reverse("roster", args=[slug, year]) for slug in team_slugs]
+
+        # go through the full middleware stack, as a visitor would
+        client = Client(HTTP_HOST=settings.ALLOWED_HOSTS[0])
+        failures = 0
+        for url in urls:
+            response = client.get(url)
+            if response.status_code != 200:
+                failures += 1
+                self.stdout.write(
+                    self.style.WARNING(f"{url} returned {response.status_code}")
+                )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Warmed {len(urls) - failures} of {len(urls)} pages for {year}"
+            )
+        )
@@ -0,0 +1,107 @@
+from collections import Counter, defaultdict
+
+from thefuzz import fuzz, process
+
+from racing.models import Runner
+from racing.names import normalize_name
+
+
+def trigrams(normalized_name: str) -> set[str]:
+    """
+    Returns the character trigrams of each word, padded like pg_trgm does,
+    so "ann lee" gives {"  a", " an", "ann", "nn ", "  l", " le", "lee", "ee "}.
+    """
+    grams = set()
+    for word in normalized_name.split():
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class RunnerMatcher:
+    """
+    Finds runners whose names match a result's name, exactly or fuzzily.
+
+    Names are normalized once when the matcher is built, and indexed both by
+    normalized name (for exact matches) and in a trigram inverted index. A
+    fuzzy lookup only scores the runners sharing enough trigrams with the
+    name, rather than every runner.
+
+    Example:
+
+    >>> matcher = RunnerMatcher(Runner.objects.filter(sex="F"))
+    >>> matcher.fuzzy("Emilie Cote")
+    [(<Runner: Émilie Côté>, 100)]
+    """
+
+    SIMILARITY_THRESHOLD = 75
+
+    # Share of a name's trigrams a candidate must also have to be scored.
+    # Names scoring above SIMILARITY_THRESHOLD comfortably clear this.
+    MIN_TRIGRAM_OVERLAP = 0.3
+
+    def __init__(self, runners=()):
+        self.runners = {}
+        self.by_name = defaultdict(list)
+        self.names = {}
+        self.index = defaultdict(set)
+
+        for runner in runners:
+            self.add(runner)
+
+    def __len__(self):
+        return len(self.runners)
+
+    def add(self, runner: Runner):
+        """Indexes a runner, e.g. one created while matching."""
+        name = runner.search_name or normalize_name(runner.name)
+
+        self.runners[runner.id] = runner
+        self.by_name[name].append(runner)
+        self.names[runner.id] = name
+        for gram in trigrams(name):
+            self.index[gram].add(runner.id)
+
+    def exact(self, name: str) -> list[Runner]:
+        """Returns runners whose normalized name equals the given one."""
+        return list(self.by_name.get(normalize_name(name), []))
+
+    def candidates(self, name: str) -> list[int]:
+        """
+        Returns ids of the runners sharing enough trigrams with the name.
+        """
+        grams = trigrams(normalize_name(name))
+        if not grams:
+            return []
+
+        overlap = Counter()
+        for gram in grams:
+            overlap.update(self.index.get(gram, ()))
+
+        minimum = max(1, int(len(grams) * self.MIN_TRIGRAM_OVERLAP))
+        return [runner_id for runner_id, count in overlap.items() if count >= minimum]
+
+    def fuzzy(self, name: str, threshold: int | None = None) -> list[tuple]:
+        """
+        Returns (runner, similarity) tuples for runners whose names are at
+        least `threshold` similar (0 to 100), most similar first.
+        """
+        if threshold is None:
+            threshold = self.SIMILARITY_THRESHOLD
+
+        choices = {
+            runner_id: self.names[runner_id] for runner_id in self.candidates(name)
+        }
+        if not choices:
+            return []
+
+        scored = process.extractBests(
+            normalize_name(name),
+            choices,
+            processor=None,
+            scorer=fuzz.ratio,
+            score_cutoff=threshold,
+            limit=None,
+        )
+        # extractBests gives (name, score, key) for dict choices
+        return [(self.runners[runner_id], score) for _, score, runner_id in scored]
@@ -0,0 +1,344 @@
+"""
+Request metrics.
+
+For every request, racing.middleware.MetricsMiddleware records the view,
+wall time, database queries and their time, template rendering time and
+page cache hits and misses (see `RequestMetrics`). Each request is logged
+as a JSON line on the "racing.metrics" logger, with its queries when it
+was slow, and added to this process's totals (see `Registry`).
+
+Every web server process periodically publishes its totals to the cache,
+so the metrics endpoint can serve them all: Prometheus scrapes one process,
+but sees the whole site. Each process's series carry a "process" label
+(host:pid), so counters only ever go up within a series and a restarted
+process starts new series, e.g. sum by (view) (rate(racing_requests_total[5m])).
+"""
+
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.http import Http404, HttpResponse
+from django.template.backends.django import DjangoTemplates, Template
+from django.utils.crypto import constant_time_compare
+
+logger = logging.getLogger(__name__)
+
+# upper bounds of the request duration histogram's buckets, in seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# how often each process publishes its totals, in seconds
+PUBLISH_INTERVAL = 10
+# processes that haven't published for this long (e.g. restarted ones) are
+# left out of the totals, in seconds
+PROCESS_TIMEOUT = 5 * 60
+# Each process publishes to a slot it claims with an atomic cache.add, so
+# processes starting together can't drop each other from a shared list
+MAX_PROCESSES = 256
+SLOT_KEY = "racing:metrics:slot:{}"
+
+# queries kept per request for logging slow requests, so bulk imports
+# don't hold every statement in memory
+MAX_LOGGED_QUERIES = 200
+
+# name -> (type, help) of the metrics exposed
+METRICS = {
+    "racing_requests_total": ("counter", "Requests, by view, method and status."),
+    "racing_request_duration_seconds": ("histogram", "Request wall time, by view."),
+    "racing_request_queries_total": ("counter", "Database queries, by view."),
+    "racing_request_query_seconds_total": (
+        "counter",
+        "Time spent in database queries, by view.",
+    ),
+    "racing_request_template_seconds_total": (
+        "counter",
+        "Time spent rendering templates, by view.",
+    ),
+    "racing_page_cache_total": (
+        "counter",
+        "Page cache lookups, by view and result (hit or miss).",
+    ),
+    "racing_slow_requests_total": (
+        "counter",
+        "Requests slower than SLOW_REQUEST_MS, by view.",
+    ),
+}
+
+_current = ContextVar("racing_request_metrics", default=None)
+
+
+@dataclass
+class RequestMetrics:
+    method: str
+    # the URL pattern's name, e.g. "runner"
+    view: str = "unresolved"
+    status: int = 0
+    seconds: float = 0
+    queries: int = 0
+    query_seconds: float = 0
+    template_seconds: float = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    # (sql, seconds) of the first MAX_LOGGED_QUERIES queries
+    query_log: list = field(default_factory=list)
+
+    def __call__(self, execute, sql, params, many, context):
+        # a database execute wrapper, see `tracking`
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            seconds = time.perf_counter() - start
+            self.queries += 1
+            self.query_seconds += seconds
+            if len(self.query_log) < MAX_LOGGED_QUERIES:
+                self.query_log.append((sql, seconds))
+
+    @contextmanager
+    def tracking(self):
+        """Records queries, template rendering and page cache lookups."""
+        token = _current.set(self)
+        try:
+            with connection.execute_wrapper(self):
+                yield
+        finally:
+            _current.reset(token)
+
+    @property
+    def slow(self) -> bool:
+        return self.seconds * 1000 >= settings.SLOW_REQUEST_MS
+
+    def to_json(self) -> dict:
+        line = {
+            "view": self.view,
+            "method": self.method,
+            "status": self.status,
+            "ms": round(self.seconds * 1000, 1),
+            "queries": self.queries,
+            "query_ms": round(self.query_seconds * 1000, 1),
+            "template_ms": round(self.template_seconds * 1000, 1),
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+        }
+        if self.slow:
+            line["query_log"] = [
+                {"ms": round(seconds * 1000, 2), "sql": sql}
+                for sql, seconds in self.query_log
+            ]
+        return line
+
+
+def record_cache_lookup(hit: bool):
+    """Counts a page cache lookup towards the current request's metrics."""
+    if (metrics := _current.get()) is not None:
+        if hit:
+            metrics.cache_hits += 1
+        else:
+            metrics.cache_misses += 1
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        metrics = _current.get()
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            if metrics is not None:
+                metrics.template_seconds += time.perf_counter() - start
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """
+    The Django template backend, timing each template it renders.
+
+    Templates included by others are rendered by the engine, not the
+    backend, so they're timed as part of the page including them.
+    """
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name).template, self)
+
+
+class Registry:
+    """This process's totals, by metric name and labels."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # (name, ((label, value), ...)) -> total
+        self.totals = {}
+        self.published_at = 0
+        # the slot this process publishes to, and the process that claimed it
+        self.slot = None
+        self.process = None
+
+    def _add(self, name, labels, value=1):
+        key = (name, tuple(sorted(labels.items())))
+        self.totals[key] = self.totals.get(key, 0) + value
+
+    def record(self, metrics: RequestMetrics):
+        view = {"view": metrics.view}
+        request = view | {"method": metrics.method, "status": str(metrics.status)}
+
+        with self.lock:
+            self._add("racing_requests_total", request)
+
+            # every bucket is added, even with 0, to keep them in order
+            for bound in BUCKETS:
+                self._add(
+                    "racing_request_duration_seconds_bucket",
+                    view | {"le": str(bound)},
+                    int(metrics.seconds <= bound),
+                )
+            self._add("racing_request_duration_seconds_bucket", view | {"le": "+Inf"})
+            self._add("racing_request_duration_seconds_sum", view, metrics.seconds)
+            self._add("racing_request_duration_seconds_count", view)
+
+            self._add("racing_request_queries_total", view, metrics.queries)
+            self._add("racing_request_query_seconds_total", view, metrics.query_seconds)
+            self._add(
+                "racing_request_template_seconds_total", view, metrics.template_seconds
+            )
+
+            for result, lookups in (
+                ("hit", metrics.cache_hits),
+                ("miss", metrics.cache_misses),
+            ):
+                if lookups:
+                    labels = view | {"result": result}
+                    self._add("racing_page_cache_total", labels, lookups)
+
+            if metrics.slow:
+                self._add("racing_slow_requests_total", view)
+
+    def publish(self, force=False):
+        """
+        Publishes this process's totals to the cache, at most every
+        PUBLISH_INTERVAL seconds unless `force`d.
+        """
+        now = time.time()
+        if not force and now - self.published_at < PUBLISH_INTERVAL:
+            return
+        self.published_at = now
+
+        # the process id is read here, not on import, as servers fork
+        process = f"{socket.gethostname()}:{os.getpid()}"
+        with self.lock:
+            published = {"process": process, "totals": dict(self.totals)}
+
+        if self.slot is not None and self.process == process:
+            key = SLOT_KEY.format(self.slot)
+            # unless the slot expired (the process stalled) and was claimed
+            if (cache.get(key) or {}).get("process") == process:
+                cache.set(key, published, PROCESS_TIMEOUT)
+                return
+
+        self.slot = self.process = None
+        for slot in range(MAX_PROCESSES):
+            if cache.add(SLOT_KEY.format(slot), published, PROCESS_TIMEOUT):
+                self.slot, self.process = slot, process
+                return
+        logger.warning("No free metrics slot, raise MAX_PROCESSES")
+
+
+registry = Registry()
+
+
+@contextmanager
+def quiet():
+    """
+    Stops logging requests (but slow ones), e.g. while a command renders
+    every page through the test client.
+    """
+    level = logger.level
+    logger.setLevel(logging.WARNING)
+    try:
+        yield
+    finally:
+        logger.setLevel(level)
+
+
+def record(metrics: RequestMetrics):
+    """Logs a finished request and adds it to this process's totals."""
+    level = logging.WARNING if metrics.slow else logging.INFO
+    logger.log(level, "%s", json.dumps(metrics.to_json()))
+
+    registry.record(metrics)
+    registry.publish()
+
+
+def collect() -> dict:
+    """
+    The totals published by every live process, each labelled with its
+    process.
+    """
+    registry.publish(force=True)
+
+    totals = {}
+    slots = cache.get_many([SLOT_KEY.format(slot) for slot in range(MAX_PROCESSES)])
+    for published in slots.values():
+        process = ("process", published["process"])
+        for (name, labels), value in published["totals"].items():
+            totals[(name, tuple(sorted((*labels, process))))] = value
+    return totals
+
+
+def _escape(label_value: str) -> str:
+    return label_value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _sample(name, labels, value) -> str:
+    labels = ",".join(f'{label}="{_escape(text)}"' for label, text in labels)
+    return f"{name}{{{labels}}} {value!r}" if labels else f"{name} {value!r}"
+
+
+def to_prometheus(totals: dict) -> str:
+    """Formats totals in the Prometheus text format."""
+    lines = []
+    for family, (kind, help_text) in METRICS.items():
+        lines.append(f"# HELP {family} {help_text}")
+        lines.append(f"# TYPE {family} {kind}")
+        if kind == "histogram":
+            names = [f"{family}_bucket", f"{family}_sum", f"{family}_count"]
+        else:
+            names = [family]
+
+        # in the order recorded, which keeps histogram buckets ascending
+        for name in names:
+            lines.extend(
+                _sample(name, labels, value)
+                for (sample_name, labels), value in totals.items()
+                if sample_name == name
+            )
+
+    return "\n".join(lines) + "\n"
+
+
+def prometheus_metrics(request):
+    """
+    The site's metrics, for Prometheus. Only internal IPs, or requests
+    bearing the METRICS_TOKEN, can see them.
+    """
+    token = settings.METRICS_TOKEN
+    authorization = request.headers.get("Authorization", "")
+    if not (
+        request.META.get("REMOTE_ADDR") in settings.INTERNAL_IPS
+        or (token and constant_time_compare(authorization, f"Bearer {token}"))
+    ):
+        raise Http404
+
+    return HttpResponse(
+        to_prometheus(collect()), content_type="text/plain; version=0.0.4"
+    )
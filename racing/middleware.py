@@ -0,0 +1,42 @@
+import time
+
+from racing.metrics import RequestMetrics, record
+
+
+class MetricsMiddleware:
+    """
+    Records the metrics of every request (see racing.metrics). It should
+    come first, so the time spent in other middleware is counted too.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics(method=request.method)
+        start = time.perf_counter()
+        with metrics.tracking():
+            response = self.get_response(request)
+
+        if request.resolver_match:
+            metrics.view = request.resolver_match.view_name
+        metrics.status = response.status_code
+
+        if response.streaming:
+            # streamed responses query the database while being sent
+            response.streaming_content = self._stream(
+                response.streaming_content, metrics, start
+            )
+        else:
+            metrics.seconds = time.perf_counter() - start
+            record(metrics)
+
+        return response
+
+    def _stream(self, content, metrics, start):
+        try:
+            with metrics.tracking():
+                yield from content
+        finally:
+            metrics.seconds = time.perf_counter() - start
+            record(metrics)
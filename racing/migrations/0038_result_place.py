@@ -0,0 +1,22 @@
+# Generated by Django 5.2.1 on 2026-10-18 08:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('racing', '0037_race_tiebreaker'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='result',
+            name='place',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='result',
+            index=models.Index(fields=['race', 'place'], name='racing_resu_race_id_370890_idx'),
+        ),
+    ]
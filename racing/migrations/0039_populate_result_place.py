@@ -0,0 +1,22 @@
+from django.db import migrations
+
+
+def populate_place(apps, schema_editor):
+    Result = apps.get_model('racing', 'Result')
+    race_ids = Result.objects.values_list('race_id', flat=True).distinct()
+    for race_id in race_ids:
+        results = list(Result.objects.filter(race_id=race_id).order_by('time', 'id'))
+        for place, result in enumerate(results, start=1):
+            result.place = place
+        Result.objects.bulk_update(results, ['place'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('racing', '0038_result_place'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_place, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.1 on 2026-10-18 08:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('racing', '0039_populate_result_place'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TeamScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('place', models.PositiveIntegerField()),
+                ('score', models.IntegerField()),
+                ('tiebreaker_points', models.IntegerField(blank=True, null=True)),
+                ('scoring_members', models.JSONField(default=list)),
+                ('displacers', models.JSONField(default=list)),
+                ('race', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='racing.race')),
+                ('team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='racing.team')),
+            ],
+            options={
+                'ordering': ['race', 'place'],
+                'constraints': [models.UniqueConstraint(fields=('race', 'team'), name='unique_race_team')],
+            },
+        ),
+    ]
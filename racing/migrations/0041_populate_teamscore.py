@@ -0,0 +1,97 @@
+from collections import Counter, defaultdict
+
+from django.db import migrations
+
+
+# A copy of racing.scoring.tally_teams as of this migration, so later changes
+# to scoring don't change what it does
+def tally_teams(results, scorers, displacers, tiebreaker, race_type):
+    maximum_team_size = scorers + displacers
+    team_results = defaultdict(list)
+    # team: [score, scoring members, displacers, tiebreaker points]
+    tallies = {}
+
+    def add(team, result, points):
+        tally = tallies.setdefault(team, [0, [], [], float('inf')])
+        count = len(team_results[team])
+        if count < scorers:
+            tally[0] += points
+            tally[1].append((result, points))
+            if tiebreaker == 'LAST_SCORER' and count == scorers - 1:
+                tally[3] = points
+        elif count < maximum_team_size:
+            tally[2].append((result, points))
+            if tiebreaker == 'FIRST_DISPLACER' and count == scorers:
+                tally[3] = points
+
+    if any(result.points is not None for result in results):
+        # points given by the results file
+        for result in results:
+            if result.points is not None:
+                add(result.team, result, result.points)
+            team_results[result.team].append(result)
+    else:
+        finishers = Counter(result.team for result in results)
+        scoring_teams = {
+            team
+            for team, count in finishers.items()
+            if count >= scorers
+            and (race_type != 'USPORTS' or team.division == 'USPORTS')
+        }
+        points = 1
+        for result in results:
+            team = result.team
+            if team in scoring_teams:
+                add(team, result, points)
+                if len(team_results[team]) < maximum_team_size:
+                    points += 1
+            team_results[team].append(result)
+
+    return sorted(tallies.items(), key=lambda item: (item[1][0], item[1][3]))
+
+
+def serialize_members(members):
+    return [
+        {'result': result.pk, 'name': result.name, 'points': points}
+        for result, points in members
+    ]
+
+
+def populate_team_scores(apps, schema_editor):
+    Race = apps.get_model('racing', 'Race')
+    Result = apps.get_model('racing', 'Result')
+    TeamScore = apps.get_model('racing', 'TeamScore')
+
+    for race in Race.objects.all():
+        results = list(
+            Result.objects.filter(race=race).select_related('team').order_by('time', 'id')
+        )
+        standings = tally_teams(
+            results, race.scorers, race.displacers, race.tiebreaker, race.type
+        )
+        TeamScore.objects.bulk_create(
+            TeamScore(
+                race=race,
+                team=team,
+                place=place,
+                score=score,
+                tiebreaker_points=(
+                    None if tiebreaker_points == float('inf') else tiebreaker_points
+                ),
+                scoring_members=serialize_members(scoring_members),
+                displacers=serialize_members(displacers),
+            )
+            for place, (team, (score, scoring_members, displacers, tiebreaker_points))
+            in enumerate(standings, start=1)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('racing', '0040_teamscore'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_team_scores, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.1 on 2026-10-18 08:46
+
+import re
+import unicodedata
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+# A copy of racing.names.normalize_name as of this migration
+def normalize_name(name):
+    ascii_name = (
+        unicodedata.normalize('NFKD', name.casefold())
+        .encode('ASCII', 'ignore')
+        .decode('ASCII')
+    )
+    return re.sub(r'[^a-z0-9]+', ' ', ascii_name).strip()
+
+
+def populate_search_name(apps, schema_editor):
+    Runner = apps.get_model('racing', 'Runner')
+    runners = list(Runner.objects.only('id', 'name'))
+    for runner in runners:
+        runner.search_name = normalize_name(runner.name)
+    Runner.objects.bulk_update(runners, ['search_name'], batch_size=1000)
+
+
+def create_trigram_index(apps, schema_editor):
+    # the trigram index is Postgres only, other databases fall back to LIKE scans
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE INDEX racing_runner_search_name_trgm '
+            'ON racing_runner USING gin (search_name gin_trgm_ops)'
+        )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS racing_runner_search_name_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('racing', '0041_populate_teamscore'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='runner',
+            name='search_name',
+            field=models.CharField(default='', editable=False, max_length=100),
+        ),
+        migrations.RunPython(populate_search_name, migrations.RunPython.noop),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
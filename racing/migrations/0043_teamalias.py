@@ -0,0 +1,28 @@
+# Generated by Django 5.2.1 on 2026-10-18 09:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('racing', '0042_runner_search_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TeamAlias',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('sex', models.CharField(blank=True, choices=[('M', 'Male'), ('F', 'Female'), ('X', 'Mixed')], help_text='Only use this alias in races of this sex (blank for any race)', max_length=1)),
+                ('normalized_name', models.CharField(editable=False, max_length=100)),
+                ('team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='aliases', to='racing.team')),
+            ],
+            options={
+                'verbose_name_plural': 'team aliases',
+                'constraints': [models.UniqueConstraint(fields=('normalized_name', 'sex'), name='unique_team_alias')],
+            },
+        ),
+    ]
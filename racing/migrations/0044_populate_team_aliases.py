@@ -0,0 +1,142 @@
+# Generated by Django 5.2.1 on 2026-10-18 09:03
+
+import re
+import unicodedata
+
+from django.db import migrations
+
+
+# A copy of racing.names.normalize_name as of this migration
+def normalize_name(name):
+    ascii_name = (
+        unicodedata.normalize('NFKD', name.casefold())
+        .encode('ASCII', 'ignore')
+        .decode('ASCII')
+    )
+    return re.sub(r'[^a-z0-9]+', ' ', ascii_name).strip()
+
+# synonym: canonical full name, from data/parsers/standardize_team_names.py
+COMMON_ALIASES = {
+    'Laval Rouge-et-Or': 'Laval Rouge et Or',
+    'Laval Rouge et Or': 'Laval Rouge et Or',
+    'Universite Laval': 'Laval Rouge et Or',
+    'Universit� de Sherbrooke': 'Sherbrooke Vert & Or',
+    'Sherbrooke Vert-et-Or': 'Sherbrooke Vert & Or',
+    'UBC Okanagan': 'UBCO Heat',
+    'Ubc Okanagan': 'UBCO Heat',
+    'UQTR Patriotes': 'Université du Québec à Trois-Rivières Les Patriote',
+    'UQTR': 'Université du Québec à Trois-Rivières Les Patriote',
+    'UQAM Citadins': 'Université du Québec à Montréal Les Citadins',
+    'UQAM': 'Université du Québec à Montréal Les Citadins',
+    'UQAC': 'UQAC Inuk',
+    'Universite Quebec A Montreal': 'Université du Québec à Montréal Les Citadins',
+    'Laurier Golden Hawks': 'Wilfrid Laurier Golden Hawks',
+    'Wilfrid Laurier University': 'Wilfrid Laurier Golden Hawks',
+    'McGill University': 'McGill Redbirds',
+    'University of Guelph': 'Guelph Gryphons',
+    'Trinity Western University': 'Trinity Western Spartans',
+    'Western': 'Western Mustangs',
+    'Western University': 'Western Mustangs',
+    'University of Calgary': 'Calgary Dinos',
+    'Queens Gaels': "Queen's Gaels",
+    "Queen's University": "Queen's Gaels",
+    'Queens University': "Queen's Gaels",
+    'McMaster University': 'McMaster Marauders',
+    'University of Windsor': 'Windsor Lancers',
+    'University of Victoria': 'Victoria Vikes',
+    'University of Regina': 'Regina Cougars',
+    'Dalhousie University': 'Dalhousie Tigers',
+    'University of Toronto': 'Toronto Varsity Blues',
+    'University of Prince Edward Island': 'UPEI Panthers',
+    'University of PEI': 'UPEI Panthers',
+    'University of P E I': 'UPEI Panthers',
+    'Brock University': 'Brock Badgers',
+    'Saint Marys University': "St. Mary's Huskies",
+    "St Mary's": "St. Mary's Huskies",
+    'Saint Marys': "St. Mary's Huskies",
+    "Saint Mary's": "St. Mary's Huskies",
+    "Saint Mary's University": "St. Mary's Huskies",
+    "St. Mary's Huskies Univeristy": "St. Mary's Huskies",
+    'Montreal Carabins': 'Montréal Carabins',
+    'Universite de Montreal': 'Montréal Carabins',
+    'Universite De Montreal': 'Montréal Carabins',
+    'University of Manitoba': 'Manitoba Bisons',
+    'University of Ottawa': 'Ottawa Gee-Gees',
+    'University of Waterloo': 'Waterloo Warriors',
+    'MacEwan University': 'MacEwan Griffins',
+    'Thompson Rivers University': 'Thompson Rivers Wolfpack',
+    'Universite de Moncton': 'Moncton Aigles Bleu',
+    'University de Moncton': 'Moncton Aigles Bleu',
+    'University of Saskatchewan': 'Saskatchewan Huskies',
+    'Carleton': 'Carleton Ravens',
+    'Lakehead University': 'Lakehead Thunderwolves',
+    'Laurentian University': 'Laurentian Voyageurs',
+    'St Francis Xavier University': 'St. F X',
+    'St. Francis Xavier University': 'St. F X',
+    'St. Francis Xavier': 'St. F X',
+    'St. Francis': 'St. F X',
+    'StFX': 'St. F X',
+    'St F X': 'St. F X',
+    'Acadia University': 'Acadia',
+    'Ryerson University': 'Ryerson Rams',
+    'Concordia University': 'Concordia Stingers',
+    'University of New Brunswick': 'UNB Reds',
+    'U N B': 'UNB Reds',
+    'Memorial University of Newfoundland': 'Memorial Sea-Hawks',
+    'St. Thomas University': 'St. Thomas Tommies',
+    'St. Thomas': 'St. Thomas Tommies',
+    'St Thomas': 'St. Thomas Tommies',
+    'A S E A': 'ASEA Athlétisme Sud-Est / South-East Athletics',
+    'unattached': 'Unattached',
+    'Y H Z Athletics': 'YHZ Athletics',
+    'St Francis Xavier X-Men/X-Women': 'St. F X',
+    'Toronto Metro Bold': 'TMU Bold',
+    'Ecole de technologie superieure': 'École de technologie supérieure',
+}
+
+MALE_ALIASES = {
+    'Alberta Golden Bears/Pandas': 'Alberta Golden Bears',
+    'University of Alberta': 'Alberta Golden Bears',
+    'McGill Martlets/Redmen': 'McGill Redbirds',
+    'McGill University': 'McGill Redbirds',
+    'McGill': 'McGill Redbirds',
+}
+
+FEMALE_ALIASES = {
+    'Alberta Golden Bears/Pandas': 'Alberta Pandas',
+    'University of Alberta': 'Alberta Pandas',
+    'McGill Martlets/Redmen': 'McGill Martlets',
+    'McGill University': 'McGill Martlets',
+    'McGill': 'McGill Martlets',
+}
+
+
+def populate_team_aliases(apps, schema_editor):
+    Team = apps.get_model('racing', 'Team')
+    TeamAlias = apps.get_model('racing', 'TeamAlias')
+
+    teams = {team.full_name: team for team in Team.objects.all()}
+    aliases = {}
+    for sex, names in (('', COMMON_ALIASES), ('M', MALE_ALIASES), ('F', FEMALE_ALIASES)):
+        for name, full_name in names.items():
+            normalized_name = normalize_name(name)
+            team = teams.get(full_name)
+            # teams' own names don't need an alias
+            if team is None or normalized_name == normalize_name(full_name):
+                continue
+            aliases[(normalized_name, sex)] = TeamAlias(
+                team=team, name=name, sex=sex, normalized_name=normalized_name
+            )
+
+    TeamAlias.objects.bulk_create(aliases.values())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('racing', '0043_teamalias'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_team_aliases, migrations.RunPython.noop),
+    ]
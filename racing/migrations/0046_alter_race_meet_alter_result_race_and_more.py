@@ -0,0 +1,74 @@
+# Generated by Django 5.2.1 on 2026-10-18 09:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def check_duplicate_races(apps, schema_editor):
+    Race = apps.get_model('racing', 'Race')
+    duplicates = (
+        # by meet, as meets can share a name and date
+        Race.objects.values('meet', 'distance', 'unit', 'sex')
+        .annotate(meet_name=Max('meet__name'), meet_date=Max('meet__date'))
+        .annotate(count=Count('id'))
+        .filter(count__gt=1)
+    )
+    if duplicates:
+        races = ', '.join(
+            f"{d['meet_name']} ({d['meet_date']}) {d['distance']}{d['unit']} {d['sex']}"
+            for d in duplicates
+        )
+        raise ValueError(f'Merge or delete duplicate races before migrating: {races}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('racing', '0045_meet_updated_at_race_updated_at_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='meet',
+            index=models.Index(fields=['date'], name='racing_meet_date_d529cf_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='result',
+            index=models.Index(fields=['race', 'time', 'id'], name='racing_resu_race_id_f63ba9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rosterspot',
+            index=models.Index(fields=['runner', 'year'], name='racing_rost_runner__322d88_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rosterspot',
+            index=models.Index(fields=['team', 'year'], name='racing_rost_team_id_930cdb_idx'),
+        ),
+        migrations.RunPython(check_duplicate_races, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='race',
+            constraint=models.UniqueConstraint(fields=('meet', 'distance', 'unit', 'sex'), name='unique_race'),
+        ),
+        # the indexes above lead with these foreign keys
+        migrations.AlterField(
+            model_name='race',
+            name='meet',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='racing.meet'),
+        ),
+        migrations.AlterField(
+            model_name='result',
+            name='race',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.PROTECT, to='racing.race'),
+        ),
+        migrations.AlterField(
+            model_name='rosterspot',
+            name='runner',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='racing.runner'),
+        ),
+        migrations.AlterField(
+            model_name='rosterspot',
+            name='team',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='racing.team'),
+        ),
+    ]
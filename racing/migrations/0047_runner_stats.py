@@ -0,0 +1,48 @@
+# Generated by Django 5.2.1 on 2026-10-18 09:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('racing', '0046_alter_race_meet_alter_result_race_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RunnerCareerStats',
+            fields=[
+                ('races', models.PositiveIntegerField(default=0)),
+                ('wins', models.PositiveIntegerField(default=0)),
+                ('podiums', models.PositiveIntegerField(default=0)),
+                ('average_percentile', models.FloatField(blank=True, null=True)),
+                ('bests', models.JSONField(default=list)),
+                ('runner', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='career_stats', serialize=False, to='racing.runner')),
+                ('seasons', models.PositiveIntegerField(default=0)),
+                ('first_year', models.IntegerField()),
+                ('last_year', models.IntegerField()),
+            ],
+            options={
+                'verbose_name_plural': 'runner career stats',
+            },
+        ),
+        migrations.CreateModel(
+            name='RunnerSeasonStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('races', models.PositiveIntegerField(default=0)),
+                ('wins', models.PositiveIntegerField(default=0)),
+                ('podiums', models.PositiveIntegerField(default=0)),
+                ('average_percentile', models.FloatField(blank=True, null=True)),
+                ('bests', models.JSONField(default=list)),
+                ('year', models.IntegerField()),
+                ('runner', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='season_stats', to='racing.runner')),
+            ],
+            options={
+                'verbose_name_plural': 'runner season stats',
+                'constraints': [models.UniqueConstraint(fields=('runner', 'year'), name='unique_runner_season')],
+            },
+        ),
+    ]
@@ -0,0 +1,119 @@
+from collections import defaultdict
+
+from django.db import migrations
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import ExtractYear
+from django.template.defaultfilters import floatformat
+
+
+# A copy of how racing.stats built stats as of this migration, so later
+# changes to it don't change what it does
+class Tally:
+    def __init__(self):
+        self.races = self.wins = self.podiums = 0
+        self.percentiles = []
+        self.years = set()
+        # (unit, distance) -> (seconds, result id)
+        self.bests = {}
+
+    def add(self, result_id, year, place, time, distance, unit, finishers):
+        self.races += 1
+        self.years.add(year)
+        if place is not None:
+            self.wins += place == 1
+            self.podiums += place <= 3
+            if finishers <= 1:
+                self.percentiles.append(100.0)
+            else:
+                self.percentiles.append(100 * (finishers - place) / (finishers - 1))
+
+        seconds = time.total_seconds()
+        key = (unit, distance)
+        if key not in self.bests or seconds < self.bests[key][0]:
+            self.bests[key] = (seconds, result_id)
+
+    def fields(self):
+        bests = [
+            {
+                'distance': f'{floatformat(distance, "-1")} {unit}',
+                'seconds': seconds,
+                'result': result_id,
+            }
+            for (unit, distance), (seconds, result_id) in sorted(self.bests.items())
+        ]
+        average_percentile = (
+            sum(self.percentiles) / len(self.percentiles) if self.percentiles else None
+        )
+        return {
+            'races': self.races,
+            'wins': self.wins,
+            'podiums': self.podiums,
+            'average_percentile': average_percentile,
+            'bests': bests,
+        }
+
+
+def populate_runner_stats(apps, schema_editor):
+    Result = apps.get_model('racing', 'Result')
+    RunnerSeasonStats = apps.get_model('racing', 'RunnerSeasonStats')
+    RunnerCareerStats = apps.get_model('racing', 'RunnerCareerStats')
+
+    finishers = (
+        Result.objects.filter(race=OuterRef('race'))
+        .order_by()
+        .values('race')
+        .annotate(count=Count('id'))
+        .values('count')
+    )
+    rows = (
+        Result.objects.filter(runner__isnull=False)
+        .annotate(year=ExtractYear('race__meet__date'), finishers=Subquery(finishers))
+        .values_list(
+            'runner_id',
+            'id',
+            'year',
+            'place',
+            'time',
+            'race__distance',
+            'race__unit',
+            'finishers',
+        )
+    )
+
+    seasons = defaultdict(Tally)
+    careers = defaultdict(Tally)
+    for runner_id, *result in rows:
+        seasons[runner_id, result[1]].add(*result)
+        careers[runner_id].add(*result)
+
+    RunnerSeasonStats.objects.bulk_create(
+        (
+            RunnerSeasonStats(runner_id=runner_id, year=year, **tally.fields())
+            for (runner_id, year), tally in seasons.items()
+        ),
+        batch_size=500,
+    )
+    RunnerCareerStats.objects.bulk_create(
+        (
+            RunnerCareerStats(
+                runner_id=runner_id,
+                seasons=len(tally.years),
+                first_year=min(tally.years),
+                last_year=max(tally.years),
+                **tally.fields(),
+            )
+            for runner_id, tally in careers.items()
+        ),
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('racing', '0047_runner_stats'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_runner_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.1 on 2026-10-18 09:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('racing', '0048_populate_runner_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RatingSeason',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.IntegerField()),
+                ('sex', models.CharField(choices=[('M', 'Male'), ('F', 'Female'), ('X', 'Mixed')], max_length=1)),
+                ('stale', models.BooleanField(default=True)),
+                ('computed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('year', 'sex'), name='unique_rating_season')],
+            },
+        ),
+        migrations.CreateModel(
+            name='RunnerRating',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.IntegerField()),
+                ('sex', models.CharField(choices=[('M', 'Male'), ('F', 'Female'), ('X', 'Mixed')], max_length=1)),
+                ('rating', models.FloatField()),
+                ('rank', models.PositiveIntegerField()),
+                ('races', models.PositiveIntegerField()),
+                ('conference', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='racing.conference')),
+                ('runner', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='racing.runner')),
+                ('team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='racing.team')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['year', 'sex', 'rank'], name='racing_runn_year_a8dc87_idx')],
+                'constraints': [models.UniqueConstraint(fields=('runner', 'year'), name='unique_runner_rating')],
+            },
+        ),
+        migrations.CreateModel(
+            name='TeamRating',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.IntegerField()),
+                ('sex', models.CharField(choices=[('M', 'Male'), ('F', 'Female'), ('X', 'Mixed')], max_length=1)),
+                ('rating', models.FloatField()),
+                ('rank', models.PositiveIntegerField()),
+                ('runners', models.PositiveIntegerField()),
+                ('conference', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='racing.conference')),
+                ('team', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='racing.team')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['year', 'sex', 'rank'], name='racing_team_year_cee26a_idx')],
+                'constraints': [models.UniqueConstraint(fields=('team', 'year', 'sex'), name='unique_team_rating')],
+            },
+        ),
+    ]
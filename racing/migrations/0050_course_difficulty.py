@@ -0,0 +1,23 @@
+# Generated by Django 5.2.1 on 2026-10-18 09:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('racing', '0049_ratings'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='race',
+            name='difficulty',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='result',
+            name='equivalent_time',
+            field=models.DurationField(blank=True, editable=False, null=True),
+        ),
+    ]
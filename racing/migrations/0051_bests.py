@@ -0,0 +1,47 @@
+# Generated by Django 5.2.1 on 2026-10-18 09:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('racing', '0050_course_difficulty'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CareerBest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sex', models.CharField(choices=[('M', 'Male'), ('F', 'Female'), ('X', 'Mixed')], max_length=1)),
+                ('distance', models.DecimalField(decimal_places=2, max_digits=5)),
+                ('unit', models.CharField(choices=[('km', 'km'), ('mi', 'miles')], max_length=2)),
+                ('time', models.DurationField()),
+                ('result', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='racing.result')),
+                ('runner', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='racing.runner')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['sex', 'distance', 'unit', 'time', 'id'], name='racing_care_sex_acbb08_idx')],
+                'constraints': [models.UniqueConstraint(fields=('runner', 'distance', 'unit'), name='unique_career_best')],
+            },
+        ),
+        migrations.CreateModel(
+            name='SeasonBest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sex', models.CharField(choices=[('M', 'Male'), ('F', 'Female'), ('X', 'Mixed')], max_length=1)),
+                ('distance', models.DecimalField(decimal_places=2, max_digits=5)),
+                ('unit', models.CharField(choices=[('km', 'km'), ('mi', 'miles')], max_length=2)),
+                ('time', models.DurationField()),
+                ('year', models.IntegerField()),
+                ('result', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='racing.result')),
+                ('runner', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='racing.runner')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['sex', 'distance', 'unit', 'year', 'time', 'id'], name='racing_seas_sex_7eae21_idx')],
+                'constraints': [models.UniqueConstraint(fields=('runner', 'year', 'distance', 'unit'), name='unique_season_best')],
+            },
+        ),
+    ]
@@ -0,0 +1,68 @@
+from django.db import migrations
+from django.db.models.functions import ExtractYear
+
+
+def populate_bests(apps, schema_editor):
+    Result = apps.get_model('racing', 'Result')
+    Runner = apps.get_model('racing', 'Runner')
+    SeasonBest = apps.get_model('racing', 'SeasonBest')
+    CareerBest = apps.get_model('racing', 'CareerBest')
+
+    rows = (
+        Result.objects.filter(runner__isnull=False)
+        .annotate(year=ExtractYear('race__meet__date'))
+        .values_list('runner_id', 'id', 'year', 'time', 'race__distance', 'race__unit')
+    )
+    # as racing.stats built bests as of this migration
+    seasons = {}
+    careers = {}
+    for runner_id, result_id, year, time, distance, unit in rows:
+        # ties go to the earliest result imported
+        for bests, key in (
+            (seasons, (runner_id, year, distance, unit)),
+            (careers, (runner_id, distance, unit)),
+        ):
+            if key not in bests or (time, result_id) < bests[key]:
+                bests[key] = (time, result_id)
+
+    sexes = dict(Runner.objects.values_list('id', 'sex'))
+    SeasonBest.objects.bulk_create(
+        (
+            SeasonBest(
+                runner_id=runner_id,
+                year=year,
+                sex=sexes[runner_id],
+                distance=distance,
+                unit=unit,
+                time=time,
+                result_id=result_id,
+            )
+            for (runner_id, year, distance, unit), (time, result_id) in seasons.items()
+        ),
+        batch_size=500,
+    )
+    CareerBest.objects.bulk_create(
+        (
+            CareerBest(
+                runner_id=runner_id,
+                sex=sexes[runner_id],
+                distance=distance,
+                unit=unit,
+                time=time,
+                result_id=result_id,
+            )
+            for (runner_id, distance, unit), (time, result_id) in careers.items()
+        ),
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('racing', '0051_bests'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_bests, migrations.RunPython.noop),
+    ]
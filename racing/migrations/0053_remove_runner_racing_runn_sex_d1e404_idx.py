@@ -0,0 +1,17 @@
+# Generated by Django 5.2.1 on 2026-10-18 10:19
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('racing', '0052_populate_bests'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='runner',
+            name='racing_runn_sex_d1e404_idx',
+        ),
+    ]
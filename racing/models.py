@@ -1,14 +1,18 @@
-from collections import Counter, defaultdict
-from dataclasses import dataclass
+from datetime import timedelta
 
 from sorl.thumbnail import ImageField
 
+from django.core.exceptions import ValidationError
 from django.db import models
 from django.db.models import Max
 from django.db.models.functions import ExtractYear
 from django.template.defaultfilters import floatformat
 from django.urls import reverse
 
+from racing.budgets import budget
+from racing.names import normalize_name
+from racing.scoring import tally_teams
+
 
 class Sex(models.TextChoices):
     MALE = "M", "Male"
@@ -16,6 +20,41 @@ class Sex(models.TextChoices):
     MIXED = "X", "Mixed"
 
 
+class TrackedFieldsMixin:
+    """
+    Remembers the values of `tracked_fields` as they were loaded from the
+    database, so signal handlers can tell which of them a save changed.
+    """
+
+    tracked_fields = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.reset_tracked_fields()
+        return instance
+
+    def reset_tracked_fields(self):
+        self._loaded_values = {
+            name: self.__dict__.get(name) for name in self.tracked_fields
+        }
+
+    def get_loaded_value(self, name):
+        return getattr(self, "_loaded_values", {}).get(name)
+
+    def has_changed(self, *names):
+        """
+        Returns True if any of the given tracked fields differ from their
+        loaded values (always True for instances not loaded from the database).
+        """
+        if not hasattr(self, "_loaded_values"):
+            return True
+        return any(
+            self._loaded_values.get(name) != self.__dict__.get(name)
+            for name in names or self.tracked_fields
+        )
+
+
 class Conference(models.Model):
     """
     A conference in a cross country league.
@@ -31,7 +70,7 @@ class Conference(models.Model):
         return self.short_name
 
 
-class Team(models.Model):
+class Team(TrackedFieldsMixin, models.Model):
     """
     A cross country team.
 
@@ -51,11 +90,73 @@ class Team(models.Model):
     full_name = models.CharField(max_length=50, unique=True)
     slug = models.SlugField(unique=True)
 
+    # when anything shown on the team's rosters last changed, see racing.versions
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # U Sports races only score U Sports teams, and cached pages use the slug
+    tracked_fields = ("division", "slug")
+
     def __str__(self):
         return self.short_name
 
 
-class Meet(models.Model):
+class TeamAlias(models.Model):
+    """
+    Another name a team appears under in results.
+
+    For instance, "University of Prince Edward Island" for the UPEI Panthers.
+
+    An alias with a sex only applies to races of that sex, e.g. "McGill" is
+    the McGill Martlets in women's races and the McGill Redbirds in men's.
+    """
+
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name="aliases")
+    name = models.CharField(max_length=100)
+    sex = models.CharField(
+        max_length=1,
+        choices=Sex,
+        blank=True,
+        help_text="Only use this alias in races of this sex (blank for any race)",
+    )
+
+    # name as compared when importing results, see racing.aliases
+    normalized_name = models.CharField(max_length=100, editable=False)
+
+    class Meta:
+        verbose_name_plural = "team aliases"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["normalized_name", "sex"], name="unique_team_alias"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.team})"
+
+    def clean(self):
+        # the unique constraint isn't validated by forms, as they don't
+        # include normalized_name
+        duplicate = (
+            TeamAlias.objects.filter(
+                normalized_name=normalize_name(self.name), sex=self.sex
+            )
+            .exclude(pk=self.pk)
+            .select_related("team")
+            .first()
+        )
+        if duplicate:
+            raise ValidationError(
+                {"name": f"{duplicate.name} is already an alias of {duplicate.team}"}
+            )
+
+    def save(self, *args, **kwargs):
+        self.normalized_name = normalize_name(self.name)
+        if (update_fields := kwargs.get("update_fields")) and "name" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "normalized_name"}
+        super().save(*args, **kwargs)
+
+
+class Meet(TrackedFieldsMixin, models.Model):
     """
     A cross country meet.
 
@@ -70,12 +171,20 @@ class Meet(models.Model):
                 name="unique_slug_year",
             )
         ]
+        # listing meets by date, and finding them by year
+        indexes = [models.Index(fields=["date"])]
 
     name = models.CharField(max_length=50)
     slug = models.SlugField()
     date = models.DateField()
     conferences = models.ManyToManyField(Conference)
 
+    # when anything shown on the meet's page last changed, see racing.versions
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # cached pages are keyed by year and slug
+    tracked_fields = ("date", "slug")
+
     def __str__(self):
         return f"{self.name} ({self.date.year})"
 
@@ -83,15 +192,34 @@ class Meet(models.Model):
         return reverse("meet", kwargs={"year": self.date.year, "slug": self.slug})
 
 
-@dataclass
-class TeamScore:
-    score: int
-    scoring_members: list[tuple["Result", int]]  # (result, points)
-    displacers: list[tuple["Result", int]]  # (result, points)
-    tiebreaker_points: int = float("inf")  # infinity if none exists
+class RaceQuerySet(models.QuerySet):
+    def with_podiums(self, places: int = 3):
+        """
+        Prefetches each race's meet and its conferences, with the top
+        `places` team scores and results as `podium_teams` and
+        `podium_results`, so listing any number of races takes a fixed
+        number of queries.
+        """
+        return self.select_related("meet").prefetch_related(
+            "meet__conferences",
+            models.Prefetch(
+                "teamscore_set",
+                queryset=TeamScore.objects.select_related("team").order_by("place")[
+                    :places
+                ],
+                to_attr="podium_teams",
+            ),
+            models.Prefetch(
+                "result_set",
+                queryset=Result.objects.select_related("runner").order_by("time", "id")[
+                    :places
+                ],
+                to_attr="podium_results",
+            ),
+        )
 
 
-class Race(models.Model):
+class Race(TrackedFieldsMixin, models.Model):
     """
     A single cross country race.
 
@@ -105,7 +233,8 @@ class Race(models.Model):
         ("FIRST_DISPLACER", "First Displacer"),
     ]
 
-    meet = models.ForeignKey(Meet, on_delete=models.CASCADE)
+    # indexed by unique_race
+    meet = models.ForeignKey(Meet, on_delete=models.CASCADE, db_index=False)
     distance = models.DecimalField(max_digits=5, decimal_places=2)
     unit = models.CharField(choices=UNIT_CHOICES, max_length=2, default="km")
     time = models.TimeField(null=True, blank=True)
@@ -120,6 +249,26 @@ class Race(models.Model):
 
     type = models.CharField(choices=TYPE_CHOICES, max_length=50, default="OPEN")
 
+    # how much slower the course ran than its distance suggests, maintained
+    # by racing.courses
+    difficulty = models.FloatField(blank=True, null=True, editable=False)
+
+    objects = RaceQuerySet.as_manager()
+
+    # when anything shown on the race's page last changed, see racing.versions
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # Fields that change how teams are scored, or runners' stats
+    tracked_fields = ("scorers", "displacers", "tiebreaker", "type", "distance", "unit")
+
+    class Meta:
+        constraints = [
+            # race pages are looked up by meet, distance, unit and sex
+            models.UniqueConstraint(
+                fields=["meet", "distance", "unit", "sex"], name="unique_race"
+            )
+        ]
+
     def __str__(self):
         return f"{self.meet.name} {self.distance}{self.unit} ({self.sex}, {self.meet.date.year})"
 
@@ -151,106 +300,26 @@ class Race(models.Model):
         >>> race.get_display_distance()
         "13.1 mi"
         """
-        return f'{floatformat(self.distance, "-1")} {self.unit}'
+        return f"{floatformat(self.distance, '-1')} {self.unit}"
 
     def top_teams(self):
-        return self.score_teams()
+        return self.teamscore_set.select_related("team").order_by("place")
 
     def top_results(self):
         return self.result_set.all().order_by("time", "id")
 
+    @budget(queries=1, ms=100)
     def score_teams(self):
         """
         Scores teams and tracks scoring members + displacers.
         Only scores USPORTS teams if race type is USPORTS.
-        """
-        scoring_finisher_count = self.scorers
-        maximum_team_size = scoring_finisher_count + self.displacers
-
-        team_results = defaultdict(list)
-        team_scores = {}
 
+        This always recomputes from results; pages should use `top_teams`,
+        which reads the stored TeamScore rows instead.
+        """
         results = list(self.top_results().select_related("team"))
-
-        # Handle manual points case
-        if any(result.points is not None for result in results):
-            for result in results:
-                team = result.team
-                if result.points is not None:
-                    if team not in team_scores:
-                        team_scores[team] = TeamScore(0, [], [])
-                    if len(team_results[team]) < scoring_finisher_count:
-                        team_scores[team].score += result.points
-                        team_scores[team].scoring_members.append(
-                            (result, result.points)
-                        )
-                        if (
-                            self.tiebreaker == "LAST_SCORER"
-                            and len(team_results[team]) == scoring_finisher_count - 1
-                        ):
-                            # Last scoring runner
-                            team_scores[team].tiebreaker_points = result.points
-                    elif len(team_results[team]) < maximum_team_size:
-                        team_scores[team].displacers.append((result, result.points))
-                        if (
-                            self.tiebreaker == "FIRST_DISPLACER"
-                            and len(team_results[team]) == scoring_finisher_count
-                        ):
-                            # First non-scoring runner
-                            team_scores[team].tiebreaker_points = result.points
-                team_results[team].append(result)
-
-            return sorted(
-                team_scores.items(), key=lambda x: (x[1].score, x[1].tiebreaker_points)
-            )
-
-        # Calculate points manually
-        team_finishers_count = Counter(result.team for result in results)
-
-        # Filter for USPORTS teams if race type is USPORTS
-        scoring_teams = set()
-        for team, count in team_finishers_count.items():
-            if count >= scoring_finisher_count:
-                if self.type == "USPORTS" and team.division != Team.Division.USPORTS:
-                    continue
-                scoring_teams.add(team)
-
-        # Rest of scoring logic remains the same
-        points = 1
-        for result in results:
-            team = result.team
-
-            if team in scoring_teams:
-                if team not in team_scores:
-                    team_scores[team] = TeamScore(0, [], [])
-
-                if len(team_results[team]) < scoring_finisher_count:
-                    # This finisher scores points
-                    team_scores[team].score += points
-                    team_scores[team].scoring_members.append((result, points))
-                    if (
-                        self.tiebreaker == "LAST_SCORER"
-                        and len(team_results[team]) == scoring_finisher_count - 1
-                    ):
-                        # Last scoring runner
-                        team_scores[team].tiebreaker_points = points
-                elif len(team_results[team]) < maximum_team_size:
-                    # This finisher is a displacer
-                    team_scores[team].displacers.append((result, points))
-                    if (
-                        self.tiebreaker == "FIRST_DISPLACER"
-                        and len(team_results[team]) == scoring_finisher_count
-                    ):
-                        # First non-scoring runner
-                        team_scores[team].tiebreaker_points = points
-
-                if len(team_results[team]) < maximum_team_size:
-                    points += 1
-
-            team_results[team].append(result)
-
-        return sorted(
-            team_scores.items(), key=lambda x: (x[1].score, x[1].tiebreaker_points)
+        return tally_teams(
+            results, self.scorers, self.displacers, self.tiebreaker, self.type
         )
 
 
@@ -264,7 +333,27 @@ class OfficialResult(models.Model):
     link = models.URLField()
 
 
-class Runner(models.Model):
+class RunnerQuerySet(models.QuerySet):
+    def with_roster_spots(self):
+        """
+        Prefetches each runner's roster spots (most recent first) and teams.
+
+        `get_teams`, `get_headshot` and `get_roster_spots` then answer from
+        the prefetched spots, so listing any number of runners takes two
+        queries.
+        """
+        return self.prefetch_related(
+            models.Prefetch(
+                "rosterspot_set",
+                queryset=RosterSpot.objects.select_related("team").order_by(
+                    "-year", "id"
+                ),
+                to_attr="prefetched_roster_spots",
+            )
+        )
+
+
+class Runner(TrackedFieldsMixin, models.Model):
     """
     An athlete that has competed in at least one Canadian cross country race.
     """
@@ -275,57 +364,103 @@ class Runner(models.Model):
 
     birth_date = models.DateField(null=True, blank=True)
 
+    # `name` without accents, case or punctuation, kept up to date on save
+    search_name = models.CharField(max_length=100, editable=False, default="")
+
+    # when anything shown on the runner's page last changed, see racing.versions
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = RunnerQuerySet.as_manager()
+
+    # cached pages are keyed by slug, and runner lists show names and sexes
+    tracked_fields = ("name", "slug", "sex")
+
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        self.search_name = normalize_name(self.name)
+        if (update_fields := kwargs.get("update_fields")) and "name" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "search_name"}
+        super().save(*args, **kwargs)
+
     def get_absolute_url(self):
         return reverse("runner", kwargs={"slug": self.slug})
 
+    @budget(queries=1, ms=50)
     def get_teams(self):
+        if hasattr(self, "prefetched_roster_spots"):
+            # teams ordered by the latest year on each, without a query
+            teams = {}
+            for spot in self.prefetched_roster_spots:
+                teams.setdefault(spot.team_id, spot.team)
+            return list(teams.values())
+
         return (
             Team.objects.filter(rosterspot__runner=self)
             .annotate(latest_year=Max("rosterspot__year"))
             .order_by("-latest_year")
         )
 
+    @budget(queries=1, ms=50)
     def get_headshot(self):
         # Return the most recent headshot (if present), None otherwise
+        if hasattr(self, "prefetched_roster_spots"):
+            spots = self.prefetched_roster_spots
+            return next((spot.headshot for spot in spots if spot.headshot), None)
+
         roster_spot = (
             self.rosterspot_set.filter(headshot__isnull=False).order_by("-year").first()
         )
         return roster_spot.headshot if roster_spot else None
-    
+
     def get_roster_spots(self):
         """
         Returns all roster spots for this runner, ordered by year descending.
         """
-        return self.rosterspot_set.order_by("-year")
+        if hasattr(self, "prefetched_roster_spots"):
+            return self.prefetched_roster_spots
 
+        return self.rosterspot_set.select_related("team").order_by("-year")
 
-class RosterSpot(models.Model):
+
+class RosterSpot(TrackedFieldsMixin, models.Model):
     """
     A runner's spot on a team.
 
     For instance, Jeremy Thompson's roster spot on the 2016 UPEI team.
     """
 
-    runner = models.ForeignKey(Runner, on_delete=models.CASCADE)
-    team = models.ForeignKey(Team, on_delete=models.CASCADE)
+    # both indexed by year below
+    runner = models.ForeignKey(Runner, on_delete=models.CASCADE, db_index=False)
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, db_index=False)
     year = models.IntegerField()
     headshot = ImageField(upload_to="headshots", blank=True, null=True)
 
+    # moving a spot invalidates both teams' rosters
+    tracked_fields = ("team_id",)
+
+    class Meta:
+        indexes = [
+            # a runner's spots, most recent first
+            models.Index(fields=["runner", "year"]),
+            # a team's roster for a year
+            models.Index(fields=["team", "year"]),
+        ]
+
     def __str__(self):
         return f"{self.runner} roster spot on {self.team} in {self.year}"
 
 
-class Result(models.Model):
+class Result(TrackedFieldsMixin, models.Model):
     """
     A single result from a cross country race.
 
     For instance, Jeremy Thompson's 35:05 finish in the 2017 AUS Championship.
     """
 
-    race = models.ForeignKey(Race, on_delete=models.PROTECT)
+    # indexed by the race indexes below
+    race = models.ForeignKey(Race, on_delete=models.PROTECT, db_index=False)
     name = models.CharField(max_length=50)
     time = models.DurationField()
     team = models.ForeignKey(Team, on_delete=models.PROTECT)
@@ -333,6 +468,23 @@ class Result(models.Model):
 
     runner = models.ForeignKey(Runner, on_delete=models.SET_NULL, blank=True, null=True)
 
+    # Finishing place within the race, maintained by racing.ranking
+    place = models.PositiveIntegerField(blank=True, null=True, editable=False)
+    # time over the standard distance on an average course, maintained by
+    # racing.courses
+    equivalent_time = models.DurationField(blank=True, null=True, editable=False)
+
+    # moving a result re-ranks both the old and the new race, and reassigning
+    # it invalidates both runners' pages
+    tracked_fields = ("race_id", "runner_id")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["race", "place"]),
+            # a race's results in finishing order (`Race.top_results`)
+            models.Index(fields=["race", "time", "id"]),
+        ]
+
     def __str__(self):
         return (
             self.name
@@ -341,3 +493,246 @@ class Result(models.Model):
             + " "
             + str(self.race.meet.date.year)
         )
+
+
+class TeamScore(models.Model):
+    """
+    A team's stored standing in a race, as computed by `Race.score_teams`.
+
+    Rebuilt by racing.ranking whenever the race's results or scoring rules
+    change, so pages never score teams on the fly.
+    """
+
+    race = models.ForeignKey(Race, on_delete=models.CASCADE)
+    team = models.ForeignKey(Team, on_delete=models.CASCADE)
+    place = models.PositiveIntegerField()
+    score = models.IntegerField()
+    tiebreaker_points = models.IntegerField(blank=True, null=True)
+
+    # lists of {"result": id, "name": name, "points": points}
+    scoring_members = models.JSONField(default=list)
+    displacers = models.JSONField(default=list)
+
+    class Meta:
+        ordering = ["race", "place"]
+        constraints = [
+            models.UniqueConstraint(fields=["race", "team"], name="unique_race_team")
+        ]
+
+    def __str__(self):
+        return f"{self.team} - {self.score} ({self.race})"
+
+
+class RunnerStats(models.Model):
+    """
+    A runner's statistics over some period, maintained by racing.stats
+    whenever one of the runner's results changes.
+    """
+
+    races = models.PositiveIntegerField(default=0)
+    wins = models.PositiveIntegerField(default=0)
+    podiums = models.PositiveIntegerField(default=0)
+    # mean share of each race's other finishers beaten, from 0 (always last)
+    # to 100 (always first)
+    average_percentile = models.FloatField(blank=True, null=True)
+    # best time at each distance, as a list of
+    # {"distance": "8 km", "seconds": seconds, "result": id}
+    bests = models.JSONField(default=list)
+
+    class Meta:
+        abstract = True
+
+    def get_bests(self):
+        """Returns `bests`, with each time as a timedelta under "time"."""
+        return [
+            best | {"time": timedelta(seconds=best["seconds"])} for best in self.bests
+        ]
+
+
+class RunnerSeasonStats(RunnerStats):
+    """
+    A runner's statistics for a season (the year of the meets).
+    """
+
+    # indexed by unique_runner_season
+    runner = models.ForeignKey(
+        Runner, on_delete=models.CASCADE, related_name="season_stats", db_index=False
+    )
+    year = models.IntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["runner", "year"], name="unique_runner_season"
+            )
+        ]
+        verbose_name_plural = "runner season stats"
+
+    def __str__(self):
+        return f"{self.runner} in {self.year}"
+
+
+class RunnerCareerStats(RunnerStats):
+    """
+    A runner's statistics over every season.
+    """
+
+    runner = models.OneToOneField(
+        Runner, on_delete=models.CASCADE, primary_key=True, related_name="career_stats"
+    )
+    seasons = models.PositiveIntegerField(default=0)
+    first_year = models.IntegerField()
+    last_year = models.IntegerField()
+
+    class Meta:
+        verbose_name_plural = "runner career stats"
+
+    def __str__(self):
+        return f"{self.runner} ({self.first_year}-{self.last_year})"
+
+
+class RatingSeason(models.Model):
+    """
+    A season's (year's) ratings for one sex, computed by racing.ratings.
+
+    Marked stale whenever one of its races is refreshed, so the next
+    compute_ratings run only recomputes the seasons that changed.
+    """
+
+    year = models.IntegerField()
+    sex = models.CharField(max_length=1, choices=Sex)
+    stale = models.BooleanField(default=True)
+    computed_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["year", "sex"], name="unique_rating_season")
+        ]
+
+    def __str__(self):
+        return f"{self.get_sex_display()} {self.year}"
+
+
+class Rating(models.Model):
+    """
+    A rating for a season, computed by racing.ratings.
+    """
+
+    year = models.IntegerField()
+    sex = models.CharField(max_length=1, choices=Sex)
+    # on the Elo scale, 400 points being 10-to-1 odds of finishing ahead
+    rating = models.FloatField()
+    # national rank among the season's ratings of this sex
+    rank = models.PositiveIntegerField()
+    # whose meets the team raced most in that season, see racing.ratings
+    conference = models.ForeignKey(
+        Conference, on_delete=models.SET_NULL, blank=True, null=True
+    )
+
+    class Meta:
+        abstract = True
+
+
+class RunnerRating(Rating):
+    """
+    A runner's rating for a season, from every finishing order they were
+    part of.
+    """
+
+    # indexed by unique_runner_rating
+    runner = models.ForeignKey(Runner, on_delete=models.CASCADE, db_index=False)
+    # who the runner raced for most that season
+    team = models.ForeignKey(Team, on_delete=models.CASCADE)
+    races = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["runner", "year"], name="unique_runner_rating"
+            )
+        ]
+        # rankings pages, best first
+        indexes = [models.Index(fields=["year", "sex", "rank"])]
+
+    def __str__(self):
+        return f"{self.runner} ({self.year}): {self.rating:.0f}"
+
+
+class TeamRating(Rating):
+    """
+    A team's rating for a season, the mean of its top scorers' ratings.
+    """
+
+    # indexed by unique_team_rating
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, db_index=False)
+    runners = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["team", "year", "sex"], name="unique_team_rating"
+            )
+        ]
+        indexes = [models.Index(fields=["year", "sex", "rank"])]
+
+    def __str__(self):
+        return f"{self.team} ({self.year}): {self.rating:.0f}"
+
+
+class Best(models.Model):
+    """
+    A runner's best time at a distance, for leaderboards, maintained by
+    racing.stats whenever one of the runner's results changes.
+    """
+
+    # the runner's, so runners in mixed races make their own leaderboard
+    sex = models.CharField(max_length=1, choices=Sex)
+    distance = models.DecimalField(max_digits=5, decimal_places=2)
+    unit = models.CharField(choices=Race.UNIT_CHOICES, max_length=2)
+    time = models.DurationField()
+    result = models.ForeignKey(Result, on_delete=models.CASCADE, related_name="+")
+
+    class Meta:
+        abstract = True
+
+    def __str__(self):
+        return f"{self.runner}: {self.time} over {self.distance}{self.unit}"
+
+
+class SeasonBest(Best):
+    """
+    A runner's best time at a distance in a season.
+    """
+
+    # indexed by unique_season_best
+    runner = models.ForeignKey(Runner, on_delete=models.CASCADE, db_index=False)
+    year = models.IntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["runner", "year", "distance", "unit"],
+                name="unique_season_best",
+            )
+        ]
+        # leaderboard pages, fastest first
+        indexes = [
+            models.Index(fields=["sex", "distance", "unit", "year", "time", "id"])
+        ]
+
+
+class CareerBest(Best):
+    """
+    A runner's best time at a distance over every season.
+    """
+
+    # indexed by unique_career_best
+    runner = models.ForeignKey(Runner, on_delete=models.CASCADE, db_index=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["runner", "distance", "unit"], name="unique_career_best"
+            )
+        ]
+        indexes = [models.Index(fields=["sex", "distance", "unit", "time", "id"])]
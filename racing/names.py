@@ -0,0 +1,19 @@
+import re
+import unicodedata
+
+NON_ALPHANUMERIC = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_name(name: str) -> str:
+    """
+    Normalizes a person's name for matching and searching.
+
+    Accents and punctuation are removed, case is folded and whitespace is
+    collapsed, so that "Émilie  O'Brien-Côté" becomes "emilie o brien cote".
+    """
+    ascii_name = (
+        unicodedata.normalize("NFKD", name.casefold())
+        .encode("ASCII", "ignore")
+        .decode("ASCII")
+    )
+    return NON_ALPHANUMERIC.sub(" ", ascii_name).strip()
@@ -0,0 +1,145 @@
+from contextlib import contextmanager
+from threading import local
+
+from django.db import transaction
+
+from racing.caching import invalidate_races, invalidate_runners
+from racing.courses import normalize_races
+from racing.models import Race, Result, TeamScore
+from racing.ratings import mark_stale
+from racing.scoring import serialize_members
+from racing.stats import update_runner_stats
+
+_state = local()
+
+
+def rank_race(race_id: int):
+    """
+    Recomputes the stored place of every result in a race.
+
+    Places follow the same ordering as `Race.top_results` (time, then id).
+    Only results whose place actually changed are written back.
+    """
+    results = Result.objects.filter(race_id=race_id).order_by("time", "id")
+
+    changed = []
+    for place, result in enumerate(results.only("id", "place"), start=1):
+        if result.place != place:
+            result.place = place
+            changed.append(result)
+
+    Result.objects.bulk_update(changed, ["place"])
+
+
+def score_race(race_id: int):
+    """
+    Rebuilds the stored TeamScore rows for a race from `Race.score_teams`.
+    """
+    race = Race.objects.filter(pk=race_id).first()
+    if race is None:
+        return
+
+    team_scores = [
+        TeamScore(
+            race=race,
+            team=team,
+            place=place,
+            score=tally.score,
+            tiebreaker_points=(
+                None
+                if tally.tiebreaker_points == float("inf")
+                else tally.tiebreaker_points
+            ),
+            scoring_members=serialize_members(tally.scoring_members),
+            displacers=serialize_members(tally.displacers),
+        )
+        for place, (team, tally) in enumerate(race.score_teams(), start=1)
+    ]
+
+    with transaction.atomic():
+        TeamScore.objects.filter(race=race).delete()
+        TeamScore.objects.bulk_create(team_scores)
+
+
+def refresh_races(race_ids, runner_ids=()):
+    """
+    Brings everything derived from the races' results up to date: places,
+    team scores, course difficulties and equivalent times, the stats of
+    their runners (and of `runner_ids`, e.g. runners who lost a result) and
+    the cached pages of both. Their seasons' ratings are marked stale, for
+    the compute_ratings command.
+    """
+    for race_id in race_ids:
+        rank_race(race_id)
+        score_race(race_id)
+    normalize_races(race_ids)
+
+    race_runner_ids = Result.objects.filter(
+        race__in=race_ids, runner__isnull=False
+    ).values_list("runner_id", flat=True)
+    update_runner_stats({*race_runner_ids, *runner_ids})
+    mark_stale(race_ids)
+
+    invalidate_races(race_ids)
+    if runner_ids:
+        invalidate_runners(runner_ids)
+
+
+def refresh_race(race_id: int):
+    refresh_races([race_id])
+
+
+def schedule_race(race_id: int):
+    """
+    Refreshes a race now, or once the enclosing `defer_ranking` block exits.
+    """
+    pending = getattr(_state, "pending", None)
+    if pending is None:
+        refresh_race(race_id)
+    else:
+        pending.add(race_id)
+
+
+def schedule_runners(runner_ids):
+    """
+    Updates runners' stats and invalidates their pages now, or once the
+    enclosing `defer_ranking` block exits.
+    """
+    pending = getattr(_state, "pending_runners", None)
+    if pending is None:
+        update_runner_stats(runner_ids)
+        invalidate_runners(runner_ids)
+    else:
+        pending.update(runner_ids)
+
+
+@contextmanager
+def defer_ranking(discard: bool = False):
+    """
+    Collects races and runners touched inside the block and refreshes them
+    all at once on exit.
+
+    Useful for bulk imports, where saving results one by one would
+    otherwise re-rank and re-score the same race, and update the same
+    runners' stats, for every row.
+
+    :param discard: Refresh nothing on exit, for changes that are rolled
+        back (e.g. an import preview). Ignored in a nested block.
+    """
+    if getattr(_state, "pending", None) is not None:
+        # nested block, the outermost one does the ranking
+        yield
+        return
+
+    _state.pending = set()
+    _state.pending_runners = set()
+    try:
+        yield
+        pending = _state.pending
+        pending_runners = _state.pending_runners
+    finally:
+        _state.pending = None
+        _state.pending_runners = None
+
+    if not discard and (pending or pending_runners):
+        refresh_races(pending, pending_runners)
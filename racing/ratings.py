@@ -0,0 +1,234 @@
+"""
+Season ratings of runners and teams, for the rankings page.
+
+Runners are rated with the Plackett-Luce model, which extends
+Bradley-Terry from pairwise outcomes to whole finishing orders: finishing
+ahead of a field is strong evidence against everyone in it, finishing
+ahead of one runner is weak evidence. With two finishers it is exactly
+Bradley-Terry. Unlike fitting Bradley-Terry to every pair in a race, each
+iteration costs one pass over the results rather than over all pairs.
+
+Strengths are fitted with the minorization-maximization algorithm of
+Hunter (2004), in plain Python. Every runner also gets one win and one
+loss against a reference runner of strength 1, a weak prior that keeps
+unbeaten (or never winning) runners finite and puts disconnected groups
+of runners on the same scale.
+
+Ratings are computed per season and sex by `compute_ratings`, warm
+started from the season's previous ratings, so recomputing a season after
+a new race lands takes a few iterations. Refreshing a race marks its
+season stale (see racing.ranking), and the compute_ratings command
+recomputes stale seasons.
+
+A team's rating is the mean of its top five runners' ratings, for teams
+with at least five rated runners.
+"""
+
+import math
+from collections import Counter, defaultdict
+from itertools import accumulate
+
+from django.db import transaction
+from django.utils import timezone
+
+from racing.caching import RANKINGS_TAG, invalidate
+from racing.models import (
+    Race,
+    RatingSeason,
+    Result,
+    RunnerRating,
+    Sex,
+    TeamRating,
+)
+
+# stop iterating once no strength changes by more than this ratio
+TOLERANCE = 1e-6
+MAX_ITERATIONS = 500
+
+# rating of the prior's reference runner, and points per factor of 10 in
+# strength, as on the Elo scale
+BASE_RATING = 1500
+SCALE = 400
+
+# the runners whose ratings make up a team's, as in team scoring
+TEAM_SCORERS = 5
+
+
+def fit(orders: list[list[int]], strengths: list[float]) -> list[float]:
+    """
+    Fits Plackett-Luce strengths to finishing orders.
+
+    :param orders: Each race's runners (as indexes into `strengths`), in
+        finishing order.
+    :param strengths: Starting strengths, e.g. the season's previous ones.
+    :returns: The fitted strengths.
+    """
+    # stages of each race won, plus the prior's win
+    wins = [1.0] * len(strengths)
+    for order in orders:
+        for index in order[:-1]:
+            wins[index] += 1
+
+    for _ in range(MAX_ITERATIONS):
+        # the prior's win and loss against the reference runner
+        denominators = [2 / (strength + 1) for strength in strengths]
+
+        for order in orders:
+            # the strength left in the race at each stage
+            remaining = list(accumulate(strengths[index] for index in reversed(order)))
+            remaining.reverse()
+            # a runner takes part in every stage up to their own, the last
+            # stage (with one runner left) has no outcome
+            stages = list(accumulate(1 / strength for strength in remaining[:-1]))
+            stages.append(stages[-1])
+            for index, total in zip(order, stages, strict=True):
+                denominators[index] += total
+
+        fitted = [win / total for win, total in zip(wins, denominators, strict=True)]
+        change = max(
+            (
+                abs(math.log(new / old))
+                for new, old in zip(fitted, strengths, strict=True)
+            ),
+            default=0,
+        )
+        strengths = fitted
+        if change < TOLERANCE:
+            break
+
+    return strengths
+
+
+def to_rating(strength: float) -> float:
+    return BASE_RATING + SCALE * math.log10(strength)
+
+
+def to_strength(rating: float) -> float:
+    return 10 ** ((rating - BASE_RATING) / SCALE)
+
+
+def mark_stale(race_ids):
+    """
+    Marks the seasons of the given races as needing new ratings. Mixed
+    races have no season of their own.
+    """
+    seasons = (
+        Race.objects.filter(pk__in=race_ids)
+        .exclude(sex=Sex.MIXED)
+        .values_list("meet__date__year", "sex")
+        .distinct()
+    )
+    RatingSeason.objects.bulk_create(
+        [RatingSeason(year=year, sex=sex, stale=True) for year, sex in seasons],
+        update_conflicts=True,
+        unique_fields=["year", "sex"],
+        update_fields=["stale"],
+    )
+
+
+def _conferences(year: int, sex: str) -> dict[int, int]:
+    """The conference whose meets each team raced most in a season."""
+    counts = defaultdict(Counter)
+    meets = (
+        Result.objects.filter(
+            race__meet__date__year=year,
+            race__sex=sex,
+            race__meet__conferences__isnull=False,
+        )
+        .values_list("team_id", "race__meet_id", "race__meet__conferences")
+        .distinct()
+    )
+    for team_id, _, conference_id in meets:
+        counts[team_id][conference_id] += 1
+    return {
+        team_id: conferences.most_common(1)[0][0]
+        for team_id, conferences in counts.items()
+    }
+
+
+def compute_ratings(year: int, sex: str, warm_start: bool = True) -> int:
+    """
+    Recomputes a season's runner and team ratings, returning how many
+    runners were rated.
+    """
+    results = (
+        Result.objects.filter(
+            race__meet__date__year=year, race__sex=sex, runner__isnull=False
+        )
+        .order_by("race_id", "time", "id")
+        .values_list("race_id", "runner_id", "team_id")
+    )
+
+    indexes = {}
+    orders = defaultdict(list)
+    teams = defaultdict(Counter)
+    for race_id, runner_id, team_id in results:
+        index = indexes.setdefault(runner_id, len(indexes))
+        orders[race_id].append(index)
+        teams[runner_id][team_id] += 1
+
+    strengths = [1.0] * len(indexes)
+    if warm_start:
+        previous = RunnerRating.objects.filter(year=year, sex=sex).values_list(
+            "runner_id", "rating"
+        )
+        for runner_id, rating in previous:
+            if runner_id in indexes:
+                strengths[indexes[runner_id]] = to_strength(rating)
+
+    # a race with a single rated runner says nothing about anyone
+    strengths = fit([order for order in orders.values() if len(order) > 1], strengths)
+
+    conferences = _conferences(year, sex)
+    runner_ratings = sorted(
+        (
+            RunnerRating(
+                runner_id=runner_id,
+                year=year,
+                sex=sex,
+                rating=to_rating(strengths[index]),
+                team_id=teams[runner_id].most_common(1)[0][0],
+                races=teams[runner_id].total(),
+            )
+            for runner_id, index in indexes.items()
+        ),
+        key=lambda rating: -rating.rating,
+    )
+
+    by_team = defaultdict(list)
+    for rank, rating in enumerate(runner_ratings, start=1):
+        rating.rank = rank
+        rating.conference_id = conferences.get(rating.team_id)
+        by_team[rating.team_id].append(rating.rating)
+
+    team_ratings = sorted(
+        (
+            TeamRating(
+                team_id=team_id,
+                year=year,
+                sex=sex,
+                rating=sum(ratings[:TEAM_SCORERS]) / TEAM_SCORERS,
+                runners=len(ratings),
+                conference_id=conferences.get(team_id),
+            )
+            for team_id, ratings in by_team.items()
+            if len(ratings) >= TEAM_SCORERS
+        ),
+        key=lambda rating: -rating.rating,
+    )
+    for rank, rating in enumerate(team_ratings, start=1):
+        rating.rank = rank
+
+    with transaction.atomic():
+        RunnerRating.objects.filter(year=year, sex=sex).delete()
+        TeamRating.objects.filter(year=year, sex=sex).delete()
+        RunnerRating.objects.bulk_create(runner_ratings, batch_size=1000)
+        TeamRating.objects.bulk_create(team_ratings, batch_size=1000)
+        RatingSeason.objects.update_or_create(
+            year=year,
+            sex=sex,
+            defaults={"stale": False, "computed_at": timezone.now()},
+        )
+
+    invalidate(RANKINGS_TAG)
+    return len(runner_ratings)
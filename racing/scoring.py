@@ -0,0 +1,120 @@
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from racing.models import Result
+
+USPORTS = "USPORTS"
+
+
+@dataclass
+class TeamTally:
+    score: int
+    scoring_members: list[tuple["Result", int]]  # (result, points)
+    displacers: list[tuple["Result", int]]  # (result, points)
+    tiebreaker_points: int = float("inf")  # infinity if none exists
+
+
+def tally_teams(results, scorers, displacers, tiebreaker, race_type):
+    """
+    Scores teams and tracks scoring members + displacers.
+    Only scores USPORTS teams if race type is USPORTS.
+
+    :param results: A race's results in finishing order, with `team` loaded.
+    :returns: A list of (team, TeamTally) tuples, best team first.
+    """
+    scoring_finisher_count = scorers
+    maximum_team_size = scoring_finisher_count + displacers
+
+    team_results = defaultdict(list)
+    team_scores = {}
+
+    # Handle manual points case
+    if any(result.points is not None for result in results):
+        for result in results:
+            team = result.team
+            if result.points is not None:
+                if team not in team_scores:
+                    team_scores[team] = TeamTally(0, [], [])
+                if len(team_results[team]) < scoring_finisher_count:
+                    team_scores[team].score += result.points
+                    team_scores[team].scoring_members.append((result, result.points))
+                    if (
+                        tiebreaker == "LAST_SCORER"
+                        and len(team_results[team]) == scoring_finisher_count - 1
+                    ):
+                        # Last scoring runner
+                        team_scores[team].tiebreaker_points = result.points
+                elif len(team_results[team]) < maximum_team_size:
+                    team_scores[team].displacers.append((result, result.points))
+                    if (
+                        tiebreaker == "FIRST_DISPLACER"
+                        and len(team_results[team]) == scoring_finisher_count
+                    ):
+                        # First non-scoring runner
+                        team_scores[team].tiebreaker_points = result.points
+            team_results[team].append(result)
+
+        return sorted(
+            team_scores.items(), key=lambda x: (x[1].score, x[1].tiebreaker_points)
+        )
+
+    # Calculate points manually
+    team_finishers_count = Counter(result.team for result in results)
+
+    # Filter for USPORTS teams if race type is USPORTS
+    scoring_teams = set()
+    for team, count in team_finishers_count.items():
+        if count >= scoring_finisher_count:
+            if race_type == USPORTS and team.division != USPORTS:
+                continue
+            scoring_teams.add(team)
+
+    # Rest of scoring logic remains the same
+    points = 1
+    for result in results:
+        team = result.team
+
+        if team in scoring_teams:
+            if team not in team_scores:
+                team_scores[team] = TeamTally(0, [], [])
+
+            if len(team_results[team]) < scoring_finisher_count:
+                # This finisher scores points
+                team_scores[team].score += points
+                team_scores[team].scoring_members.append((result, points))
+                if (
+                    tiebreaker == "LAST_SCORER"
+                    and len(team_results[team]) == scoring_finisher_count - 1
+                ):
+                    # Last scoring runner
+                    team_scores[team].tiebreaker_points = points
+            elif len(team_results[team]) < maximum_team_size:
+                # This finisher is a displacer
+                team_scores[team].displacers.append((result, points))
+                if (
+                    tiebreaker == "FIRST_DISPLACER"
+                    and len(team_results[team]) == scoring_finisher_count
+                ):
+                    # First non-scoring runner
+                    team_scores[team].tiebreaker_points = points
+
+            if len(team_results[team]) < maximum_team_size:
+                points += 1
+
+        team_results[team].append(result)
+
+    return sorted(
+        team_scores.items(), key=lambda x: (x[1].score, x[1].tiebreaker_points)
+    )
+
+
+def serialize_members(members):
+    """
+    Flattens (result, points) tuples into JSON-friendly dicts for storage.
+    """
+    return [
+        {"result": result.pk, "name": result.name, "points": points}
+        for result, points in members
+    ]
@@ -0,0 +1,66 @@
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import connection
+from django.db.models import Case, IntegerField, Q, Value, When
+
+from racing.models import Runner
+from racing.names import normalize_name
+
+# Most runners a single search returns, however many pages are requested
+MAX_RESULTS = 200
+
+
+def search_runners(query: str, limit: int = 20, offset: int = 0) -> list[Runner]:
+    """
+    Searches runners by name, ignoring accents, case and punctuation.
+
+    On Postgres, names are matched and ranked by trigram word similarity
+    (using the trigram index on `Runner.search_name`), so small typos still
+    find the runner. Other databases fall back to substring matching.
+
+    Results are capped at MAX_RESULTS, with roster spots prefetched for
+    listing teams and headshots, and career stats selected.
+    """
+    terms = normalize_name(query)
+    if not terms or offset >= MAX_RESULTS:
+        return []
+
+    limit = min(limit, MAX_RESULTS - offset)
+
+    if connection.vendor == "postgresql":
+        runners = _search_trigram(terms)
+    else:
+        runners = _search_substring(terms)
+
+    runners = runners.with_roster_spots().select_related("career_stats")
+    return list(runners[offset : offset + limit])
+
+
+def _search_trigram(terms: str):
+    # both lookups are served by the trigram index, `trigram_word_similar`
+    # tolerates typos using pg_trgm's word_similarity_threshold
+    return (
+        Runner.objects.filter(
+            Q(search_name__contains=terms) | Q(search_name__trigram_word_similar=terms)
+        )
+        .annotate(similarity=TrigramWordSimilarity(terms, "search_name"))
+        .order_by("-similarity", "name", "id")
+    )
+
+
+def _search_substring(terms: str):
+    condition = Q()
+    for term in terms.split():
+        condition &= Q(search_name__contains=term)
+
+    return (
+        Runner.objects.filter(condition)
+        .annotate(
+            # names starting with the query first
+            prefix=Case(
+                When(search_name__startswith=terms, then=Value(0)),
+                default=Value(1),
+                output_field=IntegerField(),
+            )
+        )
+        .order_by("prefix", "name", "id")
+    )
@@ -0,0 +1,204 @@
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from racing.caching import (
+    INDEX_TAG,
+    LEADERBOARDS_TAG,
+    MEETS_TAG,
+    RANKINGS_TAG,
+    RUNNERS_TAG,
+    invalidate,
+    invalidate_races,
+    invalidate_runners,
+    meet_tag,
+    runner_tag,
+    team_tag,
+)
+from racing.models import (
+    Conference,
+    Meet,
+    Race,
+    RatingSeason,
+    Result,
+    RosterSpot,
+    Runner,
+    Team,
+)
+from racing.ranking import schedule_race, schedule_runners
+from racing.versions import touch_meets, touch_teams
+
+# Result fields that change places or team scores within a race
+RESULT_FIELDS = {"race", "race_id", "name", "time", "team", "team_id", "points"}
+
+
+@receiver(post_save, sender=Result)
+def refresh_saved_result(sender, instance, created, update_fields, raw, **kwargs):
+    if raw:
+        # loading fixtures, derived data comes from the fixture itself
+        return
+
+    race_ids = set()
+    if update_fields is None or RESULT_FIELDS & set(update_fields):
+        race_ids = {instance.race_id, instance.get_loaded_value("race_id")}
+
+    if instance.has_changed("runner_id"):
+        runner_ids = {instance.runner_id, instance.get_loaded_value("runner_id")}
+        schedule_runners(runner_ids - {None})
+        # runners link races, for ratings and course difficulties
+        race_ids.add(instance.race_id)
+
+    # refreshing a race also invalidates its cached pages
+    for race_id in race_ids - {None}:
+        schedule_race(race_id)
+    if not race_ids:
+        invalidate_races([instance.race_id])
+
+    instance.reset_tracked_fields()
+
+
+@receiver(post_delete, sender=Result)
+def refresh_deleted_result(sender, instance, **kwargs):
+    schedule_race(instance.race_id)
+
+    if instance.runner_id:
+        schedule_runners([instance.runner_id])
+
+
+@receiver(post_save, sender=Race)
+def rescore_race(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+
+    # a new race has no results to score yet
+    if not created and instance.has_changed():
+        schedule_race(instance.pk)
+    else:
+        invalidate_races([instance.pk])
+
+    instance.reset_tracked_fields()
+
+
+@receiver(pre_delete, sender=Race)
+def invalidate_deleted_race(sender, instance, **kwargs):
+    invalidate_races([instance.pk])
+
+
+@receiver(post_save, sender=Meet)
+def invalidate_saved_meet(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+
+    tags = [INDEX_TAG, MEETS_TAG, meet_tag(instance.date.year, instance.slug)]
+    loaded_date = instance.get_loaded_value("date")
+    if loaded_date and instance.has_changed("date", "slug"):
+        tags.append(meet_tag(loaded_date.year, instance.get_loaded_value("slug")))
+    invalidate(*tags)
+
+    race_ids = instance.race_set.values_list("id", flat=True)
+    if loaded_date and loaded_date.year != instance.date.year:
+        # runners' season stats and ratings are by the year of the meet
+        for race_id in race_ids:
+            schedule_race(race_id)
+        RatingSeason.objects.filter(
+            year=loaded_date.year, sex__in=instance.race_set.values("sex")
+        ).update(stale=True)
+    else:
+        invalidate_races(race_ids)
+
+    instance.reset_tracked_fields()
+
+
+@receiver(pre_delete, sender=Meet)
+def invalidate_deleted_meet(sender, instance, **kwargs):
+    invalidate(INDEX_TAG, MEETS_TAG, meet_tag(instance.date.year, instance.slug))
+
+
+@receiver(post_save, sender=Runner)
+def invalidate_saved_runner(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+
+    tags = [runner_tag(instance.slug)]
+    if created or instance.has_changed("name", "slug", "sex"):
+        tags.append(RUNNERS_TAG)
+    if loaded_slug := instance.get_loaded_value("slug"):
+        tags.append(runner_tag(loaded_slug))
+    invalidate(*tags)
+
+    if not created:
+        invalidate_runners([instance.pk])
+
+    instance.reset_tracked_fields()
+
+
+@receiver(pre_delete, sender=Runner)
+def invalidate_deleted_runner(sender, instance, **kwargs):
+    invalidate(RUNNERS_TAG)
+    invalidate_runners([instance.pk])
+
+
+@receiver(post_save, sender=RosterSpot)
+def invalidate_saved_roster_spot(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+
+    team_ids = {instance.team_id, instance.get_loaded_value("team_id")}
+    team_slugs = Team.objects.filter(pk__in=team_ids).values_list("slug", flat=True)
+    invalidate(*(team_tag(slug) for slug in team_slugs))
+    touch_teams(team_ids)
+
+    # headshots also show on the runner's race pages
+    invalidate_runners([instance.runner_id])
+
+    instance.reset_tracked_fields()
+
+
+@receiver(pre_delete, sender=RosterSpot)
+def invalidate_deleted_roster_spot(sender, instance, **kwargs):
+    invalidate(team_tag(instance.team.slug))
+    invalidate_runners([instance.runner_id])
+
+
+@receiver(post_save, sender=Team)
+def rescore_team_races(sender, instance, created, raw, **kwargs):
+    if raw or created:
+        instance.reset_tracked_fields()
+        return
+
+    # division decides whether the team scores in U Sports races
+    if instance.has_changed("division"):
+        race_ids = (
+            Result.objects.filter(team=instance, race__type="USPORTS")
+            .values_list("race_id", flat=True)
+            .distinct()
+        )
+        for race_id in race_ids:
+            schedule_race(race_id)
+
+    # team names show on race, roster, runner, rankings and leaderboard pages
+    tags = [team_tag(instance.slug), RANKINGS_TAG, LEADERBOARDS_TAG]
+    if loaded_slug := instance.get_loaded_value("slug"):
+        tags.append(team_tag(loaded_slug))
+    invalidate(*tags)
+    invalidate_races(
+        Result.objects.filter(team=instance).values_list("race_id", flat=True)
+    )
+    invalidate_runners(
+        RosterSpot.objects.filter(team=instance).values_list("runner_id", flat=True)
+    )
+
+    instance.reset_tracked_fields()
+
+
+@receiver(post_save, sender=Conference)
+@receiver(pre_delete, sender=Conference)
+def invalidate_conference(sender, instance, **kwargs):
+    # conferences are listed on the home, results and meet pages
+    invalidate(INDEX_TAG, MEETS_TAG)
+    invalidate(
+        *(
+            meet_tag(date.year, slug)
+            for date, slug in instance.meet_set.values_list("date", "slug")
+        )
+    )
+    touch_meets(instance.meet_set.values_list("id", flat=True))
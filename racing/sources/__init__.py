@@ -0,0 +1,90 @@
+"""
+Parsers for the formats results are published in.
+
+Each parser reads a binary stream (a downloaded page or a local file) and
+yields racing.importing.Record objects, ready for `import_records`. Parsers
+are registered by name for the `ingest` management command:
+
+    @register("my_timer")
+    def parse_my_timer(stream):
+        for row in json.load(stream)["results"]:
+            yield Record(name=row["name"], team=row["team"], time=row["time"])
+"""
+
+import codecs
+from collections.abc import Callable
+from contextlib import contextmanager
+from dataclasses import dataclass
+from urllib.request import Request, urlopen
+
+from racing.importing import ResultImportError, read_csv
+
+USER_AGENT = "canada-xc"
+
+
+@dataclass(frozen=True)
+class Parser:
+    name: str
+    parse: Callable
+    # Accept header to send when fetching the source over HTTP
+    accept: str = "*/*"
+
+    @property
+    def description(self) -> str:
+        return (self.parse.__doc__ or "").strip().split("\n")[0]
+
+
+PARSERS: dict[str, Parser] = {}
+
+
+def register(name: str, accept: str = "*/*"):
+    """Registers a parser function under a name."""
+
+    def decorator(parse):
+        PARSERS[name] = Parser(name, parse, accept)
+        return parse
+
+    return decorator
+
+
+def get_parser(name: str) -> Parser:
+    """Returns the parser registered under a name, or raises KeyError."""
+    return PARSERS[name]
+
+
+@contextmanager
+def document_fields(source: str):
+    """
+    Reports a field missing from a JSON document as a ResultImportError,
+    rather than a KeyError or IndexError from the parser.
+    """
+    try:
+        yield
+    except (KeyError, IndexError, TypeError) as e:
+        raise ResultImportError([f"Unexpected {source} document: {e!r}"]) from e
+
+
+def open_source(source: str, accept: str = "*/*"):
+    """Opens a URL or a local file as a binary stream."""
+    if source.startswith(("http://", "https://")):
+        request = Request(source, headers={"Accept": accept, "User-Agent": USER_AGENT})
+        return urlopen(request, timeout=30)
+
+    return open(source, "rb")
+
+
+@register("csv")
+def parse_csv(stream):
+    """CSV files with name, time, team and optional points columns."""
+    return read_csv(codecs.iterdecode(stream, "utf-8-sig"))
+
+
+# adapters register themselves on import
+from racing.sources import (  # noqa: E402, F401
+    athletic_live,
+    race_roster,
+    rseq,
+    run_signup,
+    speed_river,
+    usports,
+)
@@ -0,0 +1,19 @@
+import json
+
+from racing.importing import Record
+from racing.sources import document_fields, register
+
+
+@register("athletic_live", accept="application/json")
+def parse_athletic_live(stream):
+    """Athletic Live individual results JSON (an ind_res_list document)."""
+    with document_fields("Athletic Live"):
+        for result in json.load(stream)["_source"]["r"]:
+            athlete = result["a"]
+            yield Record(
+                name=athlete["n"],
+                team=(athlete.get("t") or {}).get("n", ""),
+                time=result.get("m", ""),
+                # non-scoring runners have 0 points
+                points=result.get("pt") or None,
+            )
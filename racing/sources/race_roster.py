@@ -0,0 +1,16 @@
+import json
+
+from racing.importing import Record
+from racing.sources import document_fields, register
+
+
+@register("race_roster", accept="application/json")
+def parse_race_roster(stream):
+    """RaceRoster results JSON, as served by its results API."""
+    with document_fields("RaceRoster"):
+        for result in json.load(stream)["data"]:
+            yield Record(
+                name=result["name"],
+                team=result.get("teamName") or "",
+                time=result.get("gunTime") or "",
+            )
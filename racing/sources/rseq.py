@@ -0,0 +1,21 @@
+from racing.importing import Record
+from racing.sources import register
+from racing.sources.tables import iter_rows
+
+
+def _bound_to(field: str):
+    """Matches the cell whose knockout.js binding shows a field."""
+    return lambda cell: f"text: {field}" in cell.attrs.get("data-bind", "")
+
+
+@register("rseq")
+def parse_rseq(stream):
+    """RSEQ results HTML."""
+    for row in iter_rows(stream):
+        name = row.find(_bound_to("FullName"))
+        team = row.find(_bound_to("TeamName"))
+        time = row.find(_bound_to("GunElapsedFormatted"))
+        if row.in_head or not (name and team and time):
+            continue
+
+        yield Record(name=name.text, team=team.text, time=time.text)
@@ -0,0 +1,17 @@
+import json
+
+from racing.importing import Record
+from racing.sources import document_fields, register
+
+# positions of the values in each result row
+NAME = 2
+TEAM = 3
+CHIP_TIME = 24
+
+
+@register("run_signup", accept="application/json, */*; q=0.01")
+def parse_run_signup(stream):
+    """RunSignup results JSON, as served to its results pages."""
+    with document_fields("RunSignup"):
+        for row in json.load(stream)["resultSet"]["results"]:
+            yield Record(name=row[NAME], team=row[TEAM], time=row[CHIP_TIME])
@@ -0,0 +1,49 @@
+from racing.importing import Record
+from racing.sources import register
+from racing.sources.tables import iter_rows
+
+
+def _section(header: str) -> str | None:
+    header = header.lower()
+    # check women first, "women" contains "men"
+    if "women" in header or "femmes" in header:
+        return "women"
+    if "men" in header or "hommes" in header:
+        return "men"
+    return None
+
+
+@register("speed_river")
+def parse_speed_river(stream, section: str = "women"):
+    """
+    Speed River results HTML, where one page lists the women's and men's
+    races one after the other.
+
+    :param section: "women" or "men", the race to read.
+    """
+    in_section = False
+    in_results = False
+
+    for row in iter_rows(stream):
+        if "racetable" not in row.table_classes:
+            continue
+
+        header = row.find(lambda cell: "h01" in cell.classes)
+        if header is not None:
+            in_section = _section(header.text) == section
+            in_results = False
+            continue
+        if not in_section:
+            continue
+
+        # the column headers come before each section's results
+        if row.find(lambda cell: "h11" in cell.classes):
+            in_results = True
+            continue
+
+        if in_results and len(row.cells) >= 6:
+            yield Record(
+                name=row.cells[1].text,
+                team=row.cells[2].text,
+                time=row.cells[5].text,
+            )
@@ -0,0 +1,113 @@
+"""
+Streaming reader for the rows of HTML tables.
+
+Results pages can be large, so rather than building a whole document tree
+(like BeautifulSoup does), the page is fed to the standard library's event
+based HTMLParser a chunk at a time, and each table row is yielded as soon as
+it is complete.
+"""
+
+import codecs
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+
+CHUNK_SIZE = 64 * 1024
+
+
+@dataclass
+class Cell:
+    classes: set[str]
+    attrs: dict[str, str]
+    parts: list[str] = field(default_factory=list)
+
+    @property
+    def text(self) -> str:
+        """The cell's text, with whitespace collapsed."""
+        return " ".join("".join(self.parts).split())
+
+
+@dataclass
+class Row:
+    cells: list[Cell]
+    # classes of the table the row is in
+    table_classes: set[str]
+    # whether the row is in the table's <thead>
+    in_head: bool
+
+    def find(self, predicate) -> Cell | None:
+        """Returns the first cell matching the predicate, if any."""
+        return next((cell for cell in self.cells if predicate(cell)), None)
+
+
+class TableRowParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.rows = []
+        self.tables = []
+        self.in_head = False
+        self.row = None
+        self.cell = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = {name: value or "" for name, value in attrs}
+        classes = set(attrs.get("class", "").split())
+
+        if tag == "table":
+            self.tables.append(classes)
+        elif tag == "thead":
+            self.in_head = True
+        elif tag == "tbody":
+            self.in_head = False
+        elif tag == "tr":
+            # the previous row's </tr> is optional
+            self._end_row()
+            table_classes = self.tables[-1] if self.tables else set()
+            self.row = Row([], table_classes, self.in_head)
+        elif tag in ("td", "th") and self.row is not None:
+            self._end_cell()
+            self.cell = Cell(classes, attrs)
+
+    def handle_endtag(self, tag):
+        if tag in ("td", "th"):
+            self._end_cell()
+        elif tag == "tr":
+            self._end_row()
+        elif tag == "thead":
+            self.in_head = False
+        elif tag == "table":
+            self._end_row()
+            if self.tables:
+                self.tables.pop()
+
+    def handle_data(self, data):
+        if self.cell is not None:
+            self.cell.parts.append(data)
+
+    def _end_cell(self):
+        if self.cell is not None and self.row is not None:
+            self.row.cells.append(self.cell)
+        self.cell = None
+
+    def _end_row(self):
+        self._end_cell()
+        if self.row is not None:
+            self.rows.append(self.row)
+        self.row = None
+
+    def pop_rows(self) -> list[Row]:
+        rows, self.rows = self.rows, []
+        return rows
+
+
+def iter_rows(stream, encoding: str = "utf-8"):
+    """Yields the rows of every table in an HTML document, read from a stream."""
+    parser = TableRowParser()
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+
+    while chunk := stream.read(CHUNK_SIZE):
+        parser.feed(decoder.decode(chunk))
+        yield from parser.pop_rows()
+
+    parser.feed(decoder.decode(b"", final=True))
+    parser.close()
+    yield from parser.pop_rows()
@@ -0,0 +1,25 @@
+from racing.importing import Record
+from racing.sources import register
+from racing.sources.tables import iter_rows
+
+
+def clean_name(name: str) -> str:
+    """Converts "LASTNAME, Firstname" to "Firstname Lastname"."""
+    parts = name.strip().split(",")
+    if len(parts) == 2:
+        return f"{parts[1].strip().title()} {parts[0].strip().title()}"
+    return name.strip().title()
+
+
+@register("usports")
+def parse_usports(stream):
+    """U Sports championship results HTML."""
+    for row in iter_rows(stream):
+        if row.in_head or len(row.cells) < 6:
+            continue
+
+        yield Record(
+            name=clean_name(row.cells[4].text),
+            team=row.cells[5].text,
+            time=row.cells[2].text,
+        )
@@ -0,0 +1,210 @@
+"""
+Runners' season and career statistics, and their bests for leaderboards.
+
+RunnerSeasonStats and RunnerCareerStats rows, and SeasonBest and
+CareerBest rows, are rebuilt from a runner's results by
+`update_runner_stats`, which racing.ranking calls for every runner whose
+results, places or races changed. Pages read the stored rows instead of
+aggregating results on every render.
+"""
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import ExtractYear
+
+from racing.caching import LEADERBOARDS_TAG, invalidate
+from racing.models import (
+    CareerBest,
+    Race,
+    Result,
+    Runner,
+    RunnerCareerStats,
+    RunnerSeasonStats,
+    SeasonBest,
+)
+
+# runners whose results are read at a time
+BATCH_SIZE = 500
+
+
+def percentile(place: int, finishers: int) -> float:
+    """The share of a race's other finishers beaten, from 0 to 100."""
+    if finishers <= 1:
+        return 100.0
+    return 100 * (finishers - place) / (finishers - 1)
+
+
+@dataclass
+class Tally:
+    races: int = 0
+    wins: int = 0
+    podiums: int = 0
+    percentiles: list[float] = field(default_factory=list)
+    years: set[int] = field(default_factory=set)
+    # (unit, distance) -> (seconds, result id)
+    bests: dict[tuple[str, Decimal], tuple[float, int]] = field(default_factory=dict)
+
+    def add(self, result_id, year, place, time, distance, unit, finishers):
+        self.races += 1
+        self.years.add(year)
+        if place is not None:
+            self.wins += place == 1
+            self.podiums += place <= 3
+            self.percentiles.append(percentile(place, finishers))
+
+        seconds = time.total_seconds()
+        key = (unit, distance)
+        if key not in self.bests or seconds < self.bests[key][0]:
+            self.bests[key] = (seconds, result_id)
+
+    def fields(self) -> dict:
+        """Field values of the stats model, shared by seasons and careers."""
+        bests = []
+        for (unit, distance), (seconds, result_id) in sorted(self.bests.items()):
+            race = Race(distance=distance, unit=unit)
+            bests.append(
+                {
+                    "distance": race.get_display_distance(),
+                    "seconds": seconds,
+                    "result": result_id,
+                }
+            )
+
+        if self.percentiles:
+            average_percentile = sum(self.percentiles) / len(self.percentiles)
+        else:
+            average_percentile = None
+
+        return {
+            "races": self.races,
+            "wins": self.wins,
+            "podiums": self.podiums,
+            "average_percentile": average_percentile,
+            "bests": bests,
+        }
+
+
+def result_rows(results):
+    """
+    The values `build_stats` and `build_bests` read from each of `results`
+    (a queryset of results with runners).
+    """
+    finishers = (
+        results.model.objects.filter(race=OuterRef("race"))
+        .order_by()
+        .values("race")
+        .annotate(count=Count("id"))
+        .values("count")
+    )
+    return results.annotate(
+        year=ExtractYear("race__meet__date"), finishers=Subquery(finishers)
+    ).values_list(
+        "runner_id",
+        "id",
+        "year",
+        "place",
+        "time",
+        "race__distance",
+        "race__unit",
+        "finishers",
+    )
+
+
+def build_stats(rows, season_model, career_model) -> tuple[list, list]:
+    """
+    Returns the unsaved season and career stats of the runners in `rows`
+    (see `result_rows`).
+    """
+    seasons = defaultdict(Tally)
+    careers = defaultdict(Tally)
+    for runner_id, *result in rows:
+        seasons[runner_id, result[1]].add(*result)
+        careers[runner_id].add(*result)
+
+    season_stats = [
+        season_model(runner_id=runner_id, year=year, **tally.fields())
+        for (runner_id, year), tally in seasons.items()
+    ]
+    career_stats = [
+        career_model(
+            runner_id=runner_id,
+            seasons=len(tally.years),
+            first_year=min(tally.years),
+            last_year=max(tally.years),
+            **tally.fields(),
+        )
+        for runner_id, tally in careers.items()
+    ]
+    return season_stats, career_stats
+
+
+def build_bests(rows, sexes, season_model, career_model) -> tuple[list, list]:
+    """
+    Returns the unsaved season and career bests of the runners in `rows`
+    (see `result_rows`), given each runner's sex.
+    """
+    seasons = {}
+    careers = {}
+    for runner_id, result_id, year, _, time, distance, unit, _ in rows:
+        # ties go to the earliest result imported
+        for bests, key in (
+            (seasons, (runner_id, year, distance, unit)),
+            (careers, (runner_id, distance, unit)),
+        ):
+            if key not in bests or (time, result_id) < bests[key]:
+                bests[key] = (time, result_id)
+
+    season_bests = [
+        season_model(
+            runner_id=runner_id,
+            year=year,
+            sex=sexes[runner_id],
+            distance=distance,
+            unit=unit,
+            time=time,
+            result_id=result_id,
+        )
+        for (runner_id, year, distance, unit), (time, result_id) in seasons.items()
+    ]
+    career_bests = [
+        career_model(
+            runner_id=runner_id,
+            sex=sexes[runner_id],
+            distance=distance,
+            unit=unit,
+            time=time,
+            result_id=result_id,
+        )
+        for (runner_id, distance, unit), (time, result_id) in careers.items()
+    ]
+    return season_bests, career_bests
+
+
+def update_runner_stats(runner_ids):
+    """Rebuilds the season and career stats and bests of the given runners."""
+    runner_ids = sorted(set(runner_ids) - {None})
+    for start in range(0, len(runner_ids), BATCH_SIZE):
+        batch = runner_ids[start : start + BATCH_SIZE]
+        rows = list(result_rows(Result.objects.filter(runner_id__in=batch)))
+        season_stats, career_stats = build_stats(
+            rows, RunnerSeasonStats, RunnerCareerStats
+        )
+        sexes = dict(Runner.objects.filter(pk__in=batch).values_list("id", "sex"))
+        season_bests, career_bests = build_bests(rows, sexes, SeasonBest, CareerBest)
+
+        with transaction.atomic():
+            RunnerSeasonStats.objects.filter(runner_id__in=batch).delete()
+            RunnerCareerStats.objects.filter(runner_id__in=batch).delete()
+            SeasonBest.objects.filter(runner_id__in=batch).delete()
+            CareerBest.objects.filter(runner_id__in=batch).delete()
+            RunnerSeasonStats.objects.bulk_create(season_stats)
+            RunnerCareerStats.objects.bulk_create(career_stats)
+            SeasonBest.objects.bulk_create(season_bests)
+            CareerBest.objects.bulk_create(career_bests)
+
+    if runner_ids:
+        invalidate(LEADERBOARDS_TAG)
@@ -0,0 +1,383 @@
+"""
+Reproducible synthetic data, for measuring performance at realistic (or
+much larger) volumes without a copy of production.
+
+The same seed and sizes always generate the same dataset. Runners are
+recruited onto teams and race for up to four seasons, with names drawn
+from small pools of French and English names, so accents, look-alike
+spellings ("Émilie" and "Emilie") and exact name collisions all occur as
+they do in real results.
+
+Everything is written with bulk inserts, so signals don't fire. Places,
+team scores, course difficulties, runners' stats and ratings are computed
+here instead.
+"""
+
+import random
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+from django.db import transaction
+from django.utils.text import slugify
+
+from racing.caching import INDEX_TAG, MEETS_TAG, RUNNERS_TAG, invalidate
+from racing.courses import normalize_races
+from racing.models import (
+    Conference,
+    Meet,
+    Race,
+    Result,
+    RosterSpot,
+    Runner,
+    Team,
+)
+from racing.names import normalize_name
+from racing.ranking import score_race
+from racing.ratings import compute_ratings
+from racing.stats import update_runner_stats
+
+FEMALE_FIRST_NAMES = [
+    "Émilie",
+    "Emilie",
+    "Zoé",
+    "Chloé",
+    "Noémie",
+    "Léa",
+    "Renée",
+    "Anaïs",
+    "Béatrice",
+    "Maëlle",
+    "Sarah",
+    "Emma",
+    "Olivia",
+    "Ava",
+    "Charlotte",
+    "Abigail",
+    "Claire",
+    "Hannah",
+    "Megan",
+    "Rachel",
+]
+MALE_FIRST_NAMES = [
+    "Jérôme",
+    "Jerome",
+    "François",
+    "Rémi",
+    "Noé",
+    "André",
+    "Mathéo",
+    "Étienne",
+    "Gaël",
+    "Loïc",
+    "Liam",
+    "Noah",
+    "Owen",
+    "Lucas",
+    "Ethan",
+    "Jacob",
+    "Connor",
+    "Ryan",
+    "Matthew",
+    "Nathan",
+]
+LAST_NAMES = [
+    "Tremblay",
+    "Gagnon",
+    "Côté",
+    "Cote",
+    "Bouchard",
+    "Gauthier",
+    "Lévesque",
+    "Bélanger",
+    "Pelletier",
+    "Bergeron",
+    "O'Brien",
+    "MacDonald",
+    "McLeod",
+    "Smith",
+    "Brown",
+    "Nguyen",
+    "Wilson",
+    "Martin",
+    "Roy",
+    "Thompson",
+    "Fraser",
+    "Campbell",
+    "St-Pierre",
+    "Ouellet",
+    "Morin",
+]
+CONFERENCES = [
+    ("AUS", "Atlantic University Sport"),
+    ("RSEQ", "Réseau du sport étudiant du Québec"),
+    ("OUA", "Ontario University Athletics"),
+    ("CW", "Canada West"),
+]
+# (distance, unit) of women's and men's races
+RACE_DISTANCES = {"F": (6, "km"), "M": (8, "km")}
+# season bests for an 8 km runner, in seconds; other distances scale
+FASTEST_PACE = 24 * 60 / 8
+SLOWEST_PACE = 34 * 60 / 8
+
+SEASON_LENGTH = 4
+
+
+@dataclass
+class DatasetSize:
+    seasons: int = 5
+    meets_per_season: int = 8
+    teams: int = 40
+    # runners of each sex on each team, every season
+    runners_per_team: int = 12
+    # teams entered in a typical (non-championship) race
+    teams_per_race: int = 15
+    # results left unassigned to a runner, as in freshly imported races
+    unassigned_share: float = 0.05
+
+    def describe(self) -> str:
+        return (
+            f"{self.seasons} seasons of {self.meets_per_season} meets, "
+            f"{self.teams} teams of {self.runners_per_team} runners per sex"
+        )
+
+
+def generate(size: DatasetSize, seed: int = 0, first_season: int = 2000) -> dict:
+    """
+    Generates a dataset, returning how many of each object were created.
+
+    :param first_season: Year of the first season, far enough in the past
+        by default not to collide with real meets' slugs.
+    """
+    generator = _Generator(random.Random(seed), size, first_season)
+    with transaction.atomic():
+        counts = generator.run()
+
+    # new meets, teams and runners have no cached pages yet, only the lists
+    # of them do
+    invalidate(INDEX_TAG, MEETS_TAG, RUNNERS_TAG)
+    return counts
+
+
+def add_size_arguments(parser, size: DatasetSize):
+    """Adds options for a dataset's size, defaulting to `size`."""
+    parser.add_argument("--seasons", type=int, default=size.seasons)
+    parser.add_argument(
+        "--meets", type=int, default=size.meets_per_season, help="Per season"
+    )
+    parser.add_argument("--teams", type=int, default=size.teams)
+    parser.add_argument(
+        "--runners",
+        type=int,
+        default=size.runners_per_team,
+        help="Per team, sex and season",
+    )
+    parser.add_argument(
+        "--teams-per-race",
+        type=int,
+        default=size.teams_per_race,
+        help="Teams entered in races other than championships",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+
+
+def size_from_options(options) -> DatasetSize:
+    return DatasetSize(
+        seasons=options["seasons"],
+        meets_per_season=options["meets"],
+        teams=options["teams"],
+        runners_per_team=options["runners"],
+        teams_per_race=options["teams_per_race"],
+    )
+
+
+class _Generator:
+    def __init__(self, rng: random.Random, size: DatasetSize, first_season: int):
+        self.rng = rng
+        self.size = size
+        self.first_season = first_season
+        self.slugs = set(Runner.objects.values_list("slug", flat=True))
+        # slug -> next suffix to try, as names collide a lot
+        self.suffixes = {}
+        # id -> seconds per km, of every runner generated
+        self.paces = {}
+
+    def run(self) -> dict:
+        conferences = self._conferences()
+        teams = self._teams()
+
+        counts = {"teams": len(teams), "meets": 0, "races": 0, "results": 0}
+        counts["runners"], counts["roster spots"] = self._rosters(teams)
+
+        seasons = range(self.first_season, self.first_season + self.size.seasons)
+        for season in seasons:
+            races = self._meets(season, conferences)
+            counts["meets"] += self.size.meets_per_season
+            counts["races"] += len(races)
+            counts["results"] += self._results(season, races, teams)
+
+        update_runner_stats(self.paces)
+        for season in seasons:
+            for sex in RACE_DISTANCES:
+                compute_ratings(season, sex)
+        return counts
+
+    def _conferences(self):
+        existing = {c.short_name: c for c in Conference.objects.all()}
+        return [
+            existing.get(short_name)
+            or Conference.objects.create(short_name=short_name, full_name=full_name)
+            for short_name, full_name in CONFERENCES
+        ]
+
+    def _teams(self):
+        teams = [
+            Team(
+                short_name=f"SYN{index}",
+                full_name=f"Synthetic University {self.first_season}-{index}",
+                slug=f"synthetic-{self.first_season}-{index}",
+                # every fourth team is a club, not scored in U Sports races
+                division=Team.Division.USPORTS if index % 4 else Team.Division.CLUB,
+            )
+            for index in range(1, self.size.teams + 1)
+        ]
+        return Team.objects.bulk_create(teams)
+
+    def _rosters(self, teams):
+        """Recruits runners onto every team, returning the counts created."""
+        runners = []
+        spots = []
+        recruits = max(self.size.runners_per_team // SEASON_LENGTH, 1)
+        last_season = self.first_season + self.size.seasons
+
+        # the first season starts with a full roster, recruited over the
+        # seasons before it
+        starts = range(self.first_season - SEASON_LENGTH + 1, last_season)
+        first_names = {"F": FEMALE_FIRST_NAMES, "M": MALE_FIRST_NAMES}
+
+        for team in teams:
+            for sex in RACE_DISTANCES:
+                for start in starts:
+                    for _ in range(recruits):
+                        name = (
+                            f"{self.rng.choice(first_names[sex])} "
+                            f"{self.rng.choice(LAST_NAMES)}"
+                        )
+                        runner = Runner(
+                            name=name,
+                            slug=self._slug(name),
+                            sex=sex,
+                            search_name=normalize_name(name),
+                        )
+                        runner.team = team
+                        runner.seasons = range(
+                            max(start, self.first_season),
+                            min(start + SEASON_LENGTH, last_season),
+                        )
+                        runners.append(runner)
+
+        Runner.objects.bulk_create(runners, batch_size=1000)
+
+        self.rosters = {}
+        for runner in runners:
+            self.paces[runner.id] = self.rng.uniform(FASTEST_PACE, SLOWEST_PACE)
+            for season in runner.seasons:
+                spots.append(RosterSpot(runner=runner, team=runner.team, year=season))
+                key = (runner.team.id, runner.sex, season)
+                self.rosters.setdefault(key, []).append(runner)
+
+        RosterSpot.objects.bulk_create(spots, batch_size=1000)
+        return len(runners), len(spots)
+
+    def _slug(self, name: str) -> str:
+        base = slug = slugify(name)
+        suffix = self.suffixes.get(base, 2)
+        while slug in self.slugs:
+            slug = f"{base}-{suffix}"
+            suffix += 1
+        self.suffixes[base] = suffix
+        self.slugs.add(slug)
+        return slug
+
+    def _meets(self, season: int, conferences) -> list[Race]:
+        # Saturdays from mid-September, the last meet being the championship
+        day = date(season, 9, 15)
+        day += timedelta(days=(5 - day.weekday()) % 7)
+
+        meets = []
+        for index in range(self.size.meets_per_season):
+            championship = index == self.size.meets_per_season - 1
+            if championship:
+                name = "Synthetic Championship"
+            else:
+                name = f"Synthetic Open {index + 1}"
+            meets.append(
+                Meet(name=name, slug=slugify(name), date=day + timedelta(weeks=index))
+            )
+        meets = Meet.objects.bulk_create(meets)
+
+        Meet.conferences.through.objects.bulk_create(
+            Meet.conferences.through(
+                meet_id=meet.id, conference_id=conferences[i % len(conferences)].id
+            )
+            for i, meet in enumerate(meets)
+        )
+
+        races = []
+        for meet in meets:
+            championship = meet is meets[-1]
+            for sex, (distance, unit) in RACE_DISTANCES.items():
+                race = Race(
+                    meet=meet,
+                    distance=distance,
+                    unit=unit,
+                    sex=sex,
+                    type="USPORTS" if championship else "OPEN",
+                )
+                # a harder or easier course, the same for every runner, which
+                # racing.courses estimates from the results
+                race.true_difficulty = self.rng.uniform(0.97, 1.05)
+                race.championship = championship
+                races.append(race)
+
+        return Race.objects.bulk_create(races)
+
+    def _results(self, season: int, races: list[Race], teams) -> int:
+        results = []
+        for race in races:
+            if race.championship:
+                entered = teams
+            else:
+                entered = self.rng.sample(
+                    teams, min(self.size.teams_per_race, len(teams))
+                )
+
+            race_results = []
+            for team in entered:
+                roster = self.rosters.get((team.id, race.sex, season), [])
+                starters = self.rng.sample(
+                    roster, min(len(roster), self.rng.randint(7, 10))
+                )
+                for runner in starters:
+                    pace = self.paces[runner.id] * race.true_difficulty
+                    seconds = pace * race.distance * self.rng.gauss(1, 0.02)
+                    unassigned = self.rng.random() < self.size.unassigned_share
+                    race_results.append(
+                        Result(
+                            race=race,
+                            name=runner.name,
+                            team=team,
+                            time=timedelta(seconds=round(seconds, 1)),
+                            runner=None if unassigned else runner,
+                        )
+                    )
+
+            race_results.sort(key=lambda result: result.time)
+            for place, result in enumerate(race_results, start=1):
+                result.place = place
+            results.extend(race_results)
+
+        Result.objects.bulk_create(results, batch_size=1000)
+        for race in races:
+            score_race(race.id)
+        normalize_races([race.id for race in races])
+        return len(results)
@@ -1 +1,1350 @@
-# Create your tests here.
+"""
+Query and time budgets (see racing.budgets) of every view and budgeted
+model method, on synthetic datasets of growing size, request metrics,
+places, team scores, team aliases, head-to-heads, runner search, ratings,
+runner stats, course difficulties, leaderboards, the JSON API, page cache
+invalidation, result imports, runner matching, archive verification,
+static exports, thumbnails, finish times and results sources.
+
+Run with `python manage.py test racing`.
+"""
+
+import csv
+import io
+import json
+import math
+import os
+import tempfile
+import time
+from collections import Counter
+from dataclasses import dataclass, replace
+from datetime import timedelta
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+from import_export.formats.base_formats import CSV
+from PIL import Image
+from sorl.thumbnail import get_thumbnail
+from sorl.thumbnail.images import ImageFile
+
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import get_resolver, resolve, reverse
+from django.utils import timezone
+from django.utils.text import slugify
+
+from racing.admin import RaceResultAdmin
+from racing.aliases import TeamResolver
+from racing.api import encode_cursor
+from racing.benchmarks import (
+    BENCHMARK_CACHES,
+    Sample,
+    benchmark_views,
+    uncovered_views,
+    view_urls,
+)
+from racing.budgets import get_budget
+from racing.caching import invalidate_runners
+from racing.courses import fit as fit_courses
+from racing.export import Manifest, SitePages, page_file, render_pages, write_page
+from racing.head_to_head import head_to_head, rivals
+from racing.importing import (
+    Record,
+    ResultImportError,
+    _place_new_results,
+    import_records,
+    import_results,
+)
+from racing.metrics import Registry, collect, quiet
+from racing.models import (
+    CareerBest,
+    Meet,
+    Race,
+    RatingSeason,
+    Result,
+    Runner,
+    RunnerCareerStats,
+    RunnerRating,
+    Sex,
+    Team,
+    TeamAlias,
+)
+from racing.names import normalize_name
+from racing.ranking import defer_ranking, rank_race, refresh_race
+from racing.ratings import compute_ratings, fit, mark_stale
+from racing.scoring import tally_teams
+from racing.search import MAX_RESULTS, search_runners
+from racing.sources import get_parser
+from racing.stats import Tally
+from racing.synthetic import DatasetSize, generate
+from racing.templatetags.racing_extras import finish_time
+from racing.thumbnails import get_thumbnails
+from racing.times import DNF, DNS, DQ, INVALID, parse_time, parse_times
+from racing.views import RUNNERS_PER_PAGE
+
+BASE_SIZE = DatasetSize(
+    seasons=2, meets_per_season=2, teams=4, runners_per_team=8, teams_per_race=2
+)
+# documents in each format racing.sources parses
+SOURCES_DIR = Path(__file__).parent / "testdata" / "sources"
+# volumes of results measured, as multiples of BASE_SIZE's
+SCALES = (1, 10, 100)
+# timed requests of each view, at each scale
+REPEAT = 3
+
+
+def scaled_size(scale: int) -> DatasetSize:
+    # results grow with both meets and the teams entered in each race
+    factor = round(math.sqrt(scale))
+    return replace(
+        BASE_SIZE,
+        meets_per_season=BASE_SIZE.meets_per_season * factor,
+        teams=BASE_SIZE.teams * factor,
+        teams_per_race=BASE_SIZE.teams_per_race * factor,
+    )
+
+
+@override_settings(CACHES=BENCHMARK_CACHES)
+class ViewBudgetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # measurements by scale, then by label (see `view_urls`)
+        cls.measurements = {}
+        for scale in SCALES:
+            with transaction.atomic():
+                generate(scaled_size(scale))
+                cls.urls = view_urls(Sample.pick())
+                cls.measurements[scale] = benchmark_views(cls.urls, REPEAT)
+                transaction.set_rollback(True)
+
+    def test_every_view_has_a_budget(self):
+        for pattern in get_resolver("racing.urls").url_patterns:
+            with self.subTest(pattern.name):
+                self.assertIsNotNone(get_budget(pattern.callback))
+
+    def test_every_view_is_measured(self):
+        self.assertEqual(uncovered_views(self.urls.values()), set())
+
+    def test_views_are_within_budget(self):
+        for scale, measurements in self.measurements.items():
+            for label, measurement in measurements.items():
+                with self.subTest(label, scale=scale):
+                    view = resolve(measurement.url.split("?")[0]).func
+                    view_budget = get_budget(view)
+                    self.assertEqual(measurement.status, 200)
+                    self.assertLessEqual(measurement.queries, view_budget.queries)
+                    self.assertLessEqual(measurement.ms, view_budget.ms)
+
+    def test_query_counts_are_constant(self):
+        base = self.measurements[SCALES[0]]
+        for scale in SCALES[1:]:
+            for label, measurement in self.measurements[scale].items():
+                with self.subTest(label, scale=scale):
+                    self.assertEqual(measurement.queries, base[label].queries)
+
+
+class ModelBudgetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate(scaled_size(SCALES[-1]))
+        cls.sample = Sample.pick()
+
+    def assertWithinBudget(self, method, call):
+        """Asserts that `call`, calling the budgeted `method`, is within budget."""
+        method_budget = get_budget(method)
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            call()
+            ms = (time.perf_counter() - start) * 1000
+
+        self.assertLessEqual(len(queries), method_budget.queries)
+        self.assertLessEqual(ms, method_budget.ms)
+
+    def test_race_score_teams(self):
+        self.assertWithinBudget(Race.score_teams, self.sample.race.score_teams)
+
+    def test_runner_get_teams(self):
+        runner = self.sample.runner
+        self.assertWithinBudget(Runner.get_teams, lambda: list(runner.get_teams()))
+
+    def test_runner_get_headshot(self):
+        self.assertWithinBudget(Runner.get_headshot, self.sample.runner.get_headshot)
+
+    def test_prefetched_runner_methods_make_no_queries(self):
+        runner = Runner.objects.with_roster_spots().get(pk=self.sample.runner.pk)
+        with self.assertNumQueries(0):
+            runner.get_teams()
+            runner.get_headshot()
+            runner.get_roster_spots()
+
+    def test_races_with_podiums_take_fixed_queries(self):
+        # the race, meet and conference, team score and result queries
+        with self.assertNumQueries(4):
+            for race in Race.objects.with_podiums():
+                race.meet.conferences.all()
+                self.assertLessEqual(len(race.podium_teams), 3)
+                self.assertLessEqual(len(race.podium_results), 3)
+
+
+@override_settings(
+    CACHES=BENCHMARK_CACHES,
+    ALLOWED_HOSTS=["testserver"],
+    INTERNAL_IPS=[],
+    METRICS_TOKEN="token",
+)
+class MetricsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate(BASE_SIZE)
+        cls.sample = Sample.pick()
+
+    def test_requests_are_recorded(self):
+        url = self.sample.runner.get_absolute_url()
+        with quiet():
+            self.client.get(url)
+            self.client.get(url)
+
+        totals = self.site_totals()
+        view = (("view", "runner"),)
+        requests = (("method", "GET"), ("status", "200"), *view)
+        self.assertGreaterEqual(totals[("racing_requests_total", requests)], 2)
+        self.assertGreater(totals[("racing_request_queries_total", view)], 0)
+        self.assertGreater(totals[("racing_request_template_seconds_total", view)], 0)
+        hits = (("result", "hit"), *view)
+        self.assertGreaterEqual(totals[("racing_page_cache_total", hits)], 1)
+
+    def site_totals(self) -> dict:
+        """Sums every process's series, as Prometheus queries would."""
+        totals = {}
+        for (name, labels), value in collect().items():
+            labels = tuple(label for label in labels if label[0] != "process")
+            totals[name, labels] = totals.get((name, labels), 0) + value
+        return totals
+
+    def test_processes_publish_their_own_series(self):
+        requests = ("racing_requests_total", (("view", "simulated"),))
+        for pid in (1001, 1002):
+            process = Registry()
+            process.totals[requests] = 1
+            with mock.patch("racing.metrics.os.getpid", return_value=pid):
+                process.publish(force=True)
+
+        processes = [
+            dict(labels)["process"]
+            for (name, labels) in collect()
+            if name == requests[0] and dict(labels).get("view") == "simulated"
+        ]
+        self.assertEqual(
+            sorted(process.rsplit(":", 1)[1] for process in processes),
+            ["1001", "1002"],
+        )
+
+    def test_metrics_need_the_token(self):
+        url = reverse("metrics")
+        with quiet():
+            self.assertEqual(self.client.get(url).status_code, 404)
+            response = self.client.get(url, HTTP_AUTHORIZATION="Bearer token")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"# TYPE racing_requests_total counter", response.content)
+
+
+@override_settings(CACHES=BENCHMARK_CACHES)
+class RankingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate(BASE_SIZE)
+        cls.race = Race.objects.first()
+
+    def places(self):
+        results = self.race.result_set.order_by("time", "id")
+        return list(results.values_list("id", "place"))
+
+    def test_places_follow_finishing_order(self):
+        places = self.places()
+        self.assertEqual(
+            [place for _, place in places], list(range(1, len(places) + 1))
+        )
+
+    def test_ties_are_broken_by_id(self):
+        first, second = self.race.result_set.order_by("time", "id")[:2]
+        # bulk updates skip the signals that would re-rank the race
+        Result.objects.filter(pk=second.pk).update(time=first.time)
+        Result.objects.filter(pk=first.pk).update(place=None)
+        rank_race(self.race.pk)
+
+        ids = sorted([first.pk, second.pk])
+        self.assertEqual(self.places()[:2], [(ids[0], 1), (ids[1], 2)])
+
+    def test_only_changed_places_are_written(self):
+        with CaptureQueriesContext(connection) as queries:
+            rank_race(self.race.pk)
+        self.assertEqual(len(queries), 1)
+
+        # the winner drops to last, everyone else moves up one
+        results = list(self.race.result_set.order_by("time", "id"))
+        last = results[-1]
+        Result.objects.filter(pk=results[0].pk).update(time=last.time + timedelta(1))
+        with CaptureQueriesContext(connection) as queries:
+            rank_race(self.race.pk)
+
+        updates = [q for q in queries if q["sql"].startswith("UPDATE")]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(
+            self.places(),
+            [
+                (result.pk, place)
+                for place, result in enumerate(results[1:] + results[:1], 1)
+            ],
+        )
+
+
+@dataclass(frozen=True)
+class ScoringTeam:
+    name: str
+    division: str = "USPORTS"
+
+
+def finishers(*teams: ScoringTeam, points=None) -> list[SimpleNamespace]:
+    """Results in finishing order, one per team given."""
+    points = points or [None] * len(teams)
+    return [
+        SimpleNamespace(pk=pk, name=f"Runner {pk}", team=team, points=value)
+        for pk, (team, value) in enumerate(zip(teams, points, strict=True), 1)
+    ]
+
+
+def tallies(results, scorers=2, displacers=1, tiebreaker="LAST_SCORER", type=""):
+    return [
+        (team.name, tally.score, tally.tiebreaker_points)
+        for team, tally in tally_teams(results, scorers, displacers, tiebreaker, type)
+    ]
+
+
+class ScoringTests(SimpleTestCase):
+    """`tally_teams` scores as `Race.score_teams` always has."""
+
+    a, b, c = ScoringTeam("A"), ScoringTeam("B"), ScoringTeam("C", "CLUB")
+
+    def test_incomplete_teams_take_no_points(self):
+        a, b, c = self.a, self.b, self.c
+        results = finishers(a, b, c, a, b, a, b, a)
+        # C has one finisher of the two that score, A's fourth isn't a displacer
+        self.assertEqual(tallies(results), [("A", 4, 3), ("B", 6, 4)])
+
+        _, tally = tally_teams(results, 2, 1, "LAST_SCORER", "")[0]
+        self.assertEqual([points for _, points in tally.scoring_members], [1, 3])
+        self.assertEqual([points for _, points in tally.displacers], [5])
+
+    def test_tiebreakers(self):
+        a, b = self.a, self.b
+        results = finishers(a, b, b, a, a, b)
+        # tied on 5, B's last scorer beat A's, A's displacer beat B's
+        self.assertEqual(tallies(results), [("B", 5, 3), ("A", 5, 4)])
+        self.assertEqual(
+            tallies(results, tiebreaker="FIRST_DISPLACER"), [("A", 5, 5), ("B", 5, 6)]
+        )
+
+    def test_usports_races_only_score_usports_teams(self):
+        a, b, c = self.a, self.b, self.c
+        results = finishers(c, a, c, b, a, b)
+        self.assertEqual(tallies(results), [("C", 4, 3), ("A", 7, 5), ("B", 10, 6)])
+        self.assertEqual(tallies(results, type="USPORTS"), [("A", 4, 3), ("B", 6, 4)])
+
+    def test_manual_points(self):
+        a, b = self.a, self.b
+        results = finishers(a, b, a, b, points=[1, 2, 4, 3])
+        self.assertEqual(tallies(results), [("B", 5, 3), ("A", 5, 4)])
+
+
+@override_settings(CACHES=BENCHMARK_CACHES)
+class TeamScoreTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate(BASE_SIZE)
+
+    def test_stored_scores_match_the_results(self):
+        for race in Race.objects.all():
+            stored = [
+                (score.team, score.score, score.tiebreaker_points)
+                for score in race.top_teams()
+            ]
+            scored = [
+                (team, tally.score, tally.tiebreaker_points)
+                for team, tally in race.score_teams()
+            ]
+            # no tiebreaker is stored as null
+            scored = [
+                (team, score, None if points == float("inf") else points)
+                for team, score, points in scored
+            ]
+            self.assertEqual(stored, scored)
+
+
+@override_settings(CACHES=BENCHMARK_CACHES)
+class HeadToHeadTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate(BASE_SIZE)
+        cls.runner = Sample.pick().runner
+
+    def common_races(self, opponent_id) -> list[tuple]:
+        """(race, runner's time, opponent's time) of the pair, computed naively."""
+        times = {}
+        for race_id, runner_id, finish in Result.objects.values_list(
+            "race_id", "runner_id", "time"
+        ):
+            times.setdefault(race_id, {})[runner_id] = finish
+        return sorted(
+            (race_id, runners[self.runner.id], runners[opponent_id])
+            for race_id, runners in times.items()
+            if self.runner.id in runners and opponent_id in runners
+        )
+
+    def test_records_of_each_opponent(self):
+        opponents = [rival["runner"].id for rival in rivals(self.runner, limit=3)]
+        # a runner of the other sex never ran a race with them
+        stranger = Runner.objects.exclude(sex=self.runner.sex).first().id
+
+        with CaptureQueriesContext(connection) as queries:
+            records = head_to_head(self.runner, [*opponents, stranger])
+        self.assertEqual(len(queries), 1)
+
+        for opponent_id in opponents:
+            record = records[opponent_id]
+            common = self.common_races(opponent_id)
+            races = [
+                (race["race"].id, race["runnerA"]["time"], race["runnerB"]["time"])
+                for race in record["common_races"]
+            ]
+            self.assertEqual(sorted(races), common)
+            self.assertEqual(record["wins_a"], sum(a < b for _, a, b in common))
+            self.assertEqual(record["wins_b"], sum(b < a for _, a, b in common))
+
+        self.assertEqual(
+            records[stranger], {"common_races": [], "wins_a": 0, "wins_b": 0}
+        )
+
+    def test_rivals_are_the_most_frequent_opponents(self):
+        with CaptureQueriesContext(connection) as queries:
+            found = rivals(self.runner, limit=3)
+        self.assertEqual(len(queries), 2)
+
+        counts = [len(self.common_races(rival["runner"].id)) for rival in found]
+        self.assertEqual([rival["races"] for rival in found], counts)
+        self.assertEqual(counts, sorted(counts, reverse=True))
+        for rival in found:
+            common = self.common_races(rival["runner"].id)
+            self.assertEqual(rival["wins"], sum(a < b for _, a, b in common))
+            self.assertEqual(rival["losses"], sum(b < a for _, a, b in common))
+
+
+@override_settings(CACHES=BENCHMARK_CACHES, ALLOWED_HOSTS=["testserver"])
+class SearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        runners = [("Émilie Côté", "F"), ("Emily Coates", "F"), ("Marc Côté", "M")]
+        # more namesakes than a search returns
+        runners += [(f"Zebedee Quartz {index}", "M") for index in range(210)]
+        Runner.objects.bulk_create(
+            Runner(
+                name=name, slug=slugify(name), sex=sex, search_name=normalize_name(name)
+            )
+            for name, sex in runners
+        )
+
+    def names(self, query, **kwargs) -> list[str]:
+        return [runner.name for runner in search_runners(query, **kwargs)]
+
+    def test_accents_and_case_are_ignored(self):
+        self.assertEqual(self.names("emilie cote"), ["Émilie Côté"])
+        self.assertEqual(self.names("ÉMILIE  CÔTÉ"), ["Émilie Côté"])
+        self.assertCountEqual(self.names("côté"), ["Émilie Côté", "Marc Côté"])
+
+    def test_every_word_must_match(self):
+        self.assertEqual(self.names("cote emilie"), ["Émilie Côté"])
+        self.assertEqual(self.names("cote marc"), ["Marc Côté"])
+        self.assertEqual(self.names("emilie coates"), [])
+        self.assertEqual(self.names("  "), [])
+
+    def test_results_are_capped(self):
+        self.assertEqual(len(self.names("zebedee", limit=500)), MAX_RESULTS)
+        self.assertEqual(
+            len(self.names("zebedee", limit=20, offset=MAX_RESULTS - 5)), 5
+        )
+        self.assertEqual(self.names("zebedee", offset=MAX_RESULTS), [])
+
+    def list_page(self, page) -> tuple[int, int | None]:
+        with quiet():
+            response = self.client.get(
+                reverse("runners"), {"name": "zebedee", "page": page}
+            )
+        return len(response.context["runners"]), response.context["next_page"]
+
+    def test_runner_list_pages(self):
+        last_page = MAX_RESULTS // RUNNERS_PER_PAGE
+        self.assertEqual(self.list_page(2), (RUNNERS_PER_PAGE, 3))
+        self.assertEqual(self.list_page(last_page), (RUNNERS_PER_PAGE, None))
+        self.assertEqual(self.list_page(last_page + 1), (0, None))
+
+    def test_invalid_pages_show_the_first(self):
+        for page in ("abc", "0", "-3", ""):
+            with self.subTest(page=page):
+                self.assertEqual(self.list_page(page), (RUNNERS_PER_PAGE, 2))
+
+
+class TeamAliasTests(TestCase):
+    def test_aliases_of_a_sex_override_common_ones(self):
+        women, men = (
+            Team.objects.create(short_name=name, full_name=name, slug=name.lower())
+            for name in ("Martlets", "Redbirds")
+        )
+        for team, sex in ((men, ""), (women, "F")):
+            TeamAlias.objects.create(
+                team=team, name="McGill", sex=sex, normalized_name="mcgill"
+            )
+
+        self.assertEqual(TeamResolver(sex="F").resolve("McGill"), women)
+        self.assertEqual(TeamResolver(sex="M").resolve("McGill"), men)
+        self.assertEqual(TeamResolver(sex="M").resolve("martlets"), women)
+
+
+class RatingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate(BASE_SIZE)
+        cls.sample = Sample.pick()
+
+    def test_fit_orders_consistent_finishers(self):
+        # runner 0 always beats 1, who always beats 2
+        strengths = fit([[0, 1, 2], [0, 2], [1, 2]], [1.0] * 3)
+        self.assertGreater(strengths[0], strengths[1])
+        self.assertGreater(strengths[1], strengths[2])
+
+    def test_warm_and_cold_starts_agree(self):
+        race = self.sample.race
+        year = race.meet.date.year
+        warm = dict(
+            RunnerRating.objects.filter(year=year, sex=race.sex).values_list(
+                "runner_id", "rating"
+            )
+        )
+        compute_ratings(year, race.sex, warm_start=False)
+        cold = RunnerRating.objects.filter(year=year, sex=race.sex)
+        for runner_id, rating in cold.values_list("runner_id", "rating"):
+            self.assertAlmostEqual(rating, warm[runner_id], places=2)
+
+    def test_refreshing_a_race_marks_its_season_stale(self):
+        race = self.sample.race
+        season = RatingSeason.objects.get(year=race.meet.date.year, sex=race.sex)
+        self.assertFalse(season.stale)
+        refresh_race(race.pk)
+        season.refresh_from_db()
+        self.assertTrue(season.stale)
+
+    def test_mixed_races_have_no_season(self):
+        race = self.sample.race
+        Race.objects.filter(pk=race.pk).update(sex=Sex.MIXED)
+        mark_stale([race.pk])
+        self.assertFalse(RatingSeason.objects.filter(sex=Sex.MIXED))
+
+
+class CourseTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate(BASE_SIZE)
+        cls.sample = Sample.pick()
+
+    def test_fit_recovers_difficulties(self):
+        abilities = {"a": 7.0, "b": 7.1, "c": 7.2}
+        difficulties = {1: 0.02, 2: -0.03, 3: 0.01}
+        observations = [
+            (race, runner, ability + difficulty)
+            for runner, ability in abilities.items()
+            for race, difficulty in difficulties.items()
+        ]
+        fitted = fit_courses(observations, {})
+        for race, difficulty in difficulties.items():
+            self.assertAlmostEqual(fitted[race], difficulty, places=5)
+
+    def test_equivalent_times_use_the_difficulty(self):
+        # women's synthetic races are over the standard 6 km
+        race = Race.objects.filter(sex="F").first()
+        for result in race.result_set.all():
+            seconds = result.time.total_seconds() / race.difficulty
+            self.assertAlmostEqual(
+                result.equivalent_time.total_seconds(), seconds, delta=0.05
+            )
+
+    def test_only_linked_races_are_refitted(self):
+        race = self.sample.race
+        # men's and women's races share no runners
+        other = Race.objects.exclude(sex=race.sex).first()
+        Race.objects.filter(pk=other.pk).update(difficulty=2)
+
+        result = race.result_set.first()
+        result.time += timedelta(seconds=30)
+        result.save()
+
+        other.refresh_from_db()
+        self.assertEqual(other.difficulty, 2)
+        result.refresh_from_db()
+        self.assertIsNotNone(result.equivalent_time)
+
+
+class TallyTests(SimpleTestCase):
+    def test_average_percentile(self):
+        tally = Tally()
+        for place, finishers in ((1, 5), (5, 5), (2, 3), (1, 1), (None, 4)):
+            tally.add(1, 2024, place, timedelta(minutes=30), 8, "km", finishers)
+
+        fields = tally.fields()
+        # unplaced results count as races, but not towards the percentile
+        self.assertEqual(fields["races"], 5)
+        self.assertEqual(fields["wins"], 2)
+        self.assertEqual(fields["podiums"], 3)
+        self.assertEqual(fields["average_percentile"], (100 + 0 + 50 + 100) / 4)
+
+    def test_unplaced_runners_have_no_average_percentile(self):
+        tally = Tally()
+        tally.add(1, 2024, None, timedelta(minutes=30), 8, "km", 4)
+        self.assertIsNone(tally.fields()["average_percentile"])
+
+
+@override_settings(CACHES=BENCHMARK_CACHES)
+class RunnerStatsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate(BASE_SIZE)
+        cls.sample = Sample.pick()
+
+    def recomputed(self, runner, year=None) -> tuple:
+        """A runner's races, wins, podiums and average percentile."""
+        results = runner.result_set.annotate(finishers=Count("race__result"))
+        if year is not None:
+            results = results.filter(race__meet__date__year=year)
+        places = [(result.place, result.finishers) for result in results]
+        percentiles = [
+            100 * (finishers - place) / (finishers - 1) if finishers > 1 else 100
+            for place, finishers in places
+        ]
+        return (
+            len(places),
+            sum(place == 1 for place, _ in places),
+            sum(place <= 3 for place, _ in places),
+            sum(percentiles) / len(percentiles),
+        )
+
+    def stored(self, stats) -> tuple:
+        return (stats.races, stats.wins, stats.podiums, stats.average_percentile)
+
+    def assertStatsMatchResults(self, runner):
+        runner = Runner.objects.get(pk=runner.pk)
+        self.assertEqual(self.stored(runner.career_stats), self.recomputed(runner))
+        for season in runner.season_stats.all():
+            with self.subTest(runner=runner.slug, year=season.year):
+                self.assertEqual(
+                    self.stored(season), self.recomputed(runner, season.year)
+                )
+
+    def test_stored_stats_match_the_results(self):
+        for runner in Runner.objects.filter(result__isnull=False).distinct():
+            self.assertStatsMatchResults(runner)
+
+    def test_time_edits_move_wins_and_podiums(self):
+        first, second = self.sample.race.result_set.filter(
+            runner__isnull=False
+        ).order_by("place")[:2]
+        self.assertEqual((first.place, second.place), (1, 2))
+        wins = {
+            result.runner_id: result.runner.career_stats.wins
+            for result in (first, second)
+        }
+
+        second.time = first.time - timedelta(seconds=1)
+        second.save()
+
+        for result, change in ((first, -1), (second, 1)):
+            self.assertStatsMatchResults(result.runner)
+            self.assertEqual(
+                RunnerCareerStats.objects.get(runner=result.runner_id).wins,
+                wins[result.runner_id] + change,
+            )
+
+    def test_deleted_results_leave_the_season(self):
+        runner = self.sample.runner
+        result = runner.result_set.select_related("race__meet").first()
+        year = result.race.meet.date.year
+        races = runner.season_stats.get(year=year).races
+
+        result.delete()
+
+        self.assertStatsMatchResults(runner)
+        season = runner.season_stats.filter(year=year).first()
+        self.assertEqual(season.races if season else 0, races - 1)
+
+    def test_runners_without_results_have_no_career(self):
+        runner = self.sample.runner
+        with defer_ranking():
+            for result in runner.result_set.all():
+                result.delete()
+
+        self.assertFalse(RunnerCareerStats.objects.filter(runner=runner))
+        self.assertFalse(runner.season_stats.exists())
+        self.assertFalse(CareerBest.objects.filter(runner=runner))
+
+
+@override_settings(CACHES=BENCHMARK_CACHES, ALLOWED_HOSTS=["testserver"])
+class LeaderboardTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate(BASE_SIZE)
+        cls.sample = Sample.pick()
+
+    def test_bests_follow_result_changes(self):
+        runner = self.sample.runner
+        result = runner.result_set.order_by("time").first()
+        best = CareerBest.objects.get(runner=runner, distance=result.race.distance)
+        self.assertEqual(best.result_id, result.id)
+
+        result.time += timedelta(hours=1)
+        result.save()
+        best = CareerBest.objects.get(runner=runner, distance=result.race.distance)
+        self.assertNotEqual(best.result_id, result.id)
+
+        runner.result_set.filter(pk=best.result_id).delete()
+        self.assertFalse(
+            CareerBest.objects.filter(runner=runner, result_id=best.result_id)
+        )
+
+    def test_api_pages_follow_the_leaderboard(self):
+        url = f"{reverse('api_leaderboard')}?distance=8km&sex=M&limit=5"
+        seconds = []
+        with quiet():
+            while url:
+                page = json.loads(b"".join(self.client.get(url).streaming_content))
+                seconds.extend(best["seconds"] for best in page["data"])
+                url = page["next"]
+
+        self.assertEqual(seconds, sorted(seconds))
+        self.assertEqual(
+            len(seconds), CareerBest.objects.filter(sex="M", distance=8).count()
+        )
+
+
+@override_settings(CACHES=BENCHMARK_CACHES, ALLOWED_HOSTS=["testserver"])
+class ApiTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate(BASE_SIZE)
+        cls.sample = Sample.pick()
+
+    def get_json(self, url):
+        # streamed pages are logged once read
+        with quiet():
+            response = self.client.get(url)
+            content = response.getvalue()
+        return response.status_code, json.loads(content)
+
+    def test_results_of_unranked_races_page_in_finishing_order(self):
+        race = self.sample.race
+        race.result_set.update(place=None)
+        race_info = (int(race.distance), race.unit, race.sex)
+        url = reverse(
+            "api_race_results",
+            kwargs={
+                "year": race.meet.date.year,
+                "slug": race.meet.slug,
+                "race_info": race_info,
+            },
+        )
+
+        ids = []
+        url += "?limit=2"
+        while url:
+            status, page = self.get_json(url)
+            self.assertEqual(status, 200)
+            ids.extend(result["id"] for result in page["data"])
+            url = page["next"]
+
+        expected = race.result_set.order_by("time", "id").values_list("id", flat=True)
+        self.assertEqual(ids, list(expected))
+
+    def test_null_cursor_values_are_bad_requests(self):
+        cursor = encode_cursor([None, 1])
+        status, body = self.get_json(f"{reverse('api_runners')}?cursor={cursor}")
+        self.assertEqual(status, 400)
+        self.assertEqual(body, {"error": "Invalid cursor"})
+
+
+@override_settings(CACHES=BENCHMARK_CACHES, ALLOWED_HOSTS=["testserver"])
+class ConditionalResponseTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate(BASE_SIZE)
+        cls.sample = Sample.pick()
+
+    def test_pages_vary_on_htmx_requests(self):
+        with quiet():
+            response = self.client.get(self.sample.runner.get_absolute_url())
+        self.assertIn("HX-Request", response.headers["Vary"])
+
+    def test_fragments_and_pages_have_different_etags(self):
+        for url in (reverse("ranking"), reverse("leaderboard")):
+            with self.subTest(url), quiet():
+                fragment = self.client.get(url, HTTP_HX_REQUEST="true")
+                page = self.client.get(url, HTTP_IF_NONE_MATCH=fragment["ETag"])
+                self.assertEqual(page.status_code, 200)
+                self.assertNotEqual(page["ETag"], fragment["ETag"])
+
+    def revalidate(self, url, etag):
+        with quiet():
+            return self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_runner_pages_revalidate_until_they_change(self):
+        runner = self.sample.runner
+        url = runner.get_absolute_url()
+        with quiet():
+            etag = self.client.get(url)["ETag"]
+        self.assertEqual(self.revalidate(url, etag).status_code, 304)
+
+        result = runner.result_set.first()
+        result.time += timedelta(seconds=1)
+        result.save()
+        response = self.revalidate(url, etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_runner_pages_only_depend_on_other_runners_names(self):
+        runner = self.sample.runner
+        url = runner.get_absolute_url()
+        with quiet():
+            etag = self.client.get(url)["ETag"]
+
+        # a race the runner wasn't in
+        other = Result.objects.exclude(
+            race__in=runner.result_set.values("race")
+        ).filter(runner__isnull=False)[0]
+        other.time += timedelta(seconds=1)
+        other.save()
+        other.runner.save()
+        self.assertEqual(self.revalidate(url, etag).status_code, 304)
+
+        # the head-to-head picker lists every runner
+        other.runner.name = "Zebedee Quartz"
+        other.runner.save()
+        self.assertEqual(self.revalidate(url, etag).status_code, 200)
+
+
+@override_settings(CACHES=BENCHMARK_CACHES, ALLOWED_HOSTS=["testserver"])
+class CacheInvalidationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate(BASE_SIZE)
+        cls.sample = Sample.pick()
+
+    def setUp(self):
+        # cached pages outlive the rolled back data of other tests
+        cache.clear()
+
+    def get(self, *urls) -> list[str]:
+        with quiet():
+            return [self.client.get(url).content.decode() for url in urls]
+
+    def test_pages_are_cached_until_a_model_signals_a_change(self):
+        meet = self.sample.race.meet
+        self.get(meet.get_absolute_url())
+
+        Meet.objects.filter(pk=meet.pk).update(name="Zebedee Invitational")
+        [page] = self.get(meet.get_absolute_url())
+        self.assertNotIn("Zebedee Invitational", page)
+
+        meet.refresh_from_db()
+        meet.save()
+        [page] = self.get(meet.get_absolute_url())
+        self.assertIn("Zebedee Invitational", page)
+
+    def test_result_changes_refresh_race_and_runner_pages(self):
+        race = self.sample.race
+        result = race.result_set.filter(runner__isnull=False).order_by("time").first()
+        urls = (race.get_absolute_url(), result.runner.get_absolute_url())
+        self.get(*urls)
+
+        result.time += timedelta(hours=1)
+        result.save()
+        for page in self.get(*urls):
+            self.assertIn(finish_time(result.time), page)
+
+    def test_deleted_results_refresh_their_runners_pages_once(self):
+        race = self.sample.race
+        runners = list(Runner.objects.filter(result__race=race))
+        self.get(*(runner.get_absolute_url() for runner in runners))
+
+        with (
+            mock.patch(
+                "racing.ranking.invalidate_runners", wraps=invalidate_runners
+            ) as invalidate,
+            defer_ranking(),
+        ):
+            for result in race.result_set.all():
+                result.delete()
+        invalidate.assert_called_once()
+
+        pages = self.get(*(runner.get_absolute_url() for runner in runners))
+        for runner, page in zip(runners, pages, strict=True):
+            with self.subTest(runner.slug):
+                self.assertNotIn(race.get_absolute_url(), page)
+
+    def test_runner_changes_refresh_race_and_roster_pages(self):
+        runner = self.sample.runner
+        spot = runner.rosterspot_set.first()
+        urls = (
+            self.sample.race.get_absolute_url(),
+            reverse("roster", kwargs={"year": spot.year, "slug": spot.team.slug}),
+        )
+        self.get(*urls)
+
+        runner.name = "Zebedee Quartz"
+        runner.slug = "zebedee-quartz"
+        runner.save()
+        race_page, roster_page = self.get(*urls)
+        self.assertIn(runner.get_absolute_url(), race_page)
+        self.assertIn("Zebedee Quartz", roster_page)
+
+    def test_roster_spot_changes_refresh_both_rosters(self):
+        runner = self.sample.runner
+        spot = runner.rosterspot_set.first()
+        old_team = spot.team
+        new_team = Team.objects.exclude(pk=old_team.pk).first()
+        urls = [
+            reverse("roster", kwargs={"year": spot.year, "slug": team.slug})
+            for team in (old_team, new_team)
+        ]
+        self.get(*urls)
+
+        spot.team = new_team
+        spot.save()
+        old_page, new_page = self.get(*urls)
+        self.assertNotIn(runner.get_absolute_url(), old_page)
+        self.assertIn(runner.get_absolute_url(), new_page)
+
+    def test_meet_changes_refresh_race_and_runner_pages(self):
+        race = self.sample.race
+        urls = (
+            race.meet.get_absolute_url(),
+            race.get_absolute_url(),
+            self.sample.runner.get_absolute_url(),
+        )
+        self.get(*urls)
+
+        race.meet.name = "Zebedee Invitational"
+        race.meet.save()
+        for page in self.get(*urls):
+            self.assertIn("Zebedee Invitational", page)
+
+
+@override_settings(CACHES=BENCHMARK_CACHES, ALLOWED_HOSTS=["testserver"])
+class ImportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate(BASE_SIZE)
+        cls.race = Sample.pick().race
+        cls.team = cls.race.result_set.first().team
+        cls.admin = User.objects.create_superuser("admin", password="admin")
+
+    def test_new_results_place_among_existing_ones(self):
+        tie = self.race.result_set.order_by("time", "id")[1]
+        results = [
+            Result(time=tie.time),
+            Result(time=timedelta(seconds=1)),
+            Result(time=tie.time),
+        ]
+
+        _place_new_results(self.race, results)
+        # new results tie after the existing one, in the order they're inserted
+        self.assertEqual(
+            [(result.time, result.place) for result in results],
+            [
+                (timedelta(seconds=1), 1),
+                (tie.time, tie.place + 2),
+                (tie.time, tie.place + 3),
+            ],
+        )
+
+    def test_imported_results_are_ranked_with_existing_ones(self):
+        summary = import_records(
+            self.race, [Record("Zebedee Quartz", self.team.full_name, "0:01")]
+        )
+
+        self.assertEqual(summary.imported, 1)
+        self.assertEqual(self.race.result_set.get(name="Zebedee Quartz").place, 1)
+        self.assertEqual(
+            list(self.race.result_set.order_by("place").values_list("id", flat=True)),
+            list(
+                self.race.result_set.order_by("time", "id").values_list("id", flat=True)
+            ),
+        )
+
+    def test_runners_who_did_not_finish_are_skipped(self):
+        count = self.race.result_set.count()
+        summary = import_records(
+            self.race,
+            [
+                Record("Zebedee Quartz", self.team.full_name, "30:00"),
+                Record("Yolanda Quill", self.team.full_name, "DNF"),
+                Record("Xavier Quist", self.team.full_name, "D.N.S."),
+                Record("Wilma Quade", self.team.full_name, "DQ"),
+            ],
+        )
+
+        self.assertEqual(summary.imported, 1)
+        self.assertEqual(summary.skipped, Counter({DNF: 1, DNS: 1, DQ: 1}))
+        self.assertEqual(str(summary), "1 results (skipped 1 DNF, 1 DNS, 1 DQ)")
+        self.assertEqual(self.race.result_set.count(), count + 1)
+
+    def test_every_error_is_reported_and_nothing_written(self):
+        count = self.race.result_set.count()
+        records = [
+            Record("", self.team.full_name, "30:00", location="Line 2"),
+            Record("Zebedee Quartz", self.team.full_name, "soon", location="Line 3"),
+            Record("Yolanda Quill", self.team.full_name, "30:00", "x", "Line 4"),
+            Record("Xavier Quist", self.team.full_name, "30:00", location="Line 5"),
+        ]
+
+        with self.assertRaises(ResultImportError) as raised:
+            import_records(self.race, records)
+        self.assertEqual(
+            raised.exception.errors,
+            [
+                "Line 2: missing name",
+                'Line 3: invalid time "soon"',
+                'Line 4: invalid points "x"',
+            ],
+        )
+        self.assertEqual(self.race.result_set.count(), count)
+
+    def test_unknown_teams(self):
+        with self.assertRaises(ResultImportError) as raised:
+            import_results(
+                self.race,
+                [b"name,time,team\n", b"Zebedee Quartz,30:00,Nowhere University\n"],
+            )
+        self.assertEqual(
+            raised.exception.errors, ['Line 2: unknown team "Nowhere University"']
+        )
+
+    def test_replacing_results_keeps_runner_assignments(self):
+        old = list(self.race.result_set.select_related("team").order_by("id"))
+        records = [
+            # names are matched regardless of case and accents
+            Record(result.name.upper(), result.team.full_name, f"{20 + index}:00")
+            for index, result in enumerate(old)
+        ]
+
+        import_records(self.race, records, replace=True)
+
+        self.assertFalse(Result.objects.filter(pk__in=[result.pk for result in old]))
+        self.assertEqual(
+            set(self.race.result_set.values_list("name", "runner_id")),
+            {(result.name.upper(), result.runner_id) for result in old},
+        )
+
+    def admin_import(self, csv_file: bytes, **data):
+        self.client.force_login(self.admin)
+        csv_index = next(
+            index
+            for index, format in enumerate(
+                RaceResultAdmin(Result, admin.site).get_import_formats()
+            )
+            if format is CSV
+        )
+        with quiet():
+            return self.client.post(
+                reverse("admin:racing_result_import"),
+                {
+                    "format": csv_index,
+                    "race": self.race.id,
+                    "import_file": SimpleUploadedFile("results.csv", csv_file),
+                    **data,
+                },
+            )
+
+    def test_imports_without_preview_redirect_with_a_summary(self):
+        response = self.admin_import(
+            f"name,time,team\nZebedee Quartz,30:00,{self.team.full_name}\n"
+            "Yolanda Quill,DNF,\n".encode(),
+            skip_preview="on",
+        )
+
+        self.assertRedirects(
+            response,
+            reverse("admin:racing_result_changelist"),
+            fetch_redirect_response=False,
+        )
+        self.assertEqual(
+            [str(message) for message in get_messages(response.wsgi_request)],
+            [f"Imported 1 results (skipped 1 DNF) into {self.race}"],
+        )
+        self.assertTrue(self.race.result_set.filter(name="Zebedee Quartz"))
+
+    def test_previews_write_nothing(self):
+        year = self.race.meet.date.year
+        RatingSeason.objects.update_or_create(
+            year=year, sex=self.race.sex, defaults={"stale": False}
+        )
+        count = self.race.result_set.count()
+
+        response = self.admin_import(
+            f"name,time,team\nZebedee Quartz,30:00,{self.team.full_name}\n".encode()
+        )
+
+        self.assertContains(response, "Zebedee Quartz")
+        self.assertEqual(self.race.result_set.count(), count)
+        self.assertFalse(RatingSeason.objects.get(year=year, sex=self.race.sex).stale)
+
+
+@override_settings(CACHES=BENCHMARK_CACHES)
+class AssignRunnersTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate(BASE_SIZE)
+
+    def test_new_runners_are_matched_in_later_races(self):
+        races = list(Race.objects.filter(sex="F").order_by("meet__date", "id")[:2])
+        results = [race.result_set.order_by("time").first() for race in races]
+        # a runner's results in a season are for one team
+        Result.objects.filter(pk__in=[result.pk for result in results]).update(
+            runner=None, name="Zebedee Quartz", team=results[0].team
+        )
+
+        with tempfile.TemporaryDirectory() as directory:
+            call_command(
+                "assign_runners",
+                *[race.id for race in races],
+                batch=True,
+                review_file=os.path.join(directory, "review.csv"),
+                stdout=io.StringIO(),
+            )
+
+        runner = Runner.objects.get(name="Zebedee Quartz")
+        self.assertEqual(runner.search_name, "zebedee quartz")
+        self.assertEqual(
+            set(runner.result_set.values_list("pk", flat=True)),
+            {result.pk for result in results},
+        )
+        self.assertTrue(runner.rosterspot_set.exists())
+
+
+@override_settings(CACHES=BENCHMARK_CACHES, ALLOWED_HOSTS=["testserver"])
+class ExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate(BASE_SIZE)
+
+    def test_failed_pages_are_removed_and_retried(self):
+        pages = SitePages.load()
+        # pages with a data version, the others are always rendered
+        url, unchanged = [
+            url for url, version in pages.versions.items() if version is not None
+        ][:2]
+        with tempfile.TemporaryDirectory() as directory:
+            output = Path(directory)
+            render_pages(output, list(pages.versions))
+            manifest = Manifest(
+                exported_at=timezone.now(),
+                pages=sorted(pages.versions),
+                failed=[url],
+                runner_lists=pages.runner_lists,
+            )
+            stale = pages.stale(output, manifest)
+            self.assertIn(url, stale)
+            self.assertNotIn(unchanged, stale)
+
+            missing = "/results/1900/missing/"
+            write_page(page_file(output, missing), b"")
+            self.assertEqual(render_pages(output, [missing]), [(missing, 404)])
+            self.assertFalse(page_file(output, missing).exists())
+
+
+@override_settings(CACHES=BENCHMARK_CACHES)
+class ThumbnailTests(TestCase):
+    def test_cached_thumbnails_are_read_in_bulk(self):
+        with (
+            tempfile.TemporaryDirectory() as directory,
+            override_settings(MEDIA_ROOT=directory),
+        ):
+            images = []
+            for color in ("red", "blue"):
+                content = io.BytesIO()
+                Image.new("RGB", (80, 100), color).save(content, "PNG")
+                images.append(ImageFile(default_storage.save(f"{color}.png", content)))
+
+            expected = [
+                get_thumbnail(image, "50x50", crop="center top").name
+                for image in images
+            ]
+            with CaptureQueriesContext(connection) as queries:
+                thumbnails = get_thumbnails(images, "50x50", crop="center top")
+
+        self.assertEqual([thumbnail.name for thumbnail in thumbnails], expected)
+        self.assertEqual(len(queries), 0)
+
+
+@override_settings(CACHES=BENCHMARK_CACHES)
+class ReingestTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate(BASE_SIZE)
+        cls.race = Race.objects.filter(sex="F").select_related("meet").first()
+
+    def write_archive(self, directory: Path, rows):
+        """An archive of the race's results file, named by the manifest."""
+        meet = self.race.meet
+        name = f"results_{meet.date.year}_women.csv"
+        with open(directory / "manifest.csv", "w", newline="") as f:
+            csv.writer(f).writerows([("file", "format", "meet"), (name, "", meet.slug)])
+        with open(directory / name, "w", newline="") as f:
+            csv.writer(f).writerows([("name", "time", "team"), *rows])
+
+    def verify(self, directory: Path) -> str:
+        stdout = io.StringIO()
+        call_command("reingest", dir=directory, verify=True, workers=1, stdout=stdout)
+        return stdout.getvalue()
+
+    def test_verify_compares_the_archive_with_the_database(self):
+        results = self.race.result_set.select_related("team").order_by("time", "id")
+        stored = list(results.values_list("name", "time"))
+        rows = [(r.name, str(r.time), r.team.short_name) for r in results]
+
+        with tempfile.TemporaryDirectory() as directory:
+            directory = Path(directory)
+            # non-finishers aren't stored
+            self.write_archive(directory, [*rows, (rows[0][0], "DNF", "")])
+            self.assertIn("1 of 1 files match the database", self.verify(directory))
+
+            name, _, team = rows[0]
+            self.write_archive(directory, [(name, "59:59", team), *rows[1:]])
+            with self.assertRaisesMessage(CommandError, "1 files failed"):
+                self.verify(directory)
+
+        # verifying never writes
+        self.assertEqual(list(results.values_list("name", "time")), stored)
+
+
+class TimesTests(SimpleTestCase):
+    def test_minutes_and_hours(self):
+        parsed = parse_times(["25:03.4", "1:02:03", "59:59", "25:03,45"])
+        self.assertEqual(
+            parsed.durations,
+            [
+                timedelta(minutes=25, seconds=3.4),
+                timedelta(hours=1, minutes=2, seconds=3),
+                timedelta(minutes=59, seconds=59),
+                timedelta(minutes=25, seconds=3.45),
+            ],
+        )
+        self.assertEqual(parsed.markers, ["", "", "", ""])
+
+    def test_minutes_only_wrap_into_written_hours(self):
+        # "75:10" is 75 minutes, but 1:75:10 has no meaning
+        parsed = parse_times(["75:10", "1:75:10", "25:60"])
+        self.assertEqual(
+            parsed.durations, [timedelta(minutes=75, seconds=10), None, None]
+        )
+        self.assertEqual(parsed.markers, ["", INVALID, INVALID])
+
+    def test_markers(self):
+        parsed = parse_times(["DNF", "D.N.F.", "(DQ)", "did not start", "dsq", "", "?"])
+        self.assertEqual(parsed.durations, [None] * 7)
+        self.assertEqual(parsed.markers, [DNF, DNF, DQ, DNS, DQ, INVALID, INVALID])
+        self.assertEqual(parsed.invalid(), [5, 6])
+
+    def test_distinct_values_are_parsed_once(self):
+        values = ["DNF", "25:03.4", None, "DNF", "25:03.4", ""]
+        with mock.patch("racing.times.parse_time", wraps=parse_time) as parse:
+            parsed = parse_times(values)
+
+        self.assertEqual(parse.call_count, 3)
+        self.assertEqual(parsed.markers, [DNF, "", INVALID, DNF, "", INVALID])
+        self.assertEqual(parsed.durations[1], parsed.durations[4])
+
+
+class SourceTests(SimpleTestCase):
+    def parse(self, format: str, file: str, **options) -> list[tuple]:
+        with open(SOURCES_DIR / file, "rb") as stream:
+            records = get_parser(format).parse(stream, **options)
+            return [(r.name, r.team, r.time, r.points) for r in records]
+
+    def test_json_sources(self):
+        self.assertEqual(
+            self.parse("athletic_live", "athletic_live.json"),
+            [
+                ("Émilie Tremblay", "Laval", "20:41.3", 1),
+                # non-scoring runners have 0 points
+                ("Sarah Smith", "UBC", "20:58.0", None),
+                ("Ava Nguyen", "", "DNF", None),
+            ],
+        )
+        self.assertEqual(
+            self.parse("race_roster", "race_roster.json"),
+            [("Liam Côté", "McGill", "25:03.4", None), ("Noah Fraser", "", "", None)],
+        )
+        self.assertEqual(
+            self.parse("run_signup", "run_signup.json"),
+            [
+                ("Chloé Roy", "Guelph", "21:10.5", None),
+                ("Megan Brown", "Queen's", "21:12.0", None),
+            ],
+        )
+
+    def test_html_sources(self):
+        self.assertEqual(
+            self.parse("rseq", "rseq.html"),
+            [
+                ("Jérôme Gagnon", "Sherbrooke", "26:01.2", None),
+                ("Rémi Bouchard", "Laval", "26:15.9", None),
+            ],
+        )
+        self.assertEqual(
+            self.parse("usports", "usports.html"),
+            [
+                ("Ethan Macdonald", "Dalhousie", "24:31.8", None),
+                ("Lucas Morin", "Laval", "24:35.0", None),
+            ],
+        )
+
+    def test_speed_river_sections(self):
+        self.assertEqual(
+            self.parse("speed_river", "speed_river.html"),
+            [
+                ("Zoé Pelletier", "Guelph", "21:00.1", None),
+                ("Hannah Wilson", "Western", "21:05.6", None),
+            ],
+        )
+        self.assertEqual(
+            self.parse("speed_river", "speed_river.html", section="men"),
+            [("Owen Martin", "Guelph", "24:40.0", None)],
+        )
+
+    def test_csv_columns_in_any_order(self):
+        self.assertEqual(
+            self.parse("csv", "results.csv"),
+            [
+                ("Claire Campbell", "Victoria", "20:59.9", "1"),
+                ("Rachel Ouellet", "Victoria", "DNS", ""),
+            ],
+        )
+
+    def test_unexpected_documents(self):
+        stream = io.BytesIO(b'{"data": [{"teamName": "McGill"}]}')
+        with self.assertRaisesMessage(ResultImportError, "Unexpected RaceRoster"):
+            list(get_parser("race_roster").parse(stream))
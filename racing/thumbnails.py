@@ -0,0 +1,60 @@
+"""
+Thumbnails of many images at once.
+
+sorl's `{% thumbnail %}` tag looks every thumbnail up in its key-value
+store, a cache get (and a query on a miss) per image. `get_thumbnails`
+reads those already in the cache with a single `get_many`, and leaves the
+others to sorl to look up or create one by one.
+"""
+
+from sorl.thumbnail import default
+from sorl.thumbnail.base import ThumbnailBackend
+from sorl.thumbnail.conf import defaults as default_settings
+from sorl.thumbnail.conf import settings
+from sorl.thumbnail.images import ImageFile, deserialize_image_file
+from sorl.thumbnail.kvstores.base import add_prefix
+
+
+class _NamingBackend(ThumbnailBackend):
+    def thumbnail_file(self, file_, geometry_string, **options) -> ImageFile:
+        """The thumbnail `get_thumbnail` looks up, with the options it adds."""
+        source = ImageFile(file_)
+        if settings.THUMBNAIL_PRESERVE_FORMAT:
+            options.setdefault("format", self._get_format(source))
+        for key, value in self.default_options.items():
+            options.setdefault(key, value)
+        for key, attr in self.extra_options:
+            value = getattr(settings, attr)
+            if value != getattr(default_settings, attr):
+                options.setdefault(key, value)
+
+        name = self._get_thumbnail_filename(source, geometry_string, options)
+        return ImageFile(name, default.storage)
+
+
+def get_thumbnails(files, geometry_string: str, **options) -> list[ImageFile]:
+    """
+    Thumbnails of files, as `sorl.thumbnail.get_thumbnail` returns them and
+    in the same order.
+    """
+    backend = _NamingBackend()
+    keys = [
+        add_prefix(backend.thumbnail_file(file_, geometry_string, **options).key)
+        for file_ in files
+    ]
+
+    # only the cached database store keeps thumbnails in Django's cache
+    cached = {}
+    if getattr(default.kvstore, "_cached_db_kvstore", False):
+        cached = default.kvstore.cache.get_many(keys)
+
+    thumbnails = []
+    for file_, key in zip(files, keys, strict=True):
+        # misses are cached too, as a marker class rather than a string
+        if isinstance(value := cached.get(key), str):
+            thumbnails.append(deserialize_image_file(value))
+        else:
+            thumbnails.append(
+                default.backend.get_thumbnail(file_, geometry_string, **options)
+            )
+    return thumbnails
@@ -0,0 +1,93 @@
+"""
+Parsing of finish times, a whole column at a time.
+
+Results files write times as "mm:ss", "h:mm:ss" or either with fractions of
+a second ("mm:ss.s"), and mark runners who didn't finish with DNF, DNS or
+DQ. `parse_times` turns a column of such strings into durations with one
+compiled pattern, parsing each distinct string once.
+"""
+
+import re
+from dataclasses import dataclass
+from datetime import timedelta
+
+DNF = "DNF"
+DNS = "DNS"
+DQ = "DQ"
+# a value that is neither a time nor a marker
+INVALID = "INVALID"
+
+MARKERS = {
+    "dnf": DNF,
+    "did not finish": DNF,
+    "dns": DNS,
+    "did not start": DNS,
+    "dq": DQ,
+    "dsq": DQ,
+    "disqualified": DQ,
+}
+
+TIME_PATTERN = re.compile(
+    r"(?:(?P<hours>\d+):(?=\d{1,2}:))?"
+    r"(?P<minutes>\d+):(?P<seconds>\d{1,2})"
+    r"(?:[.,](?P<fraction>\d{1,6}))?"
+)
+
+
+@dataclass
+class ParsedTimes:
+    """A column of parsed times, in the same order as the strings."""
+
+    # None for values that aren't times
+    durations: list[timedelta | None]
+    # "" for times, otherwise DNF, DNS, DQ or INVALID
+    markers: list[str]
+
+    def invalid(self) -> list[int]:
+        """Returns the indexes of values that are neither times nor markers."""
+        return [i for i, marker in enumerate(self.markers) if marker == INVALID]
+
+
+def parse_time(value: str) -> tuple[timedelta | None, str]:
+    """Parses a single value, see `parse_times`."""
+    value = value.strip()
+
+    match = TIME_PATTERN.fullmatch(value)
+    if match is None:
+        # e.g. "D.N.F." or "(DQ)"
+        words = re.sub(r"[.()]", "", value.lower()).split()
+        return None, MARKERS.get(" ".join(words), INVALID)
+
+    hours = int(match["hours"] or 0)
+    minutes = int(match["minutes"])
+    seconds = int(match["seconds"])
+    # minutes only wrap into hours when hours are written out
+    if seconds >= 60 or (match["hours"] is not None and minutes >= 60):
+        return None, INVALID
+
+    microseconds = int((match["fraction"] or "").ljust(6, "0"))
+    return timedelta(
+        hours=hours, minutes=minutes, seconds=seconds, microseconds=microseconds
+    ), ""
+
+
+def parse_times(values) -> ParsedTimes:
+    """
+    Parses a column of finish times.
+
+    Blank values and anything else that isn't a time or a DNF, DNS or DQ
+    marker are flagged as INVALID.
+    """
+    parsed = {}
+    durations = []
+    markers = []
+
+    for value in values:
+        value = value or ""
+        if value not in parsed:
+            parsed[value] = parse_time(value)
+        duration, marker = parsed[value]
+        durations.append(duration)
+        markers.append(marker)
+
+    return ParsedTimes(durations, markers)
@@ -1,7 +1,19 @@
 from django.urls import path, register_converter
 
+from racing import api
 from racing.converters import ConferenceConverter, RaceConverter, YearConverter
-from racing.views import about, index, meet, race, results, roster, runner, runners
+from racing.views import (
+    about,
+    index,
+    leaderboard,
+    meet,
+    race,
+    rankings,
+    results,
+    roster,
+    runner,
+    runners,
+)
 
 register_converter(ConferenceConverter, "conference")
 register_converter(YearConverter, "year")
@@ -24,6 +36,27 @@ urlpatterns = [
     # path('teams/', teams, name='teams'),
     # path('teams/<slug:slug>/', team, name='team'),
     path("teams/<slug:slug>/<year:year>/", roster, name="roster"),
+    # rankings
+    path("rankings/", rankings, name="ranking"),
+    # leaderboards
+    path("leaderboards/", leaderboard, name="leaderboard"),
+    # read-only JSON API, see racing.api
+    path("api/v1/meets/", api.meets, name="api_meets"),
+    path("api/v1/meets/<int:year>/<slug:slug>/", api.meet, name="api_meet"),
+    path(
+        "api/v1/meets/<int:year>/<slug:slug>/<race_info:race_info>/",
+        api.race,
+        name="api_race",
+    ),
+    path(
+        "api/v1/meets/<int:year>/<slug:slug>/<race_info:race_info>/results/",
+        api.race_results,
+        name="api_race_results",
+    ),
+    path("api/v1/runners/", api.runners, name="api_runners"),
+    path("api/v1/runners/<slug:slug>/", api.runner, name="api_runner"),
+    path("api/v1/teams/<slug:slug>/<year:year>/", api.roster, name="api_roster"),
+    path("api/v1/leaderboard/", api.leaderboard, name="api_leaderboard"),
     # per-conference URLs (mirroring the above default URLs)
     # path("<conference:conference>", index, name="conference_index")
     # TODO: path("conferences/", ...),
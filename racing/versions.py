@@ -0,0 +1,74 @@
+"""
+Data versions for conditional GETs.
+
+Meets, races, runners and teams each have an `updated_at` time, bumped on
+save and whenever something shown on their pages changes (a result, a
+roster spot, a rename). Pages send it as Last-Modified and in their ETag,
+so a browser or CDN revalidating an unchanged page gets a 304 from a
+single indexed lookup, without scoring teams or rendering templates.
+
+Unlike cache tag versions, these survive the cache being cleared, so
+clients keep their copies across deploys.
+
+The touch functions mirror the invalidation functions in racing.caching,
+which call them, so every change that orphans a cached page also bumps
+the versions of the pages concerned.
+"""
+
+from django.utils import timezone
+
+from racing.models import Meet, Race, Runner, Team
+
+
+def get_version(queryset):
+    """Returns the version of the object in `queryset`, or None if there's none."""
+    updated_at = queryset.values_list("updated_at", flat=True).first()
+    return None if updated_at is None else (updated_at,)
+
+
+def touch_meets(meet_ids):
+    Meet.objects.filter(pk__in=meet_ids).update(updated_at=timezone.now())
+
+
+def touch_teams(team_ids):
+    Team.objects.filter(pk__in=team_ids).update(updated_at=timezone.now())
+
+
+def touch_races(race_ids):
+    """
+    Bumps the versions of the given races and of the pages showing them:
+    their meets and the runners in them.
+    """
+    now = timezone.now()
+    Race.objects.filter(pk__in=race_ids).update(updated_at=now)
+    Meet.objects.filter(race__in=race_ids).update(updated_at=now)
+    Runner.objects.filter(result__race__in=race_ids).update(updated_at=now)
+
+
+def touch_runners(runner_ids):
+    """
+    Bumps the versions of the given runners and of the pages showing them:
+    their teams' rosters and the races and meets they ran in.
+    """
+    now = timezone.now()
+    Runner.objects.filter(pk__in=runner_ids).update(updated_at=now)
+    Team.objects.filter(rosterspot__runner__in=runner_ids).update(updated_at=now)
+    Race.objects.filter(result__runner__in=runner_ids).update(updated_at=now)
+    Meet.objects.filter(race__result__runner__in=runner_ids).update(updated_at=now)
+
+
+def runner_page_version(slug: str, head_to_head_slug: str | None = None):
+    """
+    Returns the version of a runner page, or None if there is no such runner.
+
+    Runner pages also list every runner to pick a head-to-head from, which
+    the page's caller versions separately (see racing.views).
+    """
+    updated_at = dict(
+        Runner.objects.filter(slug__in=[slug, head_to_head_slug]).values_list(
+            "slug", "updated_at"
+        )
+    )
+    if slug not in updated_at:
+        return None
+    return (updated_at[slug], updated_at.get(head_to_head_slug))
@@ -1,19 +1,57 @@
+from datetime import UTC, datetime
+
+from django.db.models import Q
 from django.shortcuts import get_object_or_404, render
 from django.utils import timezone
 
-from racing.models import Conference, Meet, Race, RosterSpot, Runner, Team
-
-
+from racing.budgets import budget
+from racing.caching import (
+    INDEX_TAG,
+    LEADERBOARDS_TAG,
+    MEETS_TAG,
+    RANKINGS_TAG,
+    RUNNERS_TAG,
+    cache_page_with_tags,
+    condition_with_tags,
+    condition_with_version,
+    get_versions,
+    meet_tag,
+    runner_tag,
+    team_tag,
+)
+from racing.head_to_head import head_to_head
+from racing.leaderboards import LEADERBOARD_DISTANCES, Leaderboard
+from racing.models import (
+    Conference,
+    Meet,
+    Race,
+    RatingSeason,
+    RosterSpot,
+    Runner,
+    RunnerRating,
+    Sex,
+    Team,
+    TeamRating,
+)
+from racing.search import search_runners
+from racing.thumbnails import get_thumbnails
+from racing.versions import get_version, runner_page_version
+
+
+@budget(queries=5, ms=250)
+@cache_page_with_tags(lambda request, **kwargs: [INDEX_TAG], daily=True)
 def index(request, conference_short_name=None):
     if conference_short_name:
-        latest_results = Race.objects.filter(
-            meet__conference__short_name=conference_short_name
-        ).order_by("-meet__date")[:2]
+        latest_results = (
+            Race.objects.with_podiums()
+            .filter(meet__conference__short_name=conference_short_name)
+            .order_by("-meet__date")[:2]
+        )
         upcoming_meets = Meet.objects.filter(
             conference__short_name=conference_short_name, date__gt=timezone.now()
         )
     else:
-        latest_results = Race.objects.all().order_by("-meet__date")[:2]
+        latest_results = Race.objects.with_podiums().order_by("-meet__date")[:2]
         upcoming_meets = Meet.objects.filter(date__gt=timezone.now())
 
     return render(
@@ -21,20 +59,45 @@ def index(request, conference_short_name=None):
         "racing/index.html",
         {
             "latest_results": latest_results,
-            "upcoming_meets": upcoming_meets,
+            "upcoming_meets": upcoming_meets.prefetch_related("conferences"),
         },
     )
-    
+
+
+@budget(queries=0, ms=50)
 def about(request):
     return render(request, "racing/about.html")
 
 
+@budget(queries=4, ms=250)
+@condition_with_version(
+    lambda request, year, slug: get_version(
+        Meet.objects.filter(date__year=year, slug=slug)
+    )
+)
+@cache_page_with_tags(lambda request, year, slug: [meet_tag(year, slug)])
 def meet(request, year: int, slug: str):
     meet = get_object_or_404(Meet, date__year=year, slug=slug)
 
     return render(request, "racing/meet.html", {"meet": meet})
 
 
+def get_race_version(request, year, slug, race_info):
+    distance, unit, sex = race_info
+    return get_version(
+        Race.objects.filter(
+            meet__date__year=year,
+            meet__slug=slug,
+            distance=distance,
+            unit=unit,
+            sex=sex,
+        )
+    )
+
+
+@budget(queries=8, ms=500)
+@condition_with_version(get_race_version)
+@cache_page_with_tags(lambda request, year, slug, race_info: [meet_tag(year, slug)])
 def race(request, year: int, slug: str, race_info: tuple[int, str, str]):
     meet = get_object_or_404(Meet, date__year=year, slug=slug)
 
@@ -59,44 +122,78 @@ def race(request, year: int, slug: str, race_info: tuple[int, str, str]):
     return render(request, "racing/race.html", {"race": race, "results": results})
 
 
+RUNNERS_PER_PAGE = 25
+
+
+@budget(queries=2, ms=250)
 def runners(request):
-    name = request.GET.get("name")
+    name = request.GET.get("name", "")
 
-    if name:
-        runners = Runner.objects.filter(name__icontains=name).order_by("name").all()
-    else:
-        runners = Runner.objects.none()
+    try:
+        page = max(int(request.GET.get("page", 1)), 1)
+    except ValueError:
+        page = 1
+
+    # fetch one extra runner to know whether there is another page
+    offset = (page - 1) * RUNNERS_PER_PAGE
+    runners = search_runners(name, limit=RUNNERS_PER_PAGE + 1, offset=offset)
+    next_page = page + 1 if len(runners) > RUNNERS_PER_PAGE else None
+    runners = runners[:RUNNERS_PER_PAGE]
+
+    # every headshot's thumbnail in one cache lookup, rather than one per row
+    headshots = {runner: runner.get_headshot() for runner in runners}
+    headshots = {runner: image for runner, image in headshots.items() if image}
+    thumbnails = get_thumbnails(list(headshots.values()), "50x50", crop="center top")
+    for runner, thumbnail in zip(headshots, thumbnails, strict=True):
+        runner.headshot_thumbnail = thumbnail
 
     if request.htmx:
         template = "racing/partials/runners_list.html"
     else:
         template = "racing/runners.html"
 
-    return render(request, template, {"runners": runners})
+    return render(
+        request,
+        template,
+        {"runners": runners, "name": name, "next_page": next_page},
+    )
+
 
+def get_runner_tags(request, slug):
+    tags = [RUNNERS_TAG, runner_tag(slug)]
+    if head_to_head_slug := request.GET.get("head-to-head"):
+        tags.append(runner_tag(head_to_head_slug))
+    return tags
 
+
+def get_runner_version(request, slug):
+    version = runner_page_version(slug, request.GET.get("head-to-head"))
+    if version is None:
+        return None
+
+    # the head-to-head picker lists every runner, which their tag versions
+    [runners_version] = get_versions([RUNNERS_TAG])
+    return (*version, datetime.fromtimestamp(runners_version / 1e9, tz=UTC))
+
+
+@budget(queries=11, ms=500)
+@condition_with_version(get_runner_version)
+@cache_page_with_tags(get_runner_tags)
 def runner(request, slug):
-    runner = get_object_or_404(Runner, slug=slug)
-
-    # Get runner's results
-    results_with_positions = []
-    for result in runner.result_set.all():
-        # Get all results from this race ordered by time
-        race_results = result.race.top_results()
-        # Find position of current result
-        position = list(race_results).index(result) + 1
-        # Store result and position
-        results_with_positions.append(
-            {
-                "result": result,
-                "position": position,
-            }
-        )
+    runner = get_object_or_404(
+        Runner.objects.with_roster_spots().select_related("career_stats"), slug=slug
+    )
 
-    # Sort by date descending
-    results_with_positions.sort(key=lambda x: x["result"].race.meet.date, reverse=True)
+    # Get runner's results, most recent first
+    results = runner.result_set.select_related("race__meet").order_by(
+        "-race__meet__date"
+    )
 
-    context = {"runner": runner, "results": results_with_positions}
+    context = {
+        "runner": runner,
+        "results": results,
+        "seasons": runner.season_stats.order_by("-year"),
+    }
 
     head_to_head_slug = request.GET.get("head-to-head")
     context = context | get_head_to_head_context(runner.slug, head_to_head_slug)
@@ -121,48 +218,15 @@ def get_head_to_head_context(slug_a: str, slug_b: str):
             "all_runners": Runner.objects.filter(sex=a.sex),
         }
 
-    # Get all results for each runner
-    resultsA = a.result_set.all()
-    resultsB = b.result_set.all()
-
-    # Find common races between the two result sets
-    common_races = []
-    for resultA in resultsA:
-        resultB = resultsB.filter(race=resultA.race).first()
-        if resultB:
-            common_races.append(
-                {
-                    "race": resultA.race,
-                    "meet": resultA.race.meet,
-                    "runnerA": {
-                        "time": resultA.time,
-                        "position": list(resultA.race.top_results()).index(resultA) + 1,
-                    },
-                    "runnerB": {
-                        "time": resultB.time,
-                        "position": list(resultB.race.top_results()).index(resultB) + 1,
-                    },
-                    "time_diff": abs(resultA.time - resultB.time),
-                }
-            )
-
-    # Sort by date descending
-    common_races.sort(key=lambda x: x["meet"].date, reverse=True)
-
-    # Calculate win totals
-    wins_a = sum(
-        1 for race in common_races if race["runnerA"]["time"] < race["runnerB"]["time"]
-    )
-    wins_b = sum(
-        1 for race in common_races if race["runnerB"]["time"] < race["runnerA"]["time"]
-    )
+    # Common races, places and win totals come from a single self-join
+    record = head_to_head(a, [b])[b.id]
 
     return {
         "runnerA": a,
         "runnerB": b,
-        "common_races": common_races,
-        "wins_a": wins_a,
-        "wins_b": wins_b,
+        "common_races": record["common_races"],
+        "wins_a": record["wins_a"],
+        "wins_b": record["wins_b"],
         "all_runners": Runner.objects.filter(sex=a.sex),
     }
 
@@ -179,8 +243,14 @@ def get_meet_years():
     return []
 
 
+@budget(queries=4, ms=250)
+@cache_page_with_tags(lambda request: [MEETS_TAG], daily=True)
 def results(request):
-    meets = Meet.objects.filter(date__lte=timezone.now()).order_by("-date")
+    meets = (
+        Meet.objects.filter(date__lte=timezone.now())
+        .prefetch_related("conferences")
+        .order_by("-date")
+    )
 
     if conference_short_name := request.GET.get("conference"):
         meets = meets.filter(conferences__short_name=conference_short_name)
@@ -206,12 +276,21 @@ def results(request):
     )
 
 
+@budget(queries=3, ms=250)
+@condition_with_version(
+    lambda request, year, slug: get_version(Team.objects.filter(slug=slug))
+)
+@cache_page_with_tags(lambda request, year, slug: [team_tag(slug)])
 def roster(request, year: int, slug: str):
     team = get_object_or_404(Team, slug=slug)
 
-    spots = RosterSpot.objects.filter(team__slug=slug, year=year)
-    males = spots.filter(runner__sex="M")
-    females = spots.filter(runner__sex="F")
+    runners = (
+        Runner.objects.filter(rosterspot__team=team, rosterspot__year=year)
+        .distinct()
+        .order_by("name")
+    )
+    males = [runner for runner in runners if runner.sex == "M"]
+    females = [runner for runner in runners if runner.sex == "F"]
 
     return render(
         request,
@@ -220,5 +299,146 @@ def roster(request, year: int, slug: str):
     )
 
 
+RANKED_RUNNERS_PER_PAGE = 50
+
+
+def get_rankings_tags(request):
+    # runner and team names show next to the ratings
+    return [RANKINGS_TAG, RUNNERS_TAG]
+
+
+@budget(queries=4, ms=250)
+@condition_with_tags(get_rankings_tags)
+@cache_page_with_tags(get_rankings_tags)
+def rankings(request):
+    years = list(
+        RatingSeason.objects.filter(computed_at__isnull=False)
+        .values_list("year", flat=True)
+        .distinct()
+        .order_by("-year")
+    )
+
+    try:
+        year = int(request.GET.get("year", ""))
+    except ValueError:
+        year = None
+    if year not in years:
+        year = years[0] if years else None
+
+    sex = request.GET.get("sex")
+    if sex not in (Sex.FEMALE, Sex.MALE):
+        sex = Sex.FEMALE
+
+    try:
+        page = max(int(request.GET.get("page", 1)), 1)
+    except ValueError:
+        page = 1
+
+    filters = Q(year=year, sex=sex)
+    if conference_short_name := request.GET.get("conference"):
+        filters &= Q(conference__short_name=conference_short_name)
+    if division := request.GET.get("division"):
+        filters &= Q(team__division=division)
+
+    # fetch one extra runner to know whether there is another page
+    offset = (page - 1) * RANKED_RUNNERS_PER_PAGE
+    runners = list(
+        RunnerRating.objects.filter(filters)
+        .select_related("runner", "team")
+        .order_by("rank")[offset : offset + RANKED_RUNNERS_PER_PAGE + 1]
+    )
+    next_page = page + 1 if len(runners) > RANKED_RUNNERS_PER_PAGE else None
+
+    teams = []
+    if page == 1:
+        teams = (
+            TeamRating.objects.filter(filters).select_related("team").order_by("rank")
+        )
+
+    if request.htmx and page > 1:
+        template = "racing/partials/ranked_runners.html"
+    elif request.htmx:
+        template = "racing/partials/rankings_list.html"
+    else:
+        template = "racing/rankings.html"
+
+    return render(
+        request,
+        template,
+        {
+            "runners": runners[:RANKED_RUNNERS_PER_PAGE],
+            "teams": teams,
+            "next_page": next_page,
+            "offset": offset,
+            "years": years,
+            "conferences": Conference.objects.all(),
+            "divisions": Team.Division.choices,
+            "sexes": [(Sex.FEMALE, "Women"), (Sex.MALE, "Men")],
+            "selected_year": year,
+            "selected_sex": sex,
+            "selected_conference": conference_short_name,
+            "selected_division": division,
+        },
+    )
+
+
+LEADERBOARD_ENTRIES_PER_PAGE = 50
+
+
+def get_leaderboard_tags(request):
+    # bests show with their runner, team and meet names
+    return [LEADERBOARDS_TAG, RUNNERS_TAG, MEETS_TAG]
+
+
+@budget(queries=2, ms=250)
+@condition_with_tags(get_leaderboard_tags)
+@cache_page_with_tags(get_leaderboard_tags)
+def leaderboard(request):
+    try:
+        board = Leaderboard.from_query(request.GET)
+    except ValueError:
+        board = Leaderboard()
+
+    try:
+        page = max(int(request.GET.get("page", 1)), 1)
+    except ValueError:
+        page = 1
+
+    # fetch one extra best to know whether there is another page
+    offset = (page - 1) * LEADERBOARD_ENTRIES_PER_PAGE
+    entries = list(
+        board.entries().order_by("time", "id")[
+            offset : offset + LEADERBOARD_ENTRIES_PER_PAGE + 1
+        ]
+    )
+    next_page = page + 1 if len(entries) > LEADERBOARD_ENTRIES_PER_PAGE else None
+
+    distances = LEADERBOARD_DISTANCES
+    if board.distance_param not in distances:
+        # linked to a distance not in the menu
+        distances = (*distances, board.distance_param)
+
+    if request.htmx and page > 1:
+        template = "racing/partials/leaderboard_rows.html"
+    elif request.htmx:
+        template = "racing/partials/leaderboard_list.html"
+    else:
+        template = "racing/leaderboard.html"
+
+    return render(
+        request,
+        template,
+        {
+            "entries": entries[:LEADERBOARD_ENTRIES_PER_PAGE],
+            "next_page": next_page,
+            "offset": offset,
+            "board": board,
+            "distances": distances,
+            "sexes": [(Sex.FEMALE, "Women"), (Sex.MALE, "Men")],
+            "years": get_meet_years(),
+        },
+    )
+
+
 def schedule(request):
     return render(request, "racing/schedule.html")